@@ -4,13 +4,15 @@ import json
 import csv
 import io
 import asyncio
-import re
+import threading
+import weakref
 from dotenv import load_dotenv
 from engines.llm_engine import CollegeDiscoveryEngine
 from engines.validation_engine import EvidenceValidator
 from engines.supabase_integration import SupabaseIntegration
+from engines.pipeline import DiscoveryPipeline
+from engines.http_session import get_validation_session_factory
 from models.college import EvidenceStatus
-from json_repair import repair_json
 from models.colleges_coarse import College, Courses
 
 
@@ -29,6 +31,86 @@ api_key = os.getenv("GOOGLE_API_KEY", "")
 supabase_url = os.getenv("SUPABASE_URL", "")
 supabase_key = os.getenv("SUPABASE_KEY", "")
 st.title("College Discovery App - Staging Pipeline")
+
+
+class SessionEventLoop:
+    """
+    Owns one browser session's event loop.
+
+    Stored in st.session_state, so it is garbage-collected when Streamlit
+    drops the session; the finalizer then closes the loop and its pooled
+    HTTP session instead of leaking a connector per abandoned session.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        weakref.finalize(self, close_abandoned_loop, self.loop)
+
+
+def close_abandoned_loop(loop):
+    # The collecting thread may be running another session's loop, so close it from a thread of its own
+    threading.Thread(target=close_event_loop, args=(loop,), daemon=True).start()
+
+
+def get_event_loop():
+    """One event loop per browser session, kept across reruns so pooled HTTP sessions stay warm"""
+    owner = st.session_state.get("event_loop")
+    if owner is None or owner.loop.is_closed():
+        owner = SessionEventLoop()
+        st.session_state["event_loop"] = owner
+    asyncio.set_event_loop(owner.loop)
+    return owner.loop
+
+
+def cancel_pending_tasks(loop):
+    """Cancel and drain tasks a run left behind, so they never resume in a later run"""
+    pending = [task for task in asyncio.all_tasks(loop) if not task.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+
+def close_event_loop(loop):
+    """Close the loop's pooled HTTP session and the loop (no-op if it is already closed)"""
+    if loop.is_closed() or loop.is_running():
+        return
+    try:
+        cancel_pending_tasks(loop)
+        loop.run_until_complete(get_validation_session_factory().close())
+    finally:
+        loop.close()
+
+
+def replace_event_loop(loop):
+    """Close the session's loop; the next run gets a fresh one"""
+    try:
+        close_event_loop(loop)
+    finally:
+        owner = st.session_state.get("event_loop")
+        if owner is not None and owner.loop is loop:
+            del st.session_state["event_loop"]
+
+
+def run_async(coro):
+    """
+    Run `coro` on the session's event loop.
+
+    If the run is interrupted (e.g. Streamlit stops the script from inside a
+    progress callback) the loop is replaced, so nothing from it carries over.
+    """
+    loop = get_event_loop()
+    interrupted = True
+    try:
+        result = loop.run_until_complete(coro)
+        interrupted = False
+        return result
+    finally:
+        cancel_pending_tasks(loop)
+        if interrupted:
+            replace_event_loop(loop)
+
+
 st.markdown("Discover colleges with AI-powered validation → Push to staging tables for admin review")
 
 with st.sidebar:
@@ -43,6 +125,10 @@ with st.sidebar:
     
     model_options = ["gemini-2.0-flash", "gemini-2.5-flash","gemini-2.0-flash-exp", "gemini-1.5-pro", "gemini-1.5-flash"]
     model = st.selectbox("Select Model", model_options, index=0)
+    structured_output = st.checkbox("Structured JSON output", value=True,
+                                    help="Send a response schema so Gemini returns plain JSON; regex + repair is only a fallback")
+    use_llm_cache = st.checkbox("Use response cache", value=True,
+                                help="Reuse cached Gemini responses for identical prompts. Uncheck to force fresh calls.")
     
     st.markdown("---")
     
@@ -70,10 +156,7 @@ with st.sidebar:
         if st.button("Staging Stats", use_container_width=True):
             try:
                 supabase = SupabaseIntegration(supabase_url, supabase_key)
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                stats = loop.run_until_complete(supabase.get_staging_stats())
-                loop.close()
+                stats = run_async(supabase.get_staging_stats())
                 
                 if stats:
                     st.info(f"Colleges: {stats.get('total_colleges', 0)}")
@@ -84,13 +167,24 @@ with st.sidebar:
     st.markdown("---")
     
     st.subheader("Batch Processing")
+    adaptive_batching = st.checkbox(
+        "Adaptive batch sizing", value=True,
+        help="Size batches from the learned output tokens per college; truncated batches are split and only missing colleges retried"
+    )
     batch_size = st.slider(
-        "Colleges per batch", 
+        "Max colleges per batch" if adaptive_batching else "Colleges per batch", 
         min_value=3, 
         max_value=15, 
         value=5,
         help="Process multiple colleges in one API call to save tokens"
     )
+    max_parallel_batches = st.slider(
+        "Max parallel batches",
+        min_value=1,
+        max_value=8,
+        value=4,
+        help="How many course-discovery batches may run against Gemini at the same time"
+    )
     st.info(f"📊 ~{(60 // batch_size) + 1} API calls for 60 colleges")
     
     st.markdown("---")
@@ -100,6 +194,16 @@ with st.sidebar:
                                    help="Validate colleges against websites and government databases")
     validation_delay = st.slider("Validation Delay (seconds)", 0.5, 5.0, 1.5, 0.5,
                                 help="Delay between validation requests")
+    use_http_cache = st.checkbox("Cache fetched pages", value=True,
+                                 help="Revalidate previously fetched college pages (ETag/Last-Modified) instead of re-downloading them")
+    reuse_validation = st.checkbox("Reuse recent validation results", value=True,
+                                   help="Skip colleges validated recently whose website and courses have not changed")
+    max_parallel_validations = st.slider("Parallel validations", 1, 16, 8,
+                                         help="Colleges validated at the same time (the delay still applies per website)")
+    auto_push = st.checkbox("Auto-push to staging", value=False,
+                            disabled=not (supabase_url and supabase_key),
+                            help="Push each college to the staging tables as soon as it is validated")
+    auto_push = auto_push and bool(supabase_url and supabase_key)
     
     st.markdown("---")
     st.markdown("### 📋 Pipeline Flow")
@@ -134,13 +238,13 @@ st.info("**Tip:** Leave Career Path empty to discover all colleges and courses,
 if supabase_url and supabase_key:
         if st.button("Fetch Saved Search Criteria", type="primary", use_container_width=True):
             st.session_state["fetch_triggered"] = True
+            # Re-fetch saved results that were opened earlier
+            st.session_state.pop("saved_search_json", None)
         if st.session_state.get("fetch_triggered"):
             supabase = SupabaseIntegration(supabase_url, supabase_key)
             try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
             
-                async def fetch_search_criteria():
+                async def fetch_search_criteria(page: int, page_size: int):
                     filters = {
                         "location": location.strip() if location else None,
                         "career_path": career_path.strip() if career_path else None,"specialization": specialization.strip() if specialization else None,
@@ -149,14 +253,32 @@ if supabase_url and supabase_key:
                 # Remove None values to avoid unnecessary filters
                     filters = {k: v for k, v in filters.items() if v is not None}
                     
-                # Call supabase integration to fetch matching rows
-                    return await supabase.get_search_criteria(filters)
+                # Fetch one page of matching rows (metadata only, no llm_json)
+                    return await supabase.get_search_criteria(filters, page=page, page_size=page_size)
             
-                results = loop.run_until_complete(fetch_search_criteria())
-                loop.close()
+                page_size = 20
+                page = st.session_state.get("saved_search_page", 1) - 1
+                listing = run_async(fetch_search_criteria(page, page_size))
+                if not listing["rows"] and page > 0:
+                    # Filters changed while on a later page; start from the first
+                    page = 0
+                    st.session_state["saved_search_page"] = 1
+                    listing = run_async(fetch_search_criteria(page, page_size))
+                results = listing["rows"]
             
                 if results:
-                    st.success(f"✅ Found {len(results)} saved search criteria")
+                    total = listing["total"]
+                    st.success(f"✅ Found {total} saved search criteria")
+                    pages = (total + page_size - 1) // page_size
+                    if pages > 1:
+                        st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key="saved_search_page")
+
+                    # Saved results are downloaded only for the searches opened below
+                    saved_json = st.session_state.setdefault("saved_search_json", {})
+                    to_fetch = [row["id"] for row in results
+                                if st.session_state.get(f"load_saved_{row['id']}") and row["id"] not in saved_json]
+                    if to_fetch:
+                        saved_json.update(run_async(supabase.get_search_criteria_results(to_fetch)))
 
     # Store selected colleges globally
                     if "selected_saved_colleges" not in st.session_state:
@@ -164,10 +286,12 @@ if supabase_url and supabase_key:
 
                     all_colleges = []
                     for idx, row in enumerate(results):
-                        st.markdown(f"### 🔍 Saved Search #{idx+1}")
+                        st.markdown(f"### 🔍 Saved Search #{page * page_size + idx + 1}")
                         st.markdown(f"**📍 Location:** {row['location']} | **🎓 Career Path:** {row['career_path']} | **📘 Specialization:** {row['specialization']} | **🏛 University:** {row['university']}")
 
-                        colleges_data = row.get("llm_json", {}).get("colleges", [])
+                        if not st.checkbox("Load colleges from this search", key=f"load_saved_{row['id']}"):
+                            continue
+                        colleges_data = (saved_json.get(row["id"]) or {}).get("colleges", [])
                         if not colleges_data:
                             st.warning("⚠️ No colleges found in this saved search.")
                             continue
@@ -210,7 +334,7 @@ if supabase_url and supabase_key:
                     
 
                         for i, college in enumerate(row_colleges):
-                            checkbox_key = f"saved_{idx}_{i}_{college.name}"
+                            checkbox_key = f"saved_{row['id']}_{i}_{college.name}"
                             checked = st.session_state.get(checkbox_key, True)
                             checked = st.checkbox(
                             f"{college.name} ({len(college.courses)} courses)", value=checked,
@@ -264,10 +388,7 @@ if supabase_url and supabase_key:
                                     push_status.text(f"📤 Pushing: {college_name} ({current}/{total})")
                                     push_progress.progress(current / total)
 
-                                loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(loop)
-                                results = loop.run_until_complete(supabase.push_colleges_and_courses(all_colleges, progress_callback))
-                                loop.close()
+                                results = run_async(supabase.push_colleges_and_courses(all_colleges, progress_callback))
                                 push_status.empty()
                                 push_progress.empty()
                                 st.success(f"✅ Successfully pushed {len(all_colleges)} saved colleges to staging!")
@@ -282,8 +403,14 @@ if supabase_url and supabase_key:
                 st.error(f"❌ Error fetching search criteria: {e}")
 if api_key:
     try:
-        engine = CollegeDiscoveryEngine(api_key=api_key, model=model)
-        validator = EvidenceValidator(delay=validation_delay)
+        engine = CollegeDiscoveryEngine(api_key=api_key, model=model,
+                                        max_concurrent_batches=max_parallel_batches,
+                                        use_cache=use_llm_cache,
+                                        adaptive_batching=adaptive_batching,
+                                        structured_output=structured_output)
+        validator = EvidenceValidator(delay=validation_delay, max_concurrent=max_parallel_validations,
+                                      use_http_cache=use_http_cache,
+                                      use_validation_store=reuse_validation)
     except Exception as e:
         st.error(f"❌ Error initializing Gemini engine: {e}")
         st.stop()
@@ -381,8 +508,6 @@ if st.button("Run Discovery", type="primary", use_container_width=True):
         step3_container = st.container()
         
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
             
             with step1_container:
                 st.markdown("---")
@@ -390,111 +515,106 @@ if st.button("Run Discovery", type="primary", use_container_width=True):
                 step1_status = st.empty()
                 step1_status.text(f"🔍 Searching for colleges in {location}...")
             
-            async def discover_colleges_with_custom_prompt():
-                """Use custom edited prompt if available, otherwise use default"""
-                try:
-                    prompt_to_use = st.session_state.get("college_prompt")
-                    if not prompt_to_use:
-                        prompt_to_use = engine.create_college_list_prompt(location)
-                    
-                    content = await engine._call_gemini(prompt_to_use, max_tokens=6000)
-                    # 👇 Add this
-                    print("\n===== Gemini Raw Output Start =====\n")
-                    print(content)
-                    print("\n===== Gemini Raw Output End =====\n")
-
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                    
-                    if not json_match:
-                        raise ValueError("No valid JSON found in response")
-
-                    repaired_json_str = repair_json(json_match.group())
-                    data = json.loads(repaired_json_str)
-
-                    return engine._parse_colleges_basic(data, location)
-
-                except Exception as e:
-                    print(f"Error in college list discovery: {e}")
-                    return []
-            
-            colleges = loop.run_until_complete(discover_colleges_with_custom_prompt())
-            
-            if not colleges:
-                step1_status.error("❌ No colleges found. Please try a different location.")
-                st.stop()
-            
-            step1_status.success(f"✅ Found {len(colleges)} colleges with detailed information!")
-            
             with step2_container:
                 st.markdown("---")
-                st.subheader(f"Step 2: Batch Discovering Courses ({batch_size} colleges/batch)")
+                st.subheader(f"Step 2: Batch Discovering Courses (up to {batch_size} colleges/batch)")
                 step2_progress = st.progress(0)
                 step2_status = st.empty()
-                
-                total_batches = (len(colleges) + batch_size - 1) // batch_size
-                step2_status.text(f"Processing {total_batches} batches...")
-                
-                async def discover_all_courses_batch():
-                    colleges_with_courses = []
-                    
-                    for i in range(0, len(colleges), batch_size):
-                        batch = colleges[i:i+batch_size]
-                        batch_num = i // batch_size + 1
-                        
-                        step2_status.text(
-                            f"Batch {batch_num}/{total_batches}: Processing {len(batch)} colleges..."
-                        )
-                        step2_progress.progress(batch_num / total_batches)
-                        
-                        batch_results = await engine._discover_batch_courses(batch, career_path)
-                        colleges_with_courses.extend(batch_results)
-                    
-                    return colleges_with_courses
-                
-                colleges = loop.run_until_complete(discover_all_courses_batch())
+            
+            with step3_container:
+                st.markdown("---")
+                st.subheader("Step 3: Validating & Staging Colleges")
+                step3_status = st.empty()
+                step3_status.text("⏳ Colleges are validated as soon as their courses arrive...")
+            
+            validator.delay = validation_delay
+            pipeline = DiscoveryPipeline(
+                engine,
+                validator=validator if enable_validation else None,
+                supabase=SupabaseIntegration(supabase_url, supabase_key) if auto_push else None
+            )
+            batches_done = {"count": 0}
+            stage_counts = {"validated": 0, "staged": 0}
+
+            def stage_summary():
+                """Status text for the enabled stages only, e.g. 'Pushed 2 to staging' without validation"""
+                parts = []
+                if enable_validation:
+                    parts.append(f"validated {stage_counts['validated']} colleges")
+                if auto_push:
+                    parts.append(f"pushed {stage_counts['staged']} to staging")
+                summary = ", ".join(parts)
+                return summary[:1].upper() + summary[1:]
+
+            def pipeline_progress_callback(event, data):
+                """Stages run concurrently, so every status line updates live"""
+                if event == "step1_college_found":
+                    step1_status.text(f"🔍 Found {data['count']} colleges so far... (latest: {data['name']})")
+                elif event == "step1_complete":
+                    step1_status.success(f"✅ Found {data['count']} colleges with detailed information!")
+                elif event == "step2_batch_progress":
+                    batches_done["count"] = data["completed"]
+                    step2_status.text(
+                        f"Batch {data['completed']}/{data['total_batches']} done "
+                        f"(batch #{data['batch']}, {data['colleges_in_batch']} colleges)..."
+                    )
+                    step2_progress.progress(data['completed'] / data['total_batches'])
+                elif event == "college_validated":
+                    stage_counts["validated"] = data["count"]
+                elif event == "college_staged":
+                    stage_counts["staged"] = data["count"]
+                if event in ("college_validated", "college_staged"):
+                    step3_status.text(f"🔐 {stage_summary()} (latest: {data['name']})")
+            
+            prompt_to_use = st.session_state.get("college_prompt")
+            if not prompt_to_use:
+                prompt_to_use = engine.create_college_list_prompt(location)
+            
+            result = run_async(pipeline.run(
+                location,
+                career_path,
+                batch_size=batch_size,
+                max_concurrent_batches=max_parallel_batches,
+                college_prompt=prompt_to_use,
+                progress_callback=pipeline_progress_callback
+            ))
+            colleges = result['colleges']
+            
+            if batches_done["count"] == 0:
+                step1_status.error("❌ No colleges found. Please try a different location.")
+                st.stop()
             
             total_courses = sum(len(c.courses) for c in colleges)
+            step2_progress.progress(1.0)
             step2_status.success(f"✅ Discovered {total_courses} courses across {len(colleges)} colleges!")
+            parse_stats = engine.parse_stats
+            st.caption(
+                f"🧾 JSON parsing: {parse_stats['direct']} direct, {parse_stats['extracted']} extracted, "
+                f"{parse_stats['repaired']} repaired, {parse_stats['failed']} failed"
+            )
             
-            single_call_estimate = len(colleges)
-            batch_calls = (len(colleges) + batch_size - 1) // batch_size
-            savings = ((single_call_estimate - batch_calls) / single_call_estimate) * 100
-            st.info(f"💡 **API Call Optimization:** Used {batch_calls} calls instead of {single_call_estimate} (saved {savings:.0f}%!)")
-            
-            if career_path:
-                original_count = len(colleges)
-                colleges = [c for c in colleges if len(c.courses) > 0]
-                if len(colleges) < original_count:
-                    st.info(f"ℹ️ Filtered to {len(colleges)} colleges with {career_path}-related courses")
+            if career_path and colleges:
+                st.info(f"ℹ️ Showing {len(colleges)} colleges with {career_path}-related courses")
             
-            if enable_validation and colleges:
-                with step3_container:
-                    st.markdown("---")
-                    st.subheader("Step 3: Validating Colleges")
-                    
-                    validator.delay = validation_delay
-                    val_progress = st.progress(0)
-                    val_status = st.empty()
-                    
-                    async def validate_with_progress():
-                        validated = []
-                        for i, college in enumerate(colleges):
-                            val_status.text(f"🔐 Validating: {college.name} ({i+1}/{len(colleges)})")
-                            val_progress.progress((i + 1) / len(colleges))
-                            
-                            result = await validator.validate_colleges([college])
-                            validated.extend(result)
-                        
-                        return validated
-                    
-                    try:
-                        colleges = loop.run_until_complete(validate_with_progress())
-                        val_status.success("✅ Validation completed!")
-                    except Exception as e:
-                        st.warning(f"⚠️ Validation encountered issues: {e}")
-                        st.info("Proceeding with unvalidated data...")
+            if enable_validation or auto_push:
+                step3_status.success(f"✅ {stage_summary()}")
+                if enable_validation and validator.stats['reused']:
+                    st.caption(f"♻️ Reused {validator.stats['reused']} recent validation results, "
+                               f"validated {validator.stats['validated']} afresh")
+            else:
+                step3_status.info("ℹ️ Validation disabled")
             
-            loop.close()
+            push_results = result['push_results']
+            if push_results:
+                st.info(
+                    f"📤 Staging: {push_results['colleges_inserted']} colleges, "
+                    f"{push_results['courses_inserted']} courses, "
+                    f"{push_results['relationships_created']} links"
+                )
+                if push_results['errors']:
+                    with st.expander(f"⚠️ {len(push_results['errors'])} staging errors"):
+                        for error in push_results['errors'][:10]:
+                            st.text(error)
             
             st.session_state["colleges"] = colleges
             st.session_state["location"] = location
@@ -571,13 +691,10 @@ if "colleges" in st.session_state:
                     def progress_callback(current, total, college_name):
                         push_status.text(f"📤 Pushing: {college_name} ({current}/{total})")
                         push_progress.progress(current / total)
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
                 
-                    results = loop.run_until_complete(
+                    results = run_async(
                         supabase.push_colleges_and_courses(st.session_state["selected_colleges"], progress_callback))
                 
-                    loop.close()
                 
                     push_status.empty()
                     push_progress.empty()
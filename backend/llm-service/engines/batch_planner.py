@@ -0,0 +1,68 @@
+import os
+import math
+import threading
+from typing import Dict, List, Optional
+from engines.normalization import normalize_name
+from models.college import College
+
+
+class CourseBatchPlanner:
+    """
+    Sizes course-discovery batches from an output-token budget.
+
+    Keeps a running estimate (exponential moving average) of output tokens
+    per college, learned from previous responses and tracked separately per
+    stream filter, since "all courses" answers are much longer than
+    stream-filtered ones. Batches are packed so the expected output fits
+    within `safety_margin` of `max_output_tokens`.
+    """
+
+    def __init__(self, max_output_tokens: int = None, initial_tokens_per_college: float = 1500.0,
+                 safety_margin: float = 0.8, smoothing: float = 0.3):
+        self.max_output_tokens = max_output_tokens or int(os.getenv("LLM_BATCH_MAX_OUTPUT_TOKENS", "10000"))
+        self.initial_tokens_per_college = initial_tokens_per_college
+        self.safety_margin = safety_margin
+        self.smoothing = smoothing
+        self._estimates: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def tokens_per_college(self, career_path: str = None) -> float:
+        return self._estimates.get(normalize_name(career_path or ""), self.initial_tokens_per_college)
+
+    def batch_size_for(self, career_path: str = None, max_batch_size: Optional[int] = None) -> int:
+        """How many colleges are expected to fit in one response"""
+        budget = self.max_output_tokens * self.safety_margin
+        size = max(1, math.floor(budget / self.tokens_per_college(career_path)))
+        return min(size, max_batch_size) if max_batch_size else size
+
+    def plan(self, colleges: List[College], career_path: str = None,
+             max_batch_size: Optional[int] = None) -> List[List[College]]:
+        size = self.batch_size_for(career_path, max_batch_size)
+        return [colleges[i:i+size] for i in range(0, len(colleges), size)]
+
+    def record(self, career_path: str, colleges_returned: int, output_tokens: Optional[int]):
+        """Learn from a complete (non-truncated) response"""
+        if not output_tokens or colleges_returned <= 0:
+            return
+        observed = output_tokens / colleges_returned
+        key = normalize_name(career_path or "")
+        with self._lock:
+            previous = self._estimates.get(key)
+            if previous is None:
+                self._estimates[key] = observed
+            else:
+                self._estimates[key] = (1 - self.smoothing) * previous + self.smoothing * observed
+
+
+_model_planners: Dict[str, CourseBatchPlanner] = {}
+_model_planners_lock = threading.Lock()
+
+
+def get_model_batch_planner(model: str) -> CourseBatchPlanner:
+    """Return the process-wide planner for `model`, so learned estimates outlive each engine"""
+    with _model_planners_lock:
+        planner = _model_planners.get(model)
+        if planner is None:
+            planner = CourseBatchPlanner()
+            _model_planners[model] = planner
+        return planner
@@ -0,0 +1,44 @@
+import os
+from typing import Dict, List, Optional
+from engines.cache_store import SQLiteCache, hash_key
+from engines.normalization import college_key, normalize_name
+from models.college import College
+
+
+class CollegeCourseCache:
+    """
+    Remembers the raw course dicts the LLM returned for each college so that
+    overlapping searches (e.g. the same stream in a neighbouring city) only
+    ask about colleges that have not been seen within `freshness_seconds`.
+
+    Entries are per stream: the model filters courses by stream and the
+    course dicts carry no stream label, so an all-streams entry cannot be
+    narrowed to one stream (or stream entries combined into all streams).
+    """
+
+    def __init__(self, cache: SQLiteCache, freshness_seconds: float):
+        self.cache = cache
+        self.freshness_seconds = freshness_seconds
+
+    @classmethod
+    def from_env(cls) -> "CollegeCourseCache":
+        freshness_seconds = float(os.getenv("LLM_COURSE_CACHE_DAYS", "30")) * 86400
+        cache = SQLiteCache(
+            os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3")),
+            table="college_courses",
+            ttl_seconds=freshness_seconds,
+            max_entries=int(os.getenv("LLM_COURSE_CACHE_MAX_ENTRIES", "50000"))
+        )
+        return cls(cache, freshness_seconds)
+
+    def _key(self, college: College, career_path: Optional[str]) -> str:
+        return hash_key(college_key(college.name, college.website, college.city),
+                        normalize_name(career_path or ""))
+
+    def get(self, college: College, career_path: str = None) -> Optional[List[Dict]]:
+        """Cached raw course dicts for `college`, or None on a miss/stale entry"""
+        entry = self.cache.get(self._key(college, career_path), max_age=self.freshness_seconds)
+        return None if entry is None else entry["courses"]
+
+    def put(self, college: College, career_path: str, courses: List[Dict]):
+        self.cache.set(self._key(college, career_path), {"college_name": college.name, "courses": courses})
@@ -0,0 +1,139 @@
+import os
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from models.college import Course
+from engines.supabase_writer import execute, execute_batches
+
+
+@dataclass
+class CourseResolution:
+    """Outcome of resolving a batch of course names to st_course ids"""
+    ids: Dict[str, str] = field(default_factory=dict)
+    upserted: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+class CourseResolver:
+    """
+    In-memory st_course name -> id map, bulk-loaded once (paged) and kept warm.
+
+    `resolve` answers known names from memory and upserts the rest on the
+    `name` natural key in concurrent batches, so a course another process has
+    added meanwhile is matched rather than duplicated. The map is reloaded
+    after `max_age_seconds` or when `invalidate` is called (e.g. staging was
+    cleared, or a write hit a foreign key error because a cached id is gone).
+    If the map cannot be loaded, every course is upserted instead.
+    """
+
+    def __init__(self, client, page_size: int = 1000, batch_size: int = 500,
+                 max_age_seconds: float = 3600.0, clock=time.monotonic):
+        self.client = client
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._ids: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None and self._clock() - self._loaded_at < self.max_age_seconds
+
+    async def load(self):
+        """Page through every st_course row, replacing the in-memory map"""
+        ids: Dict[str, str] = {}
+        start = 0
+        while True:
+            response = await execute(self.client.table('st_course')
+                                     .select('id,name')
+                                     .order('id')
+                                     .range(start, start + self.page_size - 1))
+            rows = response.data or []
+            for row in rows:
+                ids.setdefault(row['name'], row['id'])
+            if len(rows) < self.page_size:
+                break
+            start += self.page_size
+        with self._lock:
+            self._ids = ids
+            self._loaded_at = self._clock()
+        print(f"Loaded {len(ids)} staging course ids")
+
+    def invalidate(self):
+        with self._lock:
+            self._ids = {}
+            self._loaded_at = None
+
+    async def resolve(self, courses: List[Course], build_row: Callable[[Course], Dict]) -> CourseResolution:
+        """Ids for every course name, upserting unknown courses with `build_row`"""
+        if not self.loaded:
+            try:
+                await self.load()
+            except Exception as e:
+                # Upserting every course is still correct, just not cheaper
+                print(f"Could not load staging course ids, upserting all courses: {e}")
+                self.invalidate()
+
+        resolution = CourseResolution()
+        missing: Dict[str, Course] = {}
+        with self._lock:
+            for course in courses:
+                course_id = self._ids.get(course.name)
+                if course_id:
+                    resolution.ids[course.name] = course_id
+                else:
+                    missing.setdefault(course.name, course)
+
+        batches = await execute_batches(
+            lambda chunk: self.client.table('st_course').upsert(chunk, on_conflict='name'),
+            [build_row(course) for course in missing.values()],
+            self.batch_size
+        )
+        for chunk, outcome in batches:
+            if isinstance(outcome, Exception):
+                if is_foreign_key_error(outcome):
+                    self.invalidate()
+                print(f"Error upserting {len(chunk)} courses to staging: {outcome}")
+                resolution.errors.append(f"Courses {chunk[0]['name']}..{chunk[-1]['name']}: {str(outcome)}")
+                written = {}
+            else:
+                written = {row['name']: row['id'] for row in outcome.data or []}
+            self._remember(written)
+            resolution.ids.update(written)
+            for row in chunk:
+                (resolution.upserted if row['name'] in written else resolution.failed).append(row['name'])
+        return resolution
+
+    def _remember(self, ids: Dict[str, str]):
+        with self._lock:
+            self._ids.update(ids)
+
+
+def is_foreign_key_error(error: Exception) -> bool:
+    """True for Postgres foreign key violations (SQLSTATE 23503)"""
+    return getattr(error, 'code', None) == '23503' or 'foreign key' in str(error).lower()
+
+
+_course_resolvers: Dict[Tuple[str, str], CourseResolver] = {}
+_course_resolvers_lock = threading.Lock()
+
+
+def get_course_resolver(url: str, key: str, client, batch_size: int = 500) -> CourseResolver:
+    """Process-wide resolver per Supabase project, so the map stays warm across pushes"""
+    with _course_resolvers_lock:
+        resolver = _course_resolvers.get((url, key))
+        if resolver is None:
+            resolver = CourseResolver(
+                client,
+                batch_size=batch_size,
+                max_age_seconds=float(os.getenv("SUPABASE_COURSE_CACHE_MINUTES", "60")) * 60
+            )
+            _course_resolvers[(url, key)] = resolver
+        return resolver
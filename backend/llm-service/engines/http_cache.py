@@ -0,0 +1,206 @@
+import os
+import re
+import time
+import codecs
+import aiohttp
+from dataclasses import dataclass
+from typing import AsyncContextManager, Callable, Dict, Optional, Tuple
+from engines.cache_store import SQLiteCache, hash_key
+
+_MAX_AGE_PATTERN = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+DEFAULT_MAX_BYTES = 512 * 1024
+CHUNK_SIZE = 16 * 1024
+
+
+def is_html(content_type: str) -> bool:
+    """True for HTML responses (and for servers that send no Content-Type)"""
+    return not content_type or "html" in content_type.lower()
+
+
+async def read_html(response: aiohttp.ClientResponse, max_bytes: int = DEFAULT_MAX_BYTES,
+                    on_chunk: Callable[[str], bool] = None) -> Tuple[Optional[str], bool]:
+    """
+    Stream an HTML body in chunks, keeping at most `max_bytes` of it.
+
+    Non-HTML bodies (PDFs, images) are not read at all. `on_chunk` receives
+    each decoded chunk and may return True to stop reading early.
+
+    Returns:
+        (text, complete): text is None for non-HTML content; complete is
+        False when on_chunk stopped the read before the cap or end of body
+    """
+    if not is_html(response.headers.get("Content-Type", "")):
+        return None, True
+
+    try:
+        decoder = codecs.getincrementaldecoder(response.charset or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    parts = []
+    size = 0
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        chunk = chunk[:max_bytes - size]
+        size += len(chunk)
+        text = decoder.decode(chunk)
+        parts.append(text)
+        if on_chunk and on_chunk(text):
+            return "".join(parts), False
+        if size >= max_bytes:
+            break
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), True
+
+
+@dataclass
+class HTTPResult:
+    """Status and decoded body of a (possibly cached) GET"""
+    url: str
+    status: int
+    text: Optional[str] = None
+    content_type: str = ""
+    from_cache: bool = False
+    complete: bool = True
+    # Size of the whole page (Content-Length), even when only part was read
+    content_length: Optional[int] = None
+
+
+def content_length(headers, text: Optional[str]) -> Optional[int]:
+    """Content-Length header as an int, falling back to the size of `text`"""
+    try:
+        return int(headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        return len(text.encode("utf-8")) if text is not None else None
+
+
+class HTTPCache:
+    """
+    On-disk HTTP cache for validation fetches.
+
+    Fresh entries (within Cache-Control max-age) are served without a request;
+    stale ones are revalidated with If-None-Match / If-Modified-Since, so an
+    unchanged page costs a 304 instead of a full download. Missing pages
+    (404/410) are remembered for `negative_ttl_seconds` so probes for paths a
+    site does not have are not repeated. Bodies whose read was stopped early
+    are stored too, marked incomplete, so their validators are still sent.
+    Size is bounded by the underlying SQLiteCache (LRU).
+    """
+
+    NEGATIVE_STATUSES = (404, 410)
+
+    def __init__(self, cache: SQLiteCache, negative_ttl_seconds: float = 86400.0, clock=time.time):
+        self.cache = cache
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._clock = clock
+        self.stats = {"fresh": 0, "revalidated": 0, "fetched": 0}
+
+    @classmethod
+    def from_env(cls) -> "HTTPCache":
+        cache = SQLiteCache(
+            os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3")),
+            table="http_responses",
+            ttl_seconds=float(os.getenv("VALIDATION_HTTP_CACHE_DAYS", "30")) * 86400,
+            max_bytes=int(float(os.getenv("VALIDATION_HTTP_CACHE_MAX_MB", "100")) * 1024 * 1024)
+        )
+        return cls(cache)
+
+    def _key(self, url: str) -> str:
+        return hash_key("GET", url)
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        return self.cache.get(self._key(url))
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return self._clock() - entry["stored_at"] < entry["max_age"]
+
+    async def fetch(self, session: aiohttp.ClientSession, url: str,
+                    request_slot: Callable[[], AsyncContextManager] = None,
+                    max_bytes: int = DEFAULT_MAX_BYTES, on_chunk: Callable[[str], bool] = None,
+                    use_cached: bool = True) -> HTTPResult:
+        """
+        GET `url`, answering from the cache or revalidating when possible.
+
+        `request_slot()` (an async context manager, e.g. a per-domain rate
+        limiter slot) is held around the request only when one actually goes
+        out. Downloads are streamed through
+        `read_html` with `max_bytes` / `on_chunk`; a body cut short by on_chunk
+        is cached with complete=False. use_cached=False skips the cached entry
+        and downloads the page again (e.g. when a partial body is not enough).
+        """
+        entry = self.lookup(url) if use_cached else None
+        if entry is not None and self.is_fresh(entry):
+            self.stats["fresh"] += 1
+            return self._result(url, entry)
+        if request_slot:
+            async with request_slot():
+                return await self._download(session, url, entry, max_bytes, on_chunk)
+        return await self._download(session, url, entry, max_bytes, on_chunk)
+
+    async def _download(self, session: aiohttp.ClientSession, url: str, entry: Optional[Dict],
+                        max_bytes: int, on_chunk: Callable[[str], bool]) -> HTTPResult:
+        """Conditional GET against `entry` (if any), updating the cache with the outcome"""
+        headers = {}
+        if entry is not None and entry["status"] == 200:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        async with session.get(url, allow_redirects=True, headers=headers) as response:
+            if response.status == 304 and entry is not None:
+                self.stats["revalidated"] += 1
+                entry["stored_at"] = self._clock()
+                entry["max_age"] = self._max_age(response.headers, entry["max_age"])
+                self.cache.set(self._key(url), entry)
+                return self._result(url, entry)
+
+            self.stats["fetched"] += 1
+            text, complete = None, True
+            if response.status == 200:
+                text, complete = await read_html(response, max_bytes, on_chunk)
+            cache_control = response.headers.get("Cache-Control", "")
+            result = HTTPResult(url, response.status, text, response.headers.get("Content-Type", ""),
+                                complete=complete, content_length=content_length(response.headers, text))
+
+            if "no-store" not in cache_control.lower():
+                max_age = self._max_age(response.headers, 0.0)
+                # Without a validator or max-age the body could never be reused
+                reusable = max_age > 0 or "ETag" in response.headers or "Last-Modified" in response.headers
+                if response.status == 200 and reusable:
+                    self._store(url, result, response.headers, max_age)
+                elif response.status in self.NEGATIVE_STATUSES:
+                    self._store(url, result, response.headers, self.negative_ttl_seconds)
+            return result
+
+    def remember_missing(self, url: str, status: int, headers=None):
+        """Record a 404/410 learned another way (e.g. from a HEAD probe) in the negative cache"""
+        if status in self.NEGATIVE_STATUSES:
+            self._store(url, HTTPResult(url, status), headers or {}, self.negative_ttl_seconds)
+
+    def _store(self, url: str, result: HTTPResult, headers, max_age: float):
+        self.cache.set(self._key(url), {
+            "status": result.status,
+            "text": result.text,
+            "content_type": result.content_type,
+            "complete": result.complete,
+            "content_length": result.content_length,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": self._clock(),
+            "max_age": max_age,
+        })
+
+    @staticmethod
+    def _max_age(headers, default: float) -> float:
+        cache_control = headers.get("Cache-Control", "")
+        if "no-cache" in cache_control.lower():
+            return 0.0
+        match = _MAX_AGE_PATTERN.search(cache_control)
+        return float(match.group(1)) if match else default
+
+    @staticmethod
+    def _result(url: str, entry: Dict) -> HTTPResult:
+        return HTTPResult(url, entry["status"], entry.get("text"), entry.get("content_type", ""),
+                          from_cache=True, complete=entry.get("complete", True),
+                          content_length=entry.get("content_length"))
@@ -0,0 +1,87 @@
+import os
+import asyncio
+import threading
+import weakref
+import aiohttp
+from typing import Dict, Optional
+
+
+class SessionFactory:
+    """
+    Long-lived aiohttp sessions, one per event loop.
+
+    Every caller on the same loop shares one connection pool, so DNS lookups
+    (ttl_dns_cache), TLS handshakes and keep-alive connections carry over
+    between validator calls. Sessions cannot outlive or cross event loops;
+    reuse across Streamlit reruns therefore needs the app to keep its loop
+    (see app.py `get_event_loop`).
+    """
+
+    def __init__(self, limit: int = 64, limit_per_host: int = 4, ttl_dns_cache: int = 300,
+                 keepalive_timeout: float = 30.0, timeout: float = 30.0,
+                 headers: Optional[Dict[str, str]] = None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.ttl_dns_cache = ttl_dns_cache
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, headers: Optional[Dict[str, str]] = None) -> "SessionFactory":
+        return cls(
+            limit=int(os.getenv("HTTP_CONNECTOR_LIMIT", "64")),
+            limit_per_host=int(os.getenv("HTTP_CONNECTOR_LIMIT_PER_HOST", "4")),
+            ttl_dns_cache=int(os.getenv("HTTP_DNS_CACHE_TTL", "300")),
+            keepalive_timeout=float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30")),
+            headers=headers
+        )
+
+    def create_session(self) -> aiohttp.ClientSession:
+        """A new session with this factory's connector settings (caller closes it)"""
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.ttl_dns_cache,
+                use_dns_cache=True,
+                keepalive_timeout=self.keepalive_timeout
+            )
+        )
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """The shared session for the running event loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None or session.closed:
+                session = self.create_session()
+                self._sessions[loop] = session
+            return session
+
+    async def close(self):
+        """Close the running loop's shared session (e.g. before the loop is closed)"""
+        with self._lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+_validation_sessions: Optional[SessionFactory] = None
+_validation_sessions_lock = threading.Lock()
+
+
+def get_validation_session_factory() -> SessionFactory:
+    """Process-wide session factory used by EvidenceValidator"""
+    global _validation_sessions
+    with _validation_sessions_lock:
+        if _validation_sessions is None:
+            _validation_sessions = SessionFactory.from_env(
+                headers={'User-Agent': 'Educational Data Validator 1.0'}
+            )
+        return _validation_sessions
@@ -0,0 +1,87 @@
+import json
+from typing import Dict, List
+from json_repair import repair_json
+
+
+class IncrementalObjectParser:
+    """
+    Incremental parser for streamed LLM JSON output.
+
+    Feed text chunks as they arrive; every object that is a direct element of
+    the first JSON array in the stream (e.g. each entry of `"colleges": [...]`)
+    is returned as soon as its closing brace is seen. Text before the first
+    bracket, such as a ```json fence, is ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None
+        self._item_start = None
+        self.items_emitted = 0
+        self.items_repaired = 0
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consume a chunk and return any objects completed by it"""
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                if self._stack:
+                    self._in_string = True
+            elif char in "{[":
+                self._stack.append(char)
+                if char == "[" and self._array_depth is None:
+                    self._array_depth = len(self._stack)
+                elif (char == "{" and self._array_depth is not None
+                        and len(self._stack) == self._array_depth + 1):
+                    self._item_start = i
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if (char == "}" and self._item_start is not None
+                        and len(self._stack) == self._array_depth):
+                    item = self._load(buffer[self._item_start:i + 1])
+                    if isinstance(item, dict):
+                        completed.append(item)
+                    self._item_start = None
+                elif (char == "]" and self._array_depth is not None
+                        and len(self._stack) < self._array_depth):
+                    # The item array closed. If it held no objects (e.g. a list of
+                    # tags before "colleges"), wait for the next array instead.
+                    self._array_depth = None if self.items_emitted + len(completed) == 0 else -1
+
+        # Keep only the unfinished item (if any) so the buffer stays small
+        keep_from = self._item_start if self._item_start is not None else len(buffer)
+        self._buffer = buffer[keep_from:]
+        if self._item_start is not None:
+            self._item_start = 0
+        self._pos = len(self._buffer)
+
+        self.items_emitted += len(completed)
+        return completed
+
+    def _load(self, raw: str):
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            self.items_repaired += 1
+            try:
+                return json.loads(repair_json(raw))
+            except Exception:
+                return None
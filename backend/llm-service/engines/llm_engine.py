@@ -1,22 +1,99 @@
 import os
 import json
 import re
-from typing import List, Dict, Optional
+import math
+import asyncio
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from datetime import datetime
 from models.college import College, Course, VerificationStatus, EvidenceStatus
+from engines.batch_planner import CourseBatchPlanner, get_model_batch_planner
+from engines.cache_store import SQLiteCache, hash_key
+from engines.course_cache import CollegeCourseCache
+from engines.json_stream import IncrementalObjectParser
+from engines.normalization import name_similarity, normalize_name, website_domain
+from engines.response_schemas import batch_course_schema, college_list_schema
+from engines.rate_limiter import (
+    GeminiRateLimiter, RetryPolicy, get_model_rate_limiter, get_retry_after, is_retryable_error
+)
 import google.generativeai as genai
 from json_repair import repair_json
 
+
+@dataclass
+class LLMResponse:
+    """Text of a Gemini response plus the metadata needed for batching decisions"""
+    text: str
+    finish_reason: Optional[str] = None
+    output_tokens: Optional[int] = None
+    # Set on fresh responses while caching is on; see _cache_response
+    cache_key: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason == "MAX_TOKENS"
+
+
 class CollegeDiscoveryEngine:
-    def __init__(self, api_key: str, model: str = None):
+    # How many times colleges missing from a batch response are re-asked
+    MAX_REASK_ROUNDS = 2
+    # Name similarity needed to accept a fuzzy match / to trust an echoed index
+    FUZZY_MATCH_THRESHOLD = 0.6
+    INDEX_MATCH_MIN_SIMILARITY = 0.3
+
+    def __init__(self, api_key: str, model: str = None, max_concurrent_batches: int = None,
+                 rate_limiter: GeminiRateLimiter = None, retry_policy: RetryPolicy = None,
+                 response_cache: SQLiteCache = None, course_cache: CollegeCourseCache = None,
+                 use_cache: bool = True, batch_planner: CourseBatchPlanner = None,
+                 adaptive_batching: bool = True, structured_output: bool = None):
         """Initialize Gemini client"""
         self.model = model or self._get_default_model()
+        self.max_concurrent_batches = max_concurrent_batches or self._get_default_max_concurrent_batches()
+        # Shared per model so concurrent batches (and engines) draw from one quota
+        self.rate_limiter = rate_limiter or get_model_rate_limiter(self.model)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.use_cache = use_cache
+        self._response_cache = response_cache
+        self._course_cache = course_cache
+        # Shared per model, so token estimates survive engines rebuilt on every app rerun
+        self.batch_planner = batch_planner or get_model_batch_planner(self.model)
+        self.adaptive_batching = adaptive_batching
+        # Ask Gemini for schema-constrained JSON; regex + repair stays as the fallback
+        if structured_output is None:
+            structured_output = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+        self.structured_output = structured_output
+        # How each response's JSON was obtained: parsed as-is, cut out of
+        # surrounding text, rebuilt by repair_json, or not at all
+        self.parse_stats = {"direct": 0, "extracted": 0, "repaired": 0, "failed": 0}
         genai.configure(api_key=api_key)
         self.client = genai.GenerativeModel(self.model)
 
     def _get_default_model(self) -> str:
         """Get default Gemini model"""
         return os.getenv("LLM_MODEL", "gemini-2.0-flash-exp")
+
+    @property
+    def response_cache(self) -> SQLiteCache:
+        """Persistent prompt → response cache (created on first use)"""
+        if self._response_cache is None:
+            self._response_cache = SQLiteCache(
+                os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3")),
+                table="prompt_responses",
+                ttl_seconds=float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600,
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024)
+            )
+        return self._response_cache
+
+    @property
+    def course_cache(self) -> CollegeCourseCache:
+        """Per-college course cache shared across locations/streams (created on first use)"""
+        if self._course_cache is None:
+            self._course_cache = CollegeCourseCache.from_env()
+        return self._course_cache
+
+    def _get_default_max_concurrent_batches(self) -> int:
+        """Get default number of course batches allowed in flight at once"""
+        return max(1, int(os.getenv("LLM_MAX_CONCURRENT_BATCHES", "4")))
     def create_college_list_prompt(self, location: str, career_path: str = None, specialization: str = None, university: str = None) -> str:
         if career_path:
             stream_text = f"Include ONLY Stream: {career_path}"
@@ -116,6 +193,7 @@ class CollegeDiscoveryEngine:
         {{
         "colleges": [
             {{
+            "index": 1,
             "college_name": "Exact name from list above",
             "website": "College website",
             "courses": [
@@ -136,6 +214,7 @@ class CollegeDiscoveryEngine:
 
         Important Guidelines:
         - Process ALL {len(colleges)} colleges listed above
+        - For index: use the college's number from the list above
         - For course descriptions: mention curriculum highlights, practical training, industry exposure
         - If uncertain about fees/seats, omit rather than guess
         - Ensure course names are specific and accurate
@@ -146,41 +225,43 @@ class CollegeDiscoveryEngine:
         """
     
     async def discover_colleges(self, location: str, career_path: str = None,
-                                progress_callback=None, batch_size: int = 5) -> List[College]:
+                                progress_callback=None, batch_size: int = 5,
+                                max_concurrent_batches: int = None, stream: bool = False,
+                                college_prompt: str = None) -> List[College]:
         """
         Optimized two-step discovery process with batching:
         Step 1: Discover colleges by location
-        Step 2: Batch process colleges for course discovery (5-10 colleges per API call)
+        Step 2: Batch process colleges for course discovery (5-10 colleges per API call),
+                with up to `max_concurrent_batches` batches in flight
+
+        With stream=True, step 2 batches start as soon as `batch_size`
+        colleges have streamed in, overlapping with the rest of step 1.
         """
 
         if progress_callback:
             progress_callback("step1_start", {"location": location})
 
-        colleges_basic = await self._discover_colleges_list(location)
-
-        if not colleges_basic:
-            return []
-
-        if progress_callback:
-            progress_callback("step1_complete", {"count": len(colleges_basic)})
-
-        colleges_with_courses = []
-        total = len(colleges_basic)
+        if stream:
+            colleges_with_courses = await self._discover_colleges_streaming(
+                location, career_path, progress_callback, batch_size,
+                max_concurrent_batches, college_prompt
+            )
+        else:
+            colleges_basic = await self._discover_colleges_list(location, prompt=college_prompt)
 
-        for i in range(0, total, batch_size):
-            batch = colleges_basic[i:i+batch_size]
-            batch_num = i
-            total_batches = (total + batch_size - 1)
+            if not colleges_basic:
+                return []
 
             if progress_callback:
-                progress_callback("step2_batch_progress", {
-                    "batch": batch_num,
-                    "total_batches": total_batches,
-                    "colleges_in_batch": len(batch)
-                })
-            
-            batch_results = await self._discover_batch_courses(batch, career_path)
-            colleges_with_courses.extend(batch_results)
+                progress_callback("step1_complete", {"count": len(colleges_basic)})
+
+            colleges_with_courses = await self.discover_courses_in_batches(
+                colleges_basic,
+                career_path,
+                batch_size=batch_size,
+                max_concurrent_batches=max_concurrent_batches,
+                progress_callback=progress_callback
+            )
 
         if progress_callback:
             progress_callback("step2_complete", {"count": len(colleges_with_courses)})
@@ -193,67 +274,334 @@ class CollegeDiscoveryEngine:
         
         return colleges_with_courses
 
-    async def _discover_colleges_list(self, location: str) -> List[College]:
-        """Step 1: Discover list of colleges"""
-        prompt = self.create_college_list_prompt(location)
+    async def _discover_colleges_streaming(self, location: str, career_path: str,
+                                           progress_callback, batch_size: int,
+                                           max_concurrent_batches: int = None,
+                                           college_prompt: str = None) -> List[College]:
+        """Run the streaming discovery to completion and return colleges in discovery order"""
+        batches = {}
+        async for batch_num, batch in self.stream_colleges_with_courses(
+                location, career_path, batch_size, max_concurrent_batches,
+                college_prompt, progress_callback):
+            batches[batch_num] = batch
+        return [college for batch_num in sorted(batches) for college in batches[batch_num]]
+
+    async def stream_colleges_with_courses(self, location: str, career_path: str = None,
+                                           batch_size: int = 5, max_concurrent_batches: int = None,
+                                           college_prompt: str = None,
+                                           progress_callback=None) -> AsyncIterator[Tuple[int, List[College]]]:
+        """
+        Stream step 1 and schedule a course batch every `batch_size` colleges,
+        yielding `(batch_num, colleges)` as soon as each batch has its courses.
 
-        try:
-            content = await self._call_gemini(prompt, max_tokens=6000)
-            # 🐞 Debug: print Gemini raw response
-            print("\n================ GEMINI RAW OUTPUT START ================\n")
-            print(content)
-            print("\n================ GEMINI RAW OUTPUT END ==================\n")
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-
-            if not json_match:
-                raise ValueError("No valid JSON found in response")
-            
-            raw_json = json_match.group()
+        Batches are yielded in completion order; batch_num (1-based) gives the
+        discovery order. Up to `max_concurrent_batches` batches run at once.
+        With adaptive batching each batch is sized when it is cut, from the
+        estimates learned so far (including earlier batches of this run).
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrent_batches or self.max_concurrent_batches))
+        finished: asyncio.Queue = asyncio.Queue()
+        tasks = []
+        completed = 0
+
+        async def run_batch(batch_num: int, batch: List[College]):
+            nonlocal completed
+            try:
+                async with semaphore:
+                    await self.discover_courses_in_batches(batch, career_path, batch_size=len(batch),
+                                                           max_concurrent_batches=1)
+                completed += 1
+                if progress_callback:
+                    progress_callback("step2_batch_progress", {
+                        "batch": batch_num,
+                        "completed": completed,
+                        # Grows while step 1 is still streaming
+                        "total_batches": len(tasks),
+                        "colleges_in_batch": len(batch)
+                    })
+            finally:
+                await finished.put((batch_num, batch))
+
+        def schedule(batch: List[College]):
+            tasks.append(asyncio.create_task(run_batch(len(tasks) + 1, batch)))
+
+        async def produce():
+            found = 0
+            pending = []
             try:
-                data = json.loads(raw_json)
-            except json.JSONDecodeError as e:
-                print("Invalid JSON detected. Attempting repair")
-                print(f"JSON error: {e}")
+                async for college in self.stream_colleges_list(location, prompt=college_prompt):
+                    found += 1
+                    pending.append(college)
+                    if progress_callback:
+                        progress_callback("step1_college_found", {"count": found, "name": college.name})
+                    if len(pending) >= self._next_batch_size(career_path, batch_size):
+                        schedule(pending)
+                        pending = []
+            except Exception as e:
+                print(f"Error in college list discovery {e}")
+            finally:
+                if pending:
+                    schedule(pending)
+                if progress_callback:
+                    progress_callback("step1_complete", {"count": found})
+                # Marks the end of scheduling; batches may still be running
+                await finished.put(None)
+
+        producer = asyncio.create_task(produce())
+        list_done = False
+        yielded = 0
+        try:
+            while not list_done or yielded < len(tasks):
+                item = await finished.get()
+                if item is None:
+                    list_done = True
+                    continue
+                yielded += 1
+                yield item
+        finally:
+            for task in [producer, *tasks]:
+                if not task.done():
+                    task.cancel()
+
+    async def discover_courses_in_batches(self, colleges: List[College], career_path: str = None,
+                                          batch_size: int = 5, max_concurrent_batches: int = None,
+                                          progress_callback=None) -> List[College]:
+        """
+        Discover courses for colleges in batches, running up to
+        `max_concurrent_batches` batch calls at once.
+
+        Colleges with fresh entries in the course cache are filled in
+        directly, so batches are assembled only from cache misses. With
+        adaptive batching, `batch_size` is an upper bound and the batch
+        planner packs colleges by expected output tokens; each batch is cut
+        when a slot frees up, so it uses what earlier batches have taught the
+        planner. Results are returned in the same order as the input colleges.
+        The progress callback fires once per finished batch with the
+        "step2_batch_progress" event.
+        """
+        if not colleges:
+            return []
 
-                repaired = repair_json(raw_json)
-                data = json.loads(repaired)
+        pending = self._apply_cached_courses(colleges, career_path)
+        if not pending:
+            return list(colleges)
+
+        limit = max(1, max_concurrent_batches or self.max_concurrent_batches)
+        started = 0
+        completed = 0
+
+        async def run_batches():
+            nonlocal started, completed
+            while pending:
+                size = self._next_batch_size(career_path, batch_size)
+                batch = pending[:size]
+                del pending[:size]
+                started += 1
+                batch_num = started
+                await self._discover_batch_courses(batch, career_path)
+
+                completed += 1
+                if progress_callback:
+                    # Re-estimated as batches finish and the planner learns
+                    batches_left = math.ceil(len(pending) / self._next_batch_size(career_path, batch_size))
+                    progress_callback("step2_batch_progress", {
+                        "batch": batch_num,
+                        "completed": completed,
+                        "total_batches": started + batches_left,
+                        "colleges_in_batch": len(batch)
+                    })
+
+        await asyncio.gather(*(run_batches() for _ in range(limit)))
+
+        # Batches update the college objects in place, so input order is preserved
+        return list(colleges)
+
+    def _next_batch_size(self, career_path: str, batch_size: int) -> int:
+        """Size of the next batch to cut; `batch_size` caps it under adaptive batching"""
+        if self.adaptive_batching:
+            return self.batch_planner.batch_size_for(career_path, max_batch_size=batch_size)
+        return batch_size
+
+    def _apply_cached_courses(self, colleges: List[College], career_path: str = None) -> List[College]:
+        """Fill courses from the course cache and return the colleges that still need the LLM"""
+        if not self.use_cache:
+            return list(colleges)
+
+        hits = 0
+        misses = []
+        for college in colleges:
+            courses = self.course_cache.get(college, career_path)
+            if courses is None:
+                misses.append(college)
+                continue
+            hits += 1
+            self._merge_batch_results(
+                [college], {"colleges": [{"college_name": college.name, "courses": courses}]}
+            )
 
-            return self._parse_colleges_basic(data, location)
-        
+        if hits:
+            print(f"Course cache: {hits} hit(s), {len(misses)} miss(es)")
+        return misses
+
+    async def _discover_colleges_list(self, location: str, prompt: str = None) -> List[College]:
+        """Step 1: Discover list of colleges"""
+        colleges = []
+        try:
+            async for college in self.stream_colleges_list(location, prompt=prompt):
+                colleges.append(college)
         except Exception as e:
             print(f"Error in college list discovery {e}")
-            return []
+        return colleges
+
+    async def stream_colleges_list(self, location: str, prompt: str = None) -> AsyncIterator[College]:
+        """
+        Step 1 (streaming): yield each College as soon as its JSON object
+        closes in the Gemini output stream.
+
+        If the incremental parser cannot find any college objects (e.g. the
+        model wrapped the list unexpectedly), the full response is parsed
+        once with regex + repair as before.
+        """
+        prompt = prompt or self.create_college_list_prompt(location)
+        parser = IncrementalObjectParser()
+        chunks = []
+        streamed = LLMResponse(text="")
+
+        response_schema = college_list_schema() if self.structured_output else None
+        async for chunk in self._stream_gemini(prompt, max_tokens=6000, response_schema=response_schema,
+                                               result=streamed):
+            chunks.append(chunk)
+            for college_data in parser.feed(chunk):
+                for college in self._parse_colleges_basic({"colleges": [college_data]}, location):
+                    yield college
+
+        content = "".join(chunks)
+        # 🐞 Debug: print Gemini raw response
+        print("\n================ GEMINI RAW OUTPUT START ================\n")
+        print(content)
+        print("\n================ GEMINI RAW OUTPUT END ==================\n")
+
+        if parser.items_emitted == 0:
+            data = self._parse_json_response(content)
+            self._cache_response(streamed)
+            for college in self._parse_colleges_basic(data, location):
+                yield college
+        else:
+            self.parse_stats["repaired" if parser.items_repaired else "direct"] += 1
+            self._cache_response(streamed)
+
+    def _parse_json_response(self, content: str) -> Dict:
+        """
+        Parse the JSON object in an LLM response.
+
+        Structured-output responses are plain JSON and parse directly; otherwise
+        the outermost {...} is cut out and, if still invalid, rebuilt with
+        repair_json. Each path is counted in parse_stats.
+        """
+        try:
+            data = json.loads(content)
+            if isinstance(data, dict):
+                self.parse_stats["direct"] += 1
+                return data
+        except json.JSONDecodeError:
+            pass
+
+        json_match = re.search(r'\{.*\}', content, re.DOTALL)
+
+        if not json_match:
+            self.parse_stats["failed"] += 1
+            raise ValueError("No valid JSON found in response")
+
+        raw_json = json_match.group()
+        try:
+            data = json.loads(raw_json)
+            self.parse_stats["extracted"] += 1
+            return data
+        except json.JSONDecodeError as e:
+            print("Invalid JSON detected. Attempting repair")
+            print(f"JSON error: {e}")
+
+        try:
+            data = json.loads(repair_json(raw_json))
+        except Exception:
+            self.parse_stats["failed"] += 1
+            raise
+        self.parse_stats["repaired"] += 1
+        return data
         
     async def _discover_batch_courses(self, colleges: List[College],
-                                      career_path: str = None) -> List[College]:
-        """Step 2: Discover courses for a batch of colleges"""
+                                      career_path: str = None, reask_round: int = 0) -> List[College]:
+        """
+        Step 2: Discover courses for a batch of colleges.
+
+        Colleges missing from the response are re-asked (up to
+        MAX_REASK_ROUNDS times). If the response was cut off at the token
+        limit, the last returned college is treated as incomplete too and the
+        missing colleges are split in half before retrying, so only they are
+        re-queried.
+        """
         prompt = self.create_batch_course_discovery_prompt(colleges, career_path)
 
         try:
-            content = await self._call_gemini(prompt, max_tokens=10000, use_search=True)
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-
-            if not json_match:
-                print(f"No valid JSON found for batch")
-                return colleges
-            
-            raw_json = json_match.group()
-            try:
-                data = json.loads(raw_json)
-            except json.JSONDecodeError as e:
-                print("Invalid JSON detected in batch. Attempting repair")
-                print(f"JSON error: {e}")
-                repaired = repair_json(raw_json)
-                data = json.loads(repaired)
-
-            return self._merge_batch_results(colleges, data)
+            response = await self._call_gemini_with_metadata(
+                prompt, max_tokens=self.batch_planner.max_output_tokens, use_search=True,
+                response_schema=batch_course_schema() if self.structured_output else None
+            )
+            data = self._parse_json_response(response.text)
+            self._cache_response(response)
+            matches = self._match_batch_results(colleges, data)
+            # Unmatched colleges keep what they have, e.g. partial courses from
+            # the truncated response this re-ask is covering
+            for college, result in zip(colleges, matches):
+                if result is not None:
+                    college.courses = self._parse_courses({"courses": result.get("courses", [])},
+                                                          college.website)
+
+            if response.truncated:
+                matched_positions = [i for i, result in enumerate(matches) if result is not None]
+                if matched_positions:
+                    matches[matched_positions[-1]] = None
+            elif response.output_tokens:
+                self.batch_planner.record(career_path, sum(1 for r in matches if r is not None),
+                                          response.output_tokens)
+
+            if self.use_cache:
+                for college, result in zip(colleges, matches):
+                    if result is not None:
+                        self.course_cache.put(college, career_path, result.get("courses", []))
+
+            missing = [college for college, result in zip(colleges, matches) if result is None]
+            # Re-asking the exact same batch would just repeat the same answer
+            can_narrow = len(missing) < len(colleges) or (response.truncated and len(missing) > 1)
+            if missing and can_narrow and reask_round < self.MAX_REASK_ROUNDS:
+                await self._reask_missing(missing, career_path, response.truncated, reask_round)
+
+            return colleges
         
         except Exception as e:
-            print(f"Error discovering batch courses: {e}")
+            names = ", ".join(c.name for c in colleges)
+            print(f"Error discovering batch courses (courses left empty for: {names}): {e}")
             return colleges
-        
-    async def _call_gemini(self, prompt: str, max_tokens: int = 4000, use_search: bool = False) -> str:
-        """Call Gemini API"""
+
+    async def _reask_missing(self, missing: List[College], career_path: str,
+                             truncated: bool, reask_round: int):
+        """Re-query only the colleges a batch response did not (fully) cover"""
+        if truncated and len(missing) > 1:
+            middle = len(missing) // 2
+            sub_batches = [missing[:middle], missing[middle:]]
+        else:
+            sub_batches = [missing]
+
+        print(f"Re-asking {len(missing)} college(s) in {len(sub_batches)} batch(es)"
+              f"{' after truncated response' if truncated else ''}")
+        await asyncio.gather(*(
+            self._discover_batch_courses(batch, career_path, reask_round=reask_round + 1)
+            for batch in sub_batches
+        ))
+
+    def _build_request(self, prompt: str, max_tokens: int, use_search: bool = False,
+                       response_schema: Dict = None):
+        """Return the full prompt text and generation config for a Gemini call"""
         system_msg = "You are a precise educational data expert. Always return valid JSON with accurate information about Indian colleges and universities."
 
         generation_config = {
@@ -261,24 +609,148 @@ class CollegeDiscoveryEngine:
             "top_p": 0.9,
             "max_output_tokens": max_tokens,
         }
+        if response_schema:
+            generation_config["response_mime_type"] = "application/json"
+            generation_config["response_schema"] = response_schema
 
         if use_search:
-            enhanced_prompt = f"""{system_msg}
+            full_prompt = f"""{system_msg}
             IMPORTANT: Use your most current and comprehensive knowledge to find accurate course information.
             For each college, provide detailed and up-to-date course offerings.
             {prompt}"""
-
-            response = self.client.generate_content(
-                enhanced_prompt,
-                generation_config=generation_config
-            )
         else:
-            response = self.client.generate_content(
-                f"{system_msg}\n\n{prompt}",
-                generation_config=generation_config
-            )
+            full_prompt = f"{system_msg}\n\n{prompt}"
+
+        return full_prompt, generation_config
         
+    async def _call_gemini(self, prompt: str, max_tokens: int = 4000, use_search: bool = False,
+                           use_cache: bool = None, response_schema: Dict = None) -> str:
+        """Call Gemini API and return the response text"""
+        response = await self._call_gemini_with_metadata(prompt, max_tokens, use_search, use_cache,
+                                                         response_schema)
         return response.text
+
+    async def _call_gemini_with_metadata(self, prompt: str, max_tokens: int = 4000,
+                                         use_search: bool = False, use_cache: bool = None,
+                                         response_schema: Dict = None) -> LLMResponse:
+        """
+        Call Gemini API and return text, finish reason and output token count.
+
+        Responses are cached on disk keyed by model, generation config and a
+        hash of the prompt; pass use_cache=False (or set engine.use_cache) to
+        bypass the cache and force a fresh call. A fresh response is not
+        stored here: it carries its cache_key, and the caller commits it with
+        _cache_response once its JSON parses. With a response_schema, Gemini
+        is asked for JSON matching it (response_mime_type=application/json).
+        """
+        full_prompt, generation_config = self._build_request(prompt, max_tokens, use_search,
+                                                             response_schema)
+
+        use_cache = self.use_cache if use_cache is None else use_cache
+        cache_key = hash_key(self.model, generation_config, full_prompt)
+        if use_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return LLMResponse(**cached)
+
+        # Reserve the prompt plus the worst-case output; the unused part is
+        # refunded once the response reports real usage.
+        estimated_tokens = len(full_prompt) // 4 + max_tokens
+        response = await self._generate(full_prompt, generation_config, estimated_tokens)
+
+        usage = getattr(response, "usage_metadata", None)
+        self.rate_limiter.settle(estimated_tokens, getattr(usage, "total_token_count", None))
+        return LLMResponse(
+            text=response.text,
+            finish_reason=self._get_finish_reason(response),
+            output_tokens=getattr(usage, "candidates_token_count", None),
+            cache_key=cache_key if use_cache else None
+        )
+
+    def _cache_response(self, response: LLMResponse):
+        """Store a response the caller has parsed; truncated or empty output is never cached"""
+        if response.cache_key and response.text.strip() and not response.truncated:
+            self.response_cache.set(response.cache_key, {
+                "text": response.text,
+                "finish_reason": response.finish_reason,
+                "output_tokens": response.output_tokens
+            })
+
+    @staticmethod
+    def _get_finish_reason(response) -> Optional[str]:
+        candidates = getattr(response, "candidates", None) or []
+        if not candidates:
+            return None
+        finish_reason = getattr(candidates[0], "finish_reason", None)
+        return getattr(finish_reason, "name", None) or (str(finish_reason) if finish_reason else None)
+
+    async def _stream_gemini(self, prompt: str, max_tokens: int = 4000, use_search: bool = False,
+                             use_cache: bool = None, response_schema: Dict = None,
+                             result: LLMResponse = None) -> AsyncIterator[str]:
+        """
+        Streaming variant of _call_gemini that yields text chunks as they arrive.
+
+        Shares the response cache (a hit is yielded as a single chunk) and the
+        rate limiter. Only errors raised before the first chunk are retried.
+        Once the stream ends, `result` (if given) holds the full response and
+        its cache_key, for the caller to commit with _cache_response.
+        """
+        full_prompt, generation_config = self._build_request(prompt, max_tokens, use_search,
+                                                             response_schema)
+
+        use_cache = self.use_cache if use_cache is None else use_cache
+        cache_key = hash_key(self.model, generation_config, full_prompt)
+        if use_cache:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                if result is not None:
+                    result.text = cached["text"]
+                yield cached["text"]
+                return
+
+        estimated_tokens = len(full_prompt) // 4 + max_tokens
+        response = await self._generate(full_prompt, generation_config, estimated_tokens, stream=True)
+
+        chunks = []
+        try:
+            async for chunk in response:
+                text = chunk.text
+                chunks.append(text)
+                yield text
+        finally:
+            usage = getattr(response, "usage_metadata", None)
+            self.rate_limiter.settle(estimated_tokens, getattr(usage, "total_token_count", None))
+
+        if result is not None:
+            result.text = "".join(chunks)
+            result.finish_reason = self._get_finish_reason(response)
+            result.output_tokens = getattr(usage, "candidates_token_count", None)
+            result.cache_key = cache_key if use_cache else None
+
+    async def _generate(self, full_prompt: str, generation_config: Dict, estimated_tokens: int,
+                        stream: bool = False):
+        """Send one request through the shared rate limiter, retrying transient errors"""
+        for attempt in range(self.retry_policy.max_retries + 1):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                # Use the SDK's native async path so the event loop stays free while
+                # the request is in flight and other batches/validation can progress.
+                return await self.client.generate_content_async(
+                    full_prompt,
+                    generation_config=generation_config,
+                    stream=stream
+                )
+            except Exception as e:
+                self.rate_limiter.settle(estimated_tokens, 0)
+                if not is_retryable_error(e) or attempt == self.retry_policy.max_retries:
+                    raise
+
+                retry_after = get_retry_after(e)
+                if retry_after is not None:
+                    self.rate_limiter.pause(retry_after)
+                delay = self.retry_policy.backoff(attempt, retry_after)
+                print(f"Gemini call failed ({e}); retry {attempt + 1}/{self.retry_policy.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
     
     def _parse_colleges_basic(self, data: Dict, location: str) -> List[College]:
         """Parse basic college information (Step 1) - Updated for staging schema"""
@@ -312,16 +784,74 @@ class CollegeDiscoveryEngine:
 
         return colleges
     
+    def _match_batch_results(self, colleges: List[College], data: Dict) -> List[Optional[Dict]]:
+        """
+        Pair each input college with its result entry from a batch response (None if missing).
+
+        Stages run in order, each only over still-unmatched colleges/results:
+        1. normalized name equality
+        2. the positional "index" the model echoes back, if the names are not clearly different
+        3. website domain equality
+        4. token similarity >= FUZZY_MATCH_THRESHOLD, best-scoring pairs first
+        """
+        results = [r for r in data.get("colleges", []) if isinstance(r, dict)]
+        matches: List[Optional[Dict]] = [None] * len(colleges)
+        used = set()
+
+        def assign(college_pos: int, result_pos: int):
+            matches[college_pos] = results[result_pos]
+            used.add(result_pos)
+
+        result_by_name = {}
+        for result_pos, result in enumerate(results):
+            result_by_name.setdefault(normalize_name(result.get("college_name", "")), result_pos)
+        for college_pos, college in enumerate(colleges):
+            result_pos = result_by_name.get(normalize_name(college.name))
+            if result_pos is not None and result_pos not in used:
+                assign(college_pos, result_pos)
+
+        for result_pos, result in enumerate(results):
+            if result_pos in used:
+                continue
+            try:
+                college_pos = int(result.get("index")) - 1
+            except (TypeError, ValueError):
+                continue
+            if not 0 <= college_pos < len(colleges) or matches[college_pos] is not None:
+                continue
+            name = result.get("college_name", "")
+            if not name or name_similarity(name, colleges[college_pos].name) >= self.INDEX_MATCH_MIN_SIMILARITY:
+                assign(college_pos, result_pos)
+
+        for college_pos, college in enumerate(colleges):
+            domain = website_domain(college.website)
+            if matches[college_pos] is not None or not domain:
+                continue
+            for result_pos, result in enumerate(results):
+                if result_pos not in used and website_domain(result.get("website", "")) == domain:
+                    assign(college_pos, result_pos)
+                    break
+
+        candidates = []
+        for college_pos, college in enumerate(colleges):
+            if matches[college_pos] is not None:
+                continue
+            for result_pos, result in enumerate(results):
+                if result_pos in used:
+                    continue
+                score = name_similarity(result.get("college_name", ""), college.name)
+                if score >= self.FUZZY_MATCH_THRESHOLD:
+                    candidates.append((score, college_pos, result_pos))
+        for score, college_pos, result_pos in sorted(candidates, reverse=True):
+            if matches[college_pos] is None and result_pos not in used:
+                assign(college_pos, result_pos)
+
+        return matches
+
     def _merge_batch_results(self, colleges: List[College], data: Dict) -> List[College]:
         """Merge batch course discovery results back into college objects"""
-        results_by_name = {
-            r.get("college_name", "").lower(): r 
-            for r in data.get("colleges", [])
-        }
-        for college in colleges:
-            key = college.name.lower()
-            if key in results_by_name:
-                result = results_by_name[key]
+        for college, result in zip(colleges, self._match_batch_results(colleges, data)):
+            if result is not None:
                 college.courses = self._parse_courses(
                     {"courses": result.get("courses", [])}, 
                     college.website
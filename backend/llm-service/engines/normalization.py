@@ -0,0 +1,104 @@
+import re
+from typing import List
+from urllib.parse import urlparse
+
+# Common abbreviations in Indian college names, expanded so that
+# "Govt. Engg. College" and "Government Engineering College" compare equal.
+ABBREVIATIONS = {
+    "govt": "government",
+    "engg": "engineering",
+    "inst": "institute",
+    "instt": "institute",
+    "tech": "technology",
+    "technol": "technology",
+    "univ": "university",
+    "coll": "college",
+    "mgmt": "management",
+    "sci": "science",
+    "sri": "shri",
+    "shree": "shri",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip punctuation and expand abbreviations in an institution name"""
+    if not name:
+        return ""
+    text = name.lower().replace("&", " and ")
+    tokens = []
+    initials = ""
+    for token in _NON_ALNUM.split(text):
+        if not token:
+            continue
+        # Join runs of initials: "R.V." / "B. M. S." → "rv" / "bms"
+        if len(token) == 1 and token.isalpha():
+            initials += token
+            continue
+        if initials:
+            tokens.append(initials)
+            initials = ""
+        tokens.append(ABBREVIATIONS.get(token, token))
+    if initials:
+        tokens.append(initials)
+    return " ".join(tokens)
+
+
+def name_tokens(name: str) -> List[str]:
+    return normalize_name(name).split()
+
+
+def website_domain(url: str) -> str:
+    """Bare lowercase host of a URL ("https://www.rvce.edu.in/x" → "rvce.edu.in")"""
+    if not url:
+        return ""
+    if "://" not in url:
+        url = f"http://{url}"
+    try:
+        host = urlparse(url).netloc.lower()
+    except ValueError:
+        return ""
+    host = host.split("@")[-1].split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def college_key(name: str, website: str = "", city: str = "") -> str:
+    """
+    Stable identity for a college across searches.
+
+    The website domain disambiguates common names (many cities have a
+    "Government First Grade College"); city is the fallback when the
+    website is unknown.
+    """
+    return f"{normalize_name(name)}|{website_domain(website) or normalize_name(city)}"
+
+
+# Words too common in institution names to tell two colleges apart
+GENERIC_NAME_TOKENS = {
+    "of", "the", "and", "in", "for", "at",
+    "college", "institute", "university",
+}
+
+
+def name_similarity(a: str, b: str) -> float:
+    """
+    Token-overlap similarity of two institution names in [0, 1].
+
+    Generic words are ignored unless a name consists only of them. The score
+    is the larger of the Dice coefficient and a slightly discounted
+    containment, so "RV College of Engineering" vs "R.V. College of
+    Engineering, Bengaluru" still scores high.
+    """
+    tokens_a, tokens_b = set(name_tokens(a)), set(name_tokens(b))
+    specific_a, specific_b = tokens_a - GENERIC_NAME_TOKENS, tokens_b - GENERIC_NAME_TOKENS
+    if specific_a and specific_b:
+        tokens_a, tokens_b = specific_a, specific_b
+    if not tokens_a or not tokens_b:
+        return 0.0
+
+    common = len(tokens_a & tokens_b)
+    dice = 2 * common / (len(tokens_a) + len(tokens_b))
+    smaller = min(len(tokens_a), len(tokens_b))
+    containment = common / smaller if smaller >= 2 else 0.0
+    return max(dice, 0.9 * containment)
@@ -0,0 +1,136 @@
+import asyncio
+from typing import Dict, List, Optional
+from engines.llm_engine import CollegeDiscoveryEngine
+from engines.validation_engine import EvidenceValidator
+from engines.supabase_integration import SupabaseIntegration
+from models.college import College
+
+# Marks the end of a stage's input queue
+_DONE = object()
+
+
+class DiscoveryPipeline:
+    """
+    Discovery → validation → staging push as one async stream.
+
+    Each college moves to validation as soon as its course batch returns and
+    to staging as soon as it is validated. Stages are connected by bounded
+    queues, so a slow stage applies back-pressure instead of buffering the
+    whole run, and end-to-end latency approaches that of the slowest stage.
+    Validation and staging are optional (pass None to skip them).
+    """
+
+    def __init__(self, engine: CollegeDiscoveryEngine, validator: Optional[EvidenceValidator] = None,
+                 supabase: Optional[SupabaseIntegration] = None, queue_size: int = 20,
+                 validation_workers: int = None):
+        self.engine = engine
+        self.validator = validator
+        self.supabase = supabase
+        self.queue_size = queue_size
+        if validation_workers is None:
+            validation_workers = validator.max_concurrent if validator else 4
+        self.validation_workers = max(1, validation_workers)
+
+    async def run(self, location: str, career_path: str = None, batch_size: int = 5,
+                  max_concurrent_batches: int = None, college_prompt: str = None,
+                  progress_callback=None) -> Dict:
+        """
+        Run the pipeline for one location.
+
+        progress_callback(event, data) receives the engine's step1/step2
+        events plus "college_ready" (courses found), "college_validated" (only
+        with a validator), "college_staged" and "pipeline_complete".
+
+        Returns:
+            Dict with 'colleges' (discovery order, career_path filter applied)
+            and 'push_results' (summed staging statistics, or None)
+        """
+        to_validate: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        to_stage: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        discovered: Dict[int, List[College]] = {}
+        push_results = self._empty_push_results() if self.supabase else None
+        counts = {"ready": 0, "validated": 0, "staged": 0}
+
+        def notify(event: str, data: Dict):
+            if progress_callback:
+                progress_callback(event, data)
+
+        async def discover():
+            try:
+                async for batch_num, batch in self.engine.stream_colleges_with_courses(
+                        location, career_path, batch_size, max_concurrent_batches,
+                        college_prompt, progress_callback):
+                    if career_path:
+                        batch = [c for c in batch if len(c.courses) > 0]
+                    discovered[batch_num] = batch
+                    for college in batch:
+                        counts["ready"] += 1
+                        notify("college_ready", {"count": counts["ready"], "name": college.name})
+                        await to_validate.put(college)
+            finally:
+                for _ in range(self.validation_workers):
+                    await to_validate.put(_DONE)
+
+        async def validate():
+            while True:
+                college = await to_validate.get()
+                if college is _DONE:
+                    break
+                if self.validator:
+                    try:
+                        # The validator's pooled session is shared by every worker
+                        await self.validator.validate_colleges([college])
+                    except Exception as e:
+                        print(f"Validation error for {college.name}: {e}")
+                    counts["validated"] += 1
+                    notify("college_validated", {"count": counts["validated"], "name": college.name})
+                await to_stage.put(college)
+
+        async def stage():
+            while True:
+                college = await to_stage.get()
+                if college is _DONE:
+                    break
+                if self.supabase:
+                    try:
+                        result = await self.supabase.push_colleges_and_courses([college])
+                        self._add_push_results(push_results, result)
+                    except Exception as e:
+                        # Keep draining the queue so discovery and validation can finish
+                        push_results['colleges_failed'] += 1
+                        push_results['errors'].append(f"{college.name}: {str(e)}")
+                        print(f"Staging error for {college.name}: {e}")
+                counts["staged"] += 1
+                notify("college_staged", {"count": counts["staged"], "name": college.name})
+
+        async def validate_all():
+            try:
+                await asyncio.gather(*(validate() for _ in range(self.validation_workers)))
+            finally:
+                await to_stage.put(_DONE)
+
+        await asyncio.gather(discover(), validate_all(), stage())
+
+        colleges = [college for batch_num in sorted(discovered) for college in discovered[batch_num]]
+        notify("pipeline_complete", {"count": len(colleges)})
+        return {'colleges': colleges, 'push_results': push_results}
+
+    @staticmethod
+    def _empty_push_results() -> Dict:
+        return {
+            'colleges_inserted': 0,
+            'colleges_failed': 0,
+            'courses_inserted': 0,
+            'courses_failed': 0,
+            'relationships_created': 0,
+            'relationships_failed': 0,
+            'errors': []
+        }
+
+    @staticmethod
+    def _add_push_results(total: Dict, result: Dict):
+        for key, value in result.items():
+            if key == 'errors':
+                total['errors'].extend(value)
+            elif isinstance(value, (int, float)):
+                total[key] = total.get(key, 0) + value
@@ -0,0 +1,247 @@
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+from google.api_core import exceptions as google_exceptions
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Callers reserve capacity up front (the balance may go negative) and then
+    sleep off the deficit, so no lock is held across an `await` and the bucket
+    can be shared between event loops (e.g. Streamlit reruns).
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, clock=time.monotonic):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return how many seconds the caller must wait"""
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def refund(self, amount: float):
+        """Give back tokens that were reserved but not used"""
+        if amount <= 0:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+    async def acquire(self, amount: float = 1.0):
+        wait = self.reserve(amount)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class GeminiRateLimiter:
+    """Client-side requests/min and tokens/min limiter for one Gemini model"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, clock=time.monotonic):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0, clock=clock)
+        self._clock = clock
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self, estimated_tokens: int):
+        """Wait until one request with `estimated_tokens` fits in both budgets"""
+        pause = self._paused_until - self._clock()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, reserved_tokens: int, actual_tokens: Optional[int]):
+        """Refund the unused part of a reservation once real usage is known"""
+        if actual_tokens is not None:
+            self.tokens.refund(reserved_tokens - actual_tokens)
+
+    def pause(self, seconds: float):
+        """Hold back every caller (not just the one that got throttled) for `seconds`"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class DomainRateLimiter:
+    """
+    Per-domain request spacing for polite crawling.
+
+    Each domain keeps the time its next request may start (GCRA / virtual
+    scheduling). A caller reserves that slot before sleeping, so concurrent
+    callers for the same domain are spaced `interval` apart while other
+    domains are never held up. `burst` requests may start back-to-back after
+    an idle period. The domain table is LRU-bounded by `max_domains`.
+
+    `request` additionally caps how many requests to one domain are in flight
+    at once (`max_in_flight`), across every caller sharing the limiter.
+    """
+
+    def __init__(self, burst: int = 1, max_domains: int = 4096, max_in_flight: int = 4,
+                 clock=time.monotonic):
+        self.burst = max(1, burst)
+        self.max_domains = max_domains
+        self.max_in_flight = max(1, max_in_flight)
+        self._clock = clock
+        self._next_slot: "OrderedDict[str, float]" = OrderedDict()
+        # Semaphores are bound to an event loop, so they are kept per loop;
+        # each entry is [semaphore, callers holding or waiting] and is dropped when idle
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, list]]" = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def reserve(self, domain: str, interval: float) -> float:
+        """Book the next request to `domain` and return how many seconds to wait"""
+        with self._lock:
+            now = self._clock()
+            next_slot = max(self._next_slot.pop(domain, now), now)
+            self._next_slot[domain] = next_slot + interval
+            while len(self._next_slot) > self.max_domains:
+                self._next_slot.popitem(last=False)
+        return max(0.0, next_slot - (self.burst - 1) * interval - now)
+
+    async def acquire(self, domain: str, interval: float):
+        wait = self.reserve(domain, interval)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    @asynccontextmanager
+    async def request(self, domain: str, interval: float):
+        """Hold one of `domain`'s in-flight slots for a request that starts once `acquire` allows"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._in_flight.setdefault(loop, {})
+        slot = slots.get(domain)
+        if slot is None:
+            slot = slots[domain] = [asyncio.Semaphore(self.max_in_flight), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                await self.acquire(domain, interval)
+                yield
+        finally:
+            slot[1] -= 1
+            if slot[1] == 0:
+                del slots[domain]
+
+    def __len__(self) -> int:
+        return len(self._next_slot)
+
+
+# Conservative defaults; override with GEMINI_REQUESTS_PER_MINUTE / GEMINI_TOKENS_PER_MINUTE
+DEFAULT_MODEL_LIMITS = {
+    "gemini-1.5-pro": (60, 1_000_000),
+    "gemini-2.5-flash": (120, 1_000_000),
+}
+DEFAULT_LIMITS = (60, 1_000_000)
+
+_model_limiters: Dict[str, GeminiRateLimiter] = {}
+_model_limiters_lock = threading.Lock()
+
+
+def get_model_rate_limiter(model: str) -> GeminiRateLimiter:
+    """Return the process-wide limiter for `model`, creating it on first use"""
+    with _model_limiters_lock:
+        limiter = _model_limiters.get(model)
+        if limiter is None:
+            default_rpm, default_tpm = DEFAULT_MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+            limiter = GeminiRateLimiter(
+                requests_per_minute=float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", default_rpm)),
+                tokens_per_minute=float(os.getenv("GEMINI_TOKENS_PER_MINUTE", default_tpm))
+            )
+            _model_limiters[model] = limiter
+        return limiter
+
+
+_domain_limiter: Optional[DomainRateLimiter] = None
+_domain_limiter_lock = threading.Lock()
+
+
+def get_domain_rate_limiter() -> DomainRateLimiter:
+    """Return the process-wide per-domain limiter shared by all validators"""
+    global _domain_limiter
+    with _domain_limiter_lock:
+        if _domain_limiter is None:
+            _domain_limiter = DomainRateLimiter(
+                burst=int(os.getenv("VALIDATION_DOMAIN_BURST", "1")),
+                max_in_flight=int(os.getenv("VALIDATION_MAX_REQUESTS_PER_DOMAIN", "4"))
+            )
+        return _domain_limiter
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff settings for transient Gemini errors"""
+    max_retries: int = 5
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter delay for `attempt` (0-based), never shorter than retry_after"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after) + random.uniform(0, self.base_delay)
+        return delay
+
+
+RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.GatewayTimeout,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+_RETRY_IN_PATTERN = re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE)
+_RETRY_DELAY_PATTERN = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Extract the server-suggested wait (RetryInfo detail or message hint), if any"""
+    for detail in getattr(error, "details", None) or []:
+        retry_delay = getattr(detail, "retry_delay", None)
+        if retry_delay is None:
+            continue
+        if hasattr(retry_delay, "total_seconds"):
+            return retry_delay.total_seconds()
+        return retry_delay.seconds + retry_delay.nanos / 1e9
+
+    message = str(error)
+    for pattern in (_RETRY_IN_PATTERN, _RETRY_DELAY_PATTERN):
+        match = pattern.search(message)
+        if match:
+            return float(match.group(1))
+    return None
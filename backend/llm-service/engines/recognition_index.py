@@ -0,0 +1,173 @@
+import os
+import csv
+import glob
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from engines.normalization import normalize_name
+
+# Where each regulator's records can be looked up by hand
+SOURCE_URLS = {
+    "aicte": "https://www.aicte-india.org/dashboard/approved-institutions",
+    "ugc": "https://www.ugc.ac.in/",
+    "aishe": "https://aishe.gov.in/",
+}
+
+# Header aliases seen in the AICTE / UGC / AISHE downloads (compared after normalize_name)
+NAME_COLUMNS = ["name", "institution name", "name of the institution", "institute name",
+                "college name", "university name", "name of college", "name of university"]
+CITY_COLUMNS = ["city", "district", "town", "district name"]
+STATE_COLUMNS = ["state", "state name", "state ut"]
+ID_COLUMNS = ["id", "aicte id", "permanent id", "aishe code", "aishe id", "college id", "university id"]
+URL_COLUMNS = ["url", "website", "web site", "source url"]
+
+
+@dataclass
+class InstitutionRecord:
+    """One institution from a regulator's list"""
+    name: str
+    source: str
+    city: str = ""
+    state: str = ""
+    record_id: str = ""
+    url: str = ""
+
+    @property
+    def source_url(self) -> str:
+        return self.url or SOURCE_URLS.get(self.source, "")
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class RecognitionIndex:
+    """
+    In-memory index of AICTE / UGC / AISHE institution records.
+
+    Loaded once from CSV dumps; lookups are an exact normalized-name hit or
+    a trigram search (inverted index, Dice similarity), so validation never
+    needs a network call to check government recognition.
+    """
+
+    def __init__(self, records: List[InstitutionRecord] = None, max_posting_fraction: float = 0.05):
+        self.records: List[InstitutionRecord] = []
+        self.max_posting_fraction = max_posting_fraction
+        self._by_name: Dict[str, List[int]] = defaultdict(list)
+        self._grams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for record in records or []:
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record: InstitutionRecord):
+        normalized = normalize_name(record.name)
+        if not normalized:
+            return
+        record_index = len(self.records)
+        self.records.append(record)
+        grams = _trigrams(normalized)
+        self._grams.append(grams)
+        self._by_name[normalized].append(record_index)
+        for gram in grams:
+            self._postings[gram].append(record_index)
+
+    def load_csv(self, path: str, source: str) -> int:
+        """Add every row of a regulator CSV dump; returns the number of rows added"""
+        added = 0
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            columns = {normalize_name(column): column for column in reader.fieldnames or []}
+
+            def pick(aliases: List[str]) -> Optional[str]:
+                return next((columns[alias] for alias in aliases if alias in columns), None)
+
+            name_col, city_col, state_col = pick(NAME_COLUMNS), pick(CITY_COLUMNS), pick(STATE_COLUMNS)
+            id_col, url_col = pick(ID_COLUMNS), pick(URL_COLUMNS)
+            if name_col is None:
+                print(f"Skipping {path}: no institution name column in {reader.fieldnames}")
+                return 0
+
+            for row in reader:
+                before = len(self.records)
+                self.add(InstitutionRecord(
+                    name=(row.get(name_col) or "").strip(),
+                    source=source,
+                    city=(row.get(city_col) or "").strip() if city_col else "",
+                    state=(row.get(state_col) or "").strip() if state_col else "",
+                    record_id=(row.get(id_col) or "").strip() if id_col else "",
+                    url=(row.get(url_col) or "").strip() if url_col else ""
+                ))
+                added += len(self.records) - before
+        return added
+
+    @classmethod
+    def from_directory(cls, directory: str) -> "RecognitionIndex":
+        """Load every `<source>*.csv` (aicte, ugc, aishe) found in `directory`"""
+        index = cls()
+        for source in SOURCE_URLS:
+            for path in sorted(glob.glob(os.path.join(directory, f"{source}*.csv"))):
+                count = index.load_csv(path, source)
+                print(f"Loaded {count} {source.upper()} records from {path}")
+        return index
+
+    def lookup(self, name: str, city: str = "", threshold: float = 0.8,
+               limit: int = 3) -> List[Tuple[InstitutionRecord, float]]:
+        """Best matching records for `name` with scores in [0, 1], best first"""
+        normalized = normalize_name(name)
+        if not normalized or not self.records:
+            return []
+
+        exact = self._by_name.get(normalized)
+        if exact:
+            scored = [(i, 1.0) for i in exact]
+        else:
+            grams = _trigrams(normalized)
+            scored = [(i, self._dice(grams, self._grams[i])) for i in self._candidates(grams)]
+
+        city_key = normalize_name(city)
+        results = []
+        for i, score in scored:
+            record_city = normalize_name(self.records[i].city)
+            # "Government Engineering College" exists in many districts
+            if record_city and f" {record_city}" in f" {normalized}":
+                score = min(1.0, score + 0.05)
+            elif city_key and record_city and city_key not in record_city and record_city not in city_key:
+                score *= 0.7
+            if score >= threshold:
+                results.append((self.records[i], round(score, 3)))
+        results.sort(key=lambda item: item[1], reverse=True)
+        return results[:limit]
+
+    def _candidates(self, grams: Set[str], max_candidates: int = 50) -> List[int]:
+        """Records sharing the most distinctive trigrams with the query"""
+        max_posting = max(50, int(len(self.records) * self.max_posting_fraction))
+        counts: Counter = Counter()
+        for gram in grams:
+            posting = self._postings.get(gram)
+            # Trigrams of words like "college" match half the index; skip them
+            if posting and len(posting) <= max_posting:
+                counts.update(posting)
+        return [i for i, _ in counts.most_common(max_candidates)]
+
+    @staticmethod
+    def _dice(a: Set[str], b: Set[str]) -> float:
+        return 2 * len(a & b) / (len(a) + len(b))
+
+
+_recognition_index: Optional[RecognitionIndex] = None
+_recognition_index_lock = threading.Lock()
+
+
+def get_recognition_index() -> RecognitionIndex:
+    """Process-wide index loaded from RECOGNITION_DATA_DIR (empty if no dumps are present)"""
+    global _recognition_index
+    with _recognition_index_lock:
+        if _recognition_index is None:
+            directory = os.getenv("RECOGNITION_DATA_DIR", os.path.join("data", "recognition"))
+            _recognition_index = RecognitionIndex.from_directory(directory)
+        return _recognition_index
@@ -0,0 +1,100 @@
+import typing
+from typing import Dict, List, Union
+from models.college import College, Course
+
+# Gemini response_schema types (OpenAPI subset, upper-case enum names)
+_PRIMITIVE_TYPES = {
+    str: "STRING",
+    int: "INTEGER",
+    float: "NUMBER",
+    bool: "BOOLEAN",
+}
+
+
+def _schema_for_type(annotation) -> Dict:
+    """Translate a dataclass field annotation into a Gemini schema fragment"""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+
+    if origin is Union and type(None) in args:
+        inner = [arg for arg in args if arg is not type(None)][0]
+        return {**_schema_for_type(inner), "nullable": True}
+    if origin in (list, List):
+        return {"type": "ARRAY", "items": _schema_for_type(args[0] if args else str)}
+    if annotation in _PRIMITIVE_TYPES:
+        return {"type": _PRIMITIVE_TYPES[annotation]}
+    raise TypeError(f"Unsupported field type for response schema: {annotation}")
+
+
+def dataclass_schema(cls, fields: List[str], renames: Dict[str, str] = None,
+                     overrides: Dict[str, Dict] = None, required: List[str] = None) -> Dict:
+    """
+    Build an OBJECT schema from selected dataclass fields.
+
+    `renames` maps dataclass field names to the JSON keys the prompts ask for
+    (e.g. overall_confidence → confidence); `overrides` replaces the derived
+    schema of a field when the prompt's format differs from the model type.
+    """
+    renames = renames or {}
+    overrides = overrides or {}
+    hints = typing.get_type_hints(cls)
+
+    properties = {}
+    for field_name in fields:
+        key = renames.get(field_name, field_name)
+        properties[key] = overrides.get(field_name) or _schema_for_type(hints[field_name])
+
+    schema = {"type": "OBJECT", "properties": properties}
+    if required:
+        schema["required"] = required
+    return schema
+
+
+COLLEGE_LIST_FIELDS = [
+    "name", "description", "address", "city", "state", "zip_code", "website",
+    "email", "phone", "scholarshipdetails", "rating", "type", "overall_confidence",
+]
+
+COURSE_FIELDS = [
+    "name", "description", "duration", "degree_level", "seats", "annual_fees",
+    "entrance_exams", "specializations",
+]
+
+
+def college_list_schema() -> Dict:
+    """Schema for the Step 1 college list response"""
+    college = dataclass_schema(
+        College, COLLEGE_LIST_FIELDS,
+        renames={"overall_confidence": "confidence"},
+        required=["name"]
+    )
+    return {
+        "type": "OBJECT",
+        "properties": {"colleges": {"type": "ARRAY", "items": college}},
+        "required": ["colleges"]
+    }
+
+
+def batch_course_schema() -> Dict:
+    """Schema for the Step 2 batch course response"""
+    course = dataclass_schema(
+        Course, COURSE_FIELDS,
+        # The prompt asks for display strings such as "₹1,00,000"
+        overrides={"annual_fees": {"type": "STRING", "nullable": True}},
+        required=["name"]
+    )
+    college_courses = {
+        "type": "OBJECT",
+        "properties": {
+            "index": {"type": "INTEGER"},
+            "college_name": {"type": "STRING"},
+            "website": {"type": "STRING"},
+            "courses": {"type": "ARRAY", "items": course},
+        },
+        "required": ["college_name", "courses"]
+    }
+    return {
+        "type": "OBJECT",
+        "properties": {"colleges": {"type": "ARRAY", "items": college_courses}},
+        "required": ["colleges"]
+    }
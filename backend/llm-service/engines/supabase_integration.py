@@ -1,30 +1,58 @@
 import os
-from typing import List, Dict, Optional
+import asyncio
+from typing import List, Dict, Optional, Tuple
 from supabase import create_client, Client
+from postgrest import CountMethod, ReturnMethod
 from datetime import datetime
 from models.college import College, Course
+from engines.course_resolver import CourseResolver, get_course_resolver, is_foreign_key_error
+from engines.supabase_writer import execute, execute_batches
 
 class SupabaseIntegration:
-    def __init__(self, url: str = None, key: str = None):
+    # Natural keys used as upsert conflict targets (see db setup/004_staging_natural_keys.sql)
+    COLLEGE_KEY = 'name,city'
+    COURSE_KEY = 'name'
+    LINK_KEY = 'college_id,course_id'
+    # Saved-search listing columns (everything but the large llm_json blob)
+    SEARCH_CRITERIA_COLUMNS = 'id,location,career_path,specialization,university'
+    
+    def __init__(self, url: str = None, key: str = None, client: Client = None,
+                 batch_size: int = None, course_resolver: CourseResolver = None):
         """Initialize Supabase client"""
         self.url = url or os.getenv("SUPABASE_URL")
         self.key = key or os.getenv("SUPABASE_KEY")
+        # Rows per bulk insert request
+        self.batch_size = batch_size or int(os.getenv("SUPABASE_BATCH_SIZE", "500"))
+        
+        if client is not None:
+            self.client = client
+            self.course_resolver = course_resolver or CourseResolver(client, batch_size=self.batch_size)
+            return
         
         if not self.url or not self.key:
             raise ValueError("Supabase URL and Key are required")
         
         self.client: Client = create_client(self.url, self.key)
+        # Shared by every SupabaseIntegration for this project, so it stays warm across pushes
+        self.course_resolver = course_resolver or get_course_resolver(
+            self.url, self.key, self.client, batch_size=self.batch_size
+        )
     
     async def push_colleges_and_courses(self, colleges: List[College], 
-                                       progress_callback=None) -> Dict:
+                                       progress_callback=None, bulk: bool = True) -> Dict:
         """
         Push colleges and courses to Supabase STAGING tables with relationships
         
         Tables populated:
-        - st_college (colleges)
-        - st_course (courses, deduplicated by name)
+        - st_college (colleges, upserted on name + city)
+        - st_course (courses, upserted on name)
         - st_college_course_jobs (many-to-many relationships, job_id=null)
         
+        Every write is an upsert on the table's natural key, so re-pushing
+        (or retrying) the same colleges does not create duplicates.
+        With bulk=True (default) all rows are built in memory and written with
+        a few concurrent batched requests per table; bulk=False pushes row by row.
+        
         Returns:
             Dict with success/failure statistics
         """
@@ -38,6 +66,124 @@ class SupabaseIntegration:
             'errors': []
         }
         
+        if bulk:
+            try:
+                await self._push_bulk(colleges, results, progress_callback)
+            except Exception as e:
+                # Rows already written are counted; report the rest instead of raising
+                print(f"Error in bulk push: {e}")
+                results['errors'].append(f"Bulk push: {str(e)}")
+        else:
+            await self._push_sequential(colleges, results, progress_callback)
+        
+        print(f"\nSUMMARY:")
+        print(f"   Colleges: {results['colleges_inserted']} inserted, {results['colleges_failed']} failed")
+        print(f"   Courses: {results['courses_inserted']} inserted, {results['courses_failed']} failed")
+        print(f"   Relationships: {results['relationships_created']} created, {results['relationships_failed']} failed")
+        
+        return results
+    
+    async def _push_bulk(self, colleges: List[College], results: Dict, progress_callback=None):
+        """Upsert colleges, then unknown courses, then links; each stage's batches run concurrently"""
+        # Colleges sharing a natural key are written once and share its id
+        rows_by_key: Dict[Tuple[str, str], Dict] = {}
+        for college in colleges:
+            rows_by_key.setdefault((college.name, college.city), self._college_row(college))
+        total = len(rows_by_key)
+        completed = [0]
+        
+        def report(chunk: List[Dict], outcome):
+            for row in chunk:
+                completed[0] += 1
+                if progress_callback:
+                    progress_callback(completed[0], total, row['name'])
+        
+        ids_by_key: Dict[Tuple[str, str], str] = {}
+        batches = await execute_batches(
+            lambda chunk: self.client.table('st_college').upsert(chunk, on_conflict=self.COLLEGE_KEY),
+            list(rows_by_key.values()), self.batch_size, on_batch=report
+        )
+        for chunk, outcome in batches:
+            if isinstance(outcome, Exception):
+                print(f"Error upserting {len(chunk)} colleges to staging: {outcome}")
+                results['errors'].append(f"Colleges {chunk[0]['name']}..{chunk[-1]['name']}: {str(outcome)}")
+                continue
+            for row in outcome.data or []:
+                ids_by_key[(row['name'], row['city'])] = row['id']
+        
+        college_ids = [ids_by_key.get((college.name, college.city)) for college in colleges]
+        results['colleges_inserted'] += sum(1 for college_id in college_ids if college_id)
+        results['colleges_failed'] += sum(1 for college_id in college_ids if not college_id)
+        print(f"Upserted {results['colleges_inserted']} colleges in bulk")
+        
+        courses = [course for college, college_id in zip(colleges, college_ids) if college_id
+                   for course in college.courses]
+        course_name_to_id = await self._resolve_course_ids(courses, results)
+        
+        links = []
+        seen_links = set()
+        for college, college_id in zip(colleges, college_ids):
+            if not college_id:
+                continue
+            for course in college.courses:
+                course_id = course_name_to_id.get(course.name)
+                if course_id and (college_id, course_id) not in seen_links:
+                    seen_links.add((college_id, course_id))
+                    links.append({'college_id': college_id, 'course_id': course_id, 'job_id': None})
+        
+        batches = await self._upsert_links(links)
+        failed = [(chunk, outcome) for chunk, outcome in batches if isinstance(outcome, Exception)]
+        if any(is_foreign_key_error(outcome) for _, outcome in failed):
+            # A course id from the warm map no longer exists; reload it and retry those links once
+            self.course_resolver.invalidate()
+            batches = [(chunk, outcome) for chunk, outcome in batches if not isinstance(outcome, Exception)]
+            batches += await self._retry_links([row for chunk, _ in failed for row in chunk],
+                                               course_name_to_id, courses, results)
+        for chunk, outcome in batches:
+            if isinstance(outcome, Exception):
+                print(f"Error linking {len(chunk)} college-course pairs: {outcome}")
+                results['relationships_failed'] += len(chunk)
+                results['errors'].append(f"Relationships ({len(chunk)} rows): {str(outcome)}")
+            else:
+                results['relationships_created'] += len(chunk)
+    
+    async def _upsert_links(self, links: List[Dict]):
+        return await execute_batches(
+            lambda chunk: self.client.table('st_college_course_jobs').upsert(
+                chunk, on_conflict=self.LINK_KEY, ignore_duplicates=True, returning=ReturnMethod.minimal
+            ),
+            links, self.batch_size
+        )
+    
+    async def _retry_links(self, links: List[Dict], course_name_to_id: Dict[str, str],
+                           courses: List[Course], results: Dict):
+        """Re-resolve the courses of failed links against a freshly loaded map and send them again"""
+        names_by_id = {course_id: name for name, course_id in course_name_to_id.items()}
+        retry_names = {names_by_id[link['course_id']] for link in links}
+        resolution = await self.course_resolver.resolve(
+            [course for course in courses if course.name in retry_names], self._course_row
+        )
+        results['errors'].extend(resolution.errors)
+        
+        retry_links = []
+        for link in links:
+            course_id = resolution.ids.get(names_by_id[link['course_id']])
+            if course_id:
+                retry_links.append(dict(link, course_id=course_id))
+            else:
+                results['relationships_failed'] += 1
+        return await self._upsert_links(retry_links)
+    
+    async def _resolve_course_ids(self, courses: List[Course], results: Dict) -> Dict[str, str]:
+        """Map course names to st_course ids, upserting the courses not known yet"""
+        resolution = await self.course_resolver.resolve(courses, self._course_row)
+        results['courses_inserted'] += len(resolution.upserted)
+        results['courses_failed'] += len(resolution.failed)
+        results['errors'].extend(resolution.errors)
+        return resolution.ids
+    
+    async def _push_sequential(self, colleges: List[College], results: Dict, progress_callback=None):
+        """Row-by-row push: one upsert per college, course and link"""
         total = len(colleges)
         
         course_name_to_id = {}
@@ -85,44 +231,12 @@ class SupabaseIntegration:
                 results['colleges_failed'] += 1
                 results['errors'].append(f"{college.name}: {str(e)}")
                 print(f"Error processing {college.name}: {e}")
-        
-        print(f"\nSUMMARY:")
-        print(f"   Colleges: {results['colleges_inserted']} inserted, {results['colleges_failed']} failed")
-        print(f"   Courses: {results['courses_inserted']} inserted, {results['courses_failed']} failed")
-        print(f"   Relationships: {results['relationships_created']} created, {results['relationships_failed']} failed")
-        
-        return results
     
     async def _insert_staging_college(self, college: College) -> Optional[str]:
         """Insert college into st_college staging table and return its UUID"""
         try:
-            confidence_level = self._get_confidence_level(college.overall_confidence)
-            
-            evidence_urls_str = ""
-            if college.evidence_urls and len(college.evidence_urls) > 0:
-                evidence_urls_str = ", ".join(college.evidence_urls[:5])
-            
-            college_data = {
-                'name': college.name,
-                'description': college.description or f"{college.name} is located in {college.city}, {college.state}. Type: {college.type}",
-                'address': college.address or f"{college.city}, {college.state}",
-                'city': college.city,
-                'state': college.state,
-                'zip_code': college.zip_code or "",
-                'website': college.website,
-                'email': college.email or self._generate_email(college.website),
-                'phone': college.phone or "",
-                'scholarshipdetails': college.scholarshipdetails or "",
-                'rating': round(float(college.rating if hasattr(college, 'rating') else 
-                               (college.overall_confidence * 5)), 1),
-                'type': college.type.lower(),
-                'confidence': round(float(college.overall_confidence), 2),
-                'confidence_level': confidence_level,
-                'evidence_status': str(college.evidence_status.value) if hasattr(college.evidence_status, 'value') else str(college.evidence_status),
-                'evidence_urls': evidence_urls_str
-            }
-            
-            response = self.client.table('st_college').insert(college_data).execute()
+            college_data = self._college_row(college)
+            response = await execute(self.client.table('st_college').upsert(college_data, on_conflict=self.COLLEGE_KEY))
             
             if response.data and len(response.data) > 0:
                 return response.data[0]['id']
@@ -132,26 +246,39 @@ class SupabaseIntegration:
             print(f"Error inserting college {college.name} to staging: {e}")
             return None
     
+    def _college_row(self, college: College) -> Dict:
+        """st_college row for `college`"""
+        confidence_level = self._get_confidence_level(college.overall_confidence)
+        
+        evidence_urls_str = ""
+        if college.evidence_urls and len(college.evidence_urls) > 0:
+            evidence_urls_str = ", ".join(college.evidence_urls[:5])
+        
+        return {
+            'name': college.name,
+            'description': college.description or f"{college.name} is located in {college.city}, {college.state}. Type: {college.type}",
+            'address': college.address or f"{college.city}, {college.state}",
+            'city': college.city,
+            'state': college.state,
+            'zip_code': college.zip_code or "",
+            'website': college.website,
+            'email': college.email or self._generate_email(college.website),
+            'phone': college.phone or "",
+            'scholarshipdetails': college.scholarshipdetails or "",
+            'rating': round(float(college.rating if hasattr(college, 'rating') else 
+                           (college.overall_confidence * 5)), 1),
+            'type': college.type.lower(),
+            'confidence': round(float(college.overall_confidence), 2),
+            'confidence_level': confidence_level,
+            'evidence_status': str(college.evidence_status.value) if hasattr(college.evidence_status, 'value') else str(college.evidence_status),
+            'evidence_urls': evidence_urls_str
+        }
+    
     async def _insert_staging_course(self, course: Course) -> Optional[str]:
         """Insert course into st_course staging table and return its UUID"""
         try:
-            existing = self.client.table('st_course').select('id').eq('name', course.name).execute()
-            
-            if existing.data and len(existing.data) > 0:
-                return existing.data[0]['id']
-            
-            description = course.description if hasattr(course, 'description') and course.description else self._generate_course_description(course)
-            
-            course_data = {
-                'name': course.name,
-                'description': description,
-                'duration': course.duration or 'Not specified',
-                'degree_level': course.degree_level or 'UG',
-                'seats': float(course.seats) if course.seats else None,
-                'annual_fees': course.annual_fees or ""
-            }
-            
-            response = self.client.table('st_course').insert(course_data).execute()
+            course_data = self._course_row(course)
+            response = await execute(self.client.table('st_course').upsert(course_data, on_conflict=self.COURSE_KEY))
             
             if response.data and len(response.data) > 0:
                 return response.data[0]['id']
@@ -161,40 +288,44 @@ class SupabaseIntegration:
             print(f"Error inserting course {course.name} to staging: {e}")
             return None
     
+    def _course_row(self, course: Course) -> Dict:
+        """st_course row for `course`"""
+        description = course.description if hasattr(course, 'description') and course.description else self._generate_course_description(course)
+        
+        return {
+            'name': course.name,
+            'description': description,
+            'duration': course.duration or 'Not specified',
+            'degree_level': course.degree_level or 'UG',
+            'seats': float(course.seats) if course.seats else None,
+            'annual_fees': course.annual_fees or ""
+        }
+    
     async def _link_college_course_staging(self, college_id: str, course_id: str) -> bool:
         """
         Create college-course relationship in st_college_course_jobs table
         
+        A single upsert that ignores an existing (college_id, course_id) pair,
+        so concurrent pushes cannot race into duplicate links.
+        
         Args:
             college_id: UUID of the college in st_college
             course_id: UUID of the course in st_course
             
         Returns:
-            bool: True if relationship created successfully
+            bool: True if the relationship exists afterwards
         """
         try:
-            existing = (self.client.table('st_college_course_jobs')
-                       .select('id')
-                       .eq('college_id', college_id)
-                       .eq('course_id', course_id)
-                       .execute())
-            
-            if existing.data and len(existing.data) > 0:
-                print(f"Relationship already exists")
-                return True
-            
             link_data = {
                 'college_id': college_id,
                 'course_id': course_id,
                 'job_id': None
             }
             
-            response = self.client.table('st_college_course_jobs').insert(link_data).execute()
-            
-            if response.data and len(response.data) > 0:
-                print(f"Created relationship")
-                return True
-            return False
+            await execute(self.client.table('st_college_course_jobs').upsert(
+                link_data, on_conflict=self.LINK_KEY, ignore_duplicates=True, returning=ReturnMethod.minimal
+            ))
+            return True
             
         except Exception as e:
             print(f"Error linking college-course: {e}")
@@ -261,17 +392,19 @@ class SupabaseIntegration:
             return False
     
     async def get_staging_stats(self) -> Dict:
-        """Get statistics from staging tables"""
+        """
+        Get statistics from staging tables
+        
+        Only counts travel over the wire: totals are `count=exact` HEAD
+        requests and the confidence breakdown is grouped in the database.
+        """
         try:
-            colleges_count = len(self.client.table('st_college').select('id').execute().data)
-            courses_count = len(self.client.table('st_course').select('id').execute().data)
-            relationships_count = len(self.client.table('st_college_course_jobs').select('id').execute().data)
-            
-            colleges_data = self.client.table('st_college').select('confidence_level').execute().data
-            confidence_breakdown = {}
-            for item in colleges_data:
-                level = item.get('confidence_level', 'UNKNOWN')
-                confidence_breakdown[level] = confidence_breakdown.get(level, 0) + 1
+            colleges_count, courses_count, relationships_count = await asyncio.gather(
+                self._count('st_college'),
+                self._count('st_course'),
+                self._count('st_college_course_jobs')
+            )
+            confidence_breakdown = await self._confidence_breakdown(colleges_count)
             
             return {
                 'total_colleges': colleges_count,
@@ -282,45 +415,128 @@ class SupabaseIntegration:
         except Exception as e:
             print(f"Error getting staging stats: {e}")
             return {}
-    async def get_search_criteria(self, filters: dict):
+    
+    async def _count(self, table: str, **filters) -> int:
+        """Row count of `table` (optionally filtered by column equality) without fetching rows"""
+        query = self.client.table(table).select('id', count=CountMethod.exact, head=True)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        response = await execute(query)
+        return response.count or 0
+    
+    async def _confidence_breakdown(self, total: int) -> Dict[str, int]:
+        """Colleges per confidence_level, via the st_college_confidence_breakdown RPC"""
+        try:
+            response = await execute(self.client.rpc('st_college_confidence_breakdown'))
+            return {row['confidence_level'] or 'UNKNOWN': int(row['total']) for row in response.data or []}
+        except Exception as e:
+            # Database without migration 005: one count per known level instead
+            print(f"Confidence breakdown RPC unavailable ({e}); counting per level")
+        
+        levels = ['HIGH', 'MEDIUM', 'LOW', 'VERY_LOW']
+        counts = await asyncio.gather(*(self._count('st_college', confidence_level=level) for level in levels))
+        breakdown = {level: count for level, count in zip(levels, counts) if count}
+        other = total - sum(counts)
+        if other > 0:
+            breakdown['UNKNOWN'] = other
+        return breakdown
+    
+    async def get_search_criteria(self, filters: dict, page: int = 0, page_size: int = 20) -> Dict:
         """
-        Fetch search criteria rows from `search_criteria` table based on optional filters.
-        `filters` is a dict with keys: location, stream, specialization, university
+        One page of saved searches from the `search_criteria` table, without their results.
+        `filters` is a dict with keys: location, career_path, specialization, university
+        
+        Only the metadata columns are selected; fetch `llm_json` for the rows
+        the user picks with get_search_criteria_results.
+        
+        Returns:
+            Dict with 'rows' (metadata dicts) and 'total' (matching rows across all pages)
         """
         try:
-            query = self.client.table("search_criteria").select("*")
+            query = self.client.table("search_criteria").select(self.SEARCH_CRITERIA_COLUMNS, count=CountMethod.exact)
             
             # Apply filters dynamically
             for key, value in filters.items():
                 if value:
                     query=query.eq(key, value)
             
-            response = query.execute()
-            if response.data:
-                return response.data
-            else:
-                print(f"Supabase returned empty data or error: {response}")
-                return []
+            start = page * page_size
+            response = await execute(query.order("id").range(start, start + page_size - 1))
+            rows = response.data or []
+            return {'rows': rows, 'total': response.count if response.count is not None else len(rows)}
         except Exception as e:
-            print(f"Error in get_search_criteria: {response.error or response.data}")
-
-            return []
+            print(f"Error in get_search_criteria: {e}")
+            return {'rows': [], 'total': 0}
     
-    async def clear_staging_tables(self) -> Dict:
-        """Clear all data from staging tables (use with caution!)"""
+    async def get_search_criteria_results(self, criteria_ids: List) -> Dict:
+        """`llm_json` of the given saved searches, keyed by id"""
+        if not criteria_ids:
+            return {}
         try:
-            relationship_response = self.client.table('st_college_course_jobs').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
-
-            college_response = self.client.table('st_college').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
-
-            course_response = self.client.table('st_course').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
+            response = await execute(self.client.table("search_criteria")
+                                     .select("id,llm_json")
+                                     .in_("id", list(criteria_ids)))
+            return {row['id']: row.get('llm_json') or {} for row in response.data or []}
+        except Exception as e:
+            print(f"Error in get_search_criteria_results: {e}")
+            return {}
+    
+    async def clear_staging_tables(self, progress_callback=None, chunk_size: int = 1000) -> Dict:
+        """
+        Clear all data from staging tables (use with caution!)
+        
+        Rows are deleted in id-ordered chunks of `chunk_size` with a minimal
+        response, so no request times out or sends deleted rows back.
+        `progress_callback(deleted, total, table)` is called after each chunk.
+        """
+        try:
+            deleted = {}
+            # Children first, so foreign keys never point at deleted rows
+            for table in ('st_college_course_jobs', 'st_college', 'st_course'):
+                deleted[table] = await self._delete_in_chunks(table, chunk_size, progress_callback)
+            self.course_resolver.invalidate()
             
             return {
                 'success': True,
-                'colleges_deleted': len(college_response.data) if college_response.data else 0,
-                'courses_deleted': len(course_response.data) if course_response.data else 0,
-                'relationships_deleted': len(relationship_response.data) if relationship_response.data else 0
+                'colleges_deleted': deleted['st_college'],
+                'courses_deleted': deleted['st_course'],
+                'relationships_deleted': deleted['st_college_course_jobs']
             }
         except Exception as e:
+            self.course_resolver.invalidate()
             print(f"Error clearing staging tables: {e}")
-            return {'success': False, 'error': str(e)}
\ No newline at end of file
+            return {'success': False, 'error': str(e)}
+    
+    async def _delete_in_chunks(self, table: str, chunk_size: int, progress_callback=None) -> int:
+        """
+        Delete every row of `table`, one id range of `chunk_size` rows per request.
+
+        Raises RuntimeError when a chunk deletes nothing (e.g. row level
+        security denies DELETE) or rows keep appearing, rather than looping.
+        """
+        total = await self._count(table)
+        deleted = 0
+        # One request per full chunk plus the final remainder request
+        max_requests = -(-total // chunk_size) + 1
+        for _ in range(max_requests):
+            # Id of the chunk's last row; the chunk is everything up to it
+            boundary = await execute(self.client.table(table).select('id').order('id')
+                                     .range(chunk_size - 1, chunk_size - 1))
+            query = self.client.table(table).delete(count=CountMethod.exact, returning=ReturnMethod.minimal)
+            if boundary.data:
+                query = query.lte('id', boundary.data[0]['id'])
+            else:
+                # Fewer than chunk_size rows are left
+                query = query.neq('id', '00000000-0000-0000-0000-000000000000')
+            response = await execute(query)
+            deleted += response.count or 0
+            if progress_callback:
+                progress_callback(deleted, max(total, deleted), table)
+            if not boundary.data:
+                break
+            if not response.count:
+                raise RuntimeError(f"Deleting from {table} removed no rows; check DELETE permissions on the table")
+        else:
+            raise RuntimeError(f"{table} still has rows after {max_requests} chunked deletes; is another process writing to it?")
+        print(f"Deleted {deleted} rows from {table}")
+        return deleted
@@ -0,0 +1,55 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+_write_executor: Optional[ThreadPoolExecutor] = None
+_write_executor_lock = threading.Lock()
+
+
+def get_write_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide pool for blocking supabase-py requests.
+
+    Its size (SUPABASE_MAX_CONCURRENT_WRITES, default 8) caps how many staging
+    requests are in flight at once across all pushes.
+    """
+    global _write_executor
+    with _write_executor_lock:
+        if _write_executor is None:
+            _write_executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("SUPABASE_MAX_CONCURRENT_WRITES", "8")),
+                thread_name_prefix="supabase-write"
+            )
+        return _write_executor
+
+
+async def execute(query, executor: ThreadPoolExecutor = None):
+    """Run a built postgrest query off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or get_write_executor(), query.execute)
+
+
+async def execute_batches(build_query: Callable[[List[Dict]], Any], rows: List[Dict], batch_size: int,
+                          executor: ThreadPoolExecutor = None,
+                          on_batch: Callable[[List[Dict], Any], None] = None) -> List[Tuple[List[Dict], Any]]:
+    """
+    Send `build_query(chunk)` for every chunk of `rows`, concurrently.
+
+    Returns (chunk, response) pairs in chunk order; a failed chunk carries its
+    exception instead of a response, so one bad batch does not sink the rest.
+    `on_batch` is called as each chunk finishes.
+    """
+    chunks = [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+
+    async def send(chunk: List[Dict]) -> Tuple[List[Dict], Any]:
+        try:
+            outcome = await execute(build_query(chunk), executor)
+        except Exception as e:
+            outcome = e
+        if on_batch:
+            on_batch(chunk, outcome)
+        return chunk, outcome
+
+    return list(await asyncio.gather(*(send(chunk) for chunk in chunks)))
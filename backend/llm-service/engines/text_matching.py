@@ -0,0 +1,152 @@
+import re
+import html
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Set
+
+# Blocks whose content is never visible text
+_INVISIBLE_BLOCKS = re.compile(r"<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>|<!--.*?-->",
+                               re.IGNORECASE | re.DOTALL)
+_INVISIBLE_BLOCK_START = re.compile(r"<(script|style|noscript|template)\b", re.IGNORECASE)
+_TAGS = re.compile(r"<[^>]*>")
+_WHITESPACE = re.compile(r"\s+")
+# A character reference that may continue in the next chunk
+_PARTIAL_ENTITY = re.compile(r"&#?\w*$")
+
+
+def extract_text(markup: str) -> str:
+    """
+    Visible text of an HTML page, lower-cased.
+
+    A regex tag stripper instead of a parse tree: one linear pass per
+    pattern, which is all keyword scanning needs.
+    """
+    text = _INVISIBLE_BLOCKS.sub(" ", markup)
+    text = _TAGS.sub(" ", text)
+    return _WHITESPACE.sub(" ", html.unescape(text)).lower()
+
+
+class KeywordMatcher:
+    """
+    Aho–Corasick automaton over a fixed set of (lower-cased) patterns.
+
+    `find` scans the text once, so its cost is linear in the text length no
+    matter how many patterns (course names, keywords) are being looked for.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = sorted({p.lower() for p in patterns if p and p.strip()})
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Set[str]] = [set()]
+
+        for pattern in self.patterns:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                state = next_state
+            self._output[state].add(pattern)
+
+        # Breadth-first pass to set failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def find(self, text: str, stop_after: int = None) -> Set[str]:
+        """Patterns occurring in `text` (already lower-cased); stops early once `stop_after` are found"""
+        found: Set[str] = set()
+        self.scan(text, 0, found, stop_after)
+        return found
+
+    def scan(self, text: str, state: int, found: Set[str], stop_after: int = None) -> int:
+        """
+        Add the patterns occurring in `text` to `found`, starting from automaton
+        `state`, and return the state to resume from with the next piece of text.
+        """
+        if not self.patterns:
+            return state
+        goto, fail, output = self._goto, self._fail, self._output
+        limit = stop_after or len(self.patterns)
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+                if len(found) >= limit:
+                    break
+        return state
+
+
+class PageScanner:
+    """
+    Runs extract_text + KeywordMatcher over HTML that arrives in chunks.
+
+    Markup that may continue in the next chunk (an open tag, comment,
+    script/style block or character reference) is held back, and the last
+    `len(longest pattern)` characters of normalised text are scanned again
+    together with the next chunk's text, so whitespace is collapsed across
+    chunk boundaries and results match scanning the whole page at once.
+    `feed` returns True once `stop_when(found)` holds (by default: every
+    pattern found), letting the caller stop downloading.
+    """
+
+    def __init__(self, matcher: KeywordMatcher, stop_when: Callable[[Set[str]], bool] = None):
+        self.matcher = matcher
+        self.stop_when = stop_when or (lambda found: len(found) >= len(matcher.patterns))
+        self.found: Set[str] = set()
+        self._tail = ""
+        self._tail_length = max(map(len, matcher.patterns), default=0)
+        self._pending = ""
+
+    @property
+    def done(self) -> bool:
+        return self.stop_when(self.found)
+
+    def feed(self, chunk: str) -> bool:
+        buffer = self._pending + chunk
+        cut = self._safe_length(buffer)
+        self._pending = buffer[cut:]
+        self._scan(buffer[:cut])
+        return self.done
+
+    def close(self) -> Set[str]:
+        self._scan(self._pending)
+        self._pending = ""
+        return self.found
+
+    def _scan(self, markup: str):
+        if markup and not self.done:
+            text = _WHITESPACE.sub(" ", self._tail + extract_text(markup))
+            self.matcher.scan(text, 0, self.found)
+            self._tail = text[-self._tail_length:] if self._tail_length else ""
+
+    @staticmethod
+    def _safe_length(buffer: str) -> int:
+        cut = len(buffer)
+        last_open = buffer.rfind("<")
+        if last_open > buffer.rfind(">"):
+            cut = last_open
+        entity = _PARTIAL_ENTITY.search(buffer)
+        if entity:
+            cut = min(cut, entity.start())
+        comment = buffer.rfind("<!--")
+        if comment != -1 and buffer.find("-->", comment) == -1:
+            cut = min(cut, comment)
+        for block in _INVISIBLE_BLOCK_START.finditer(buffer):
+            if not re.search(rf"</{block.group(1)}\s*>", buffer[block.end():], re.IGNORECASE):
+                cut = min(cut, block.start())
+                break
+        return cut
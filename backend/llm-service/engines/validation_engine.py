@@ -1,61 +1,145 @@
+import os
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
+from datetime import datetime
 from urllib.parse import urlparse, urljoin
-import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 from models.college import College, EvidenceStatus
+from engines.rate_limiter import DomainRateLimiter, get_domain_rate_limiter
+from engines.http_cache import HTTPCache, HTTPResult, content_length, is_html, read_html
+from engines.text_matching import KeywordMatcher, PageScanner
+from engines.recognition_index import RecognitionIndex, get_recognition_index
+from engines.validation_store import ValidationStore
+from engines.http_session import SessionFactory, get_validation_session_factory
+
+EDU_KEYWORDS = ['college', 'university', 'admission', 'course', 
+                'department', 'student', 'faculty', 'program']
+EDU_KEYWORD_MATCHER = KeywordMatcher(EDU_KEYWORDS)
+
 
 class EvidenceValidator:
-    def __init__(self, delay: float = 2.0):
+    COURSE_PATHS = ['/courses', '/academics', '/programs', '/programmes', 
+                    '/admissions', '/departments', '/courses.html', '/academics.html']
+
+    def __init__(self, delay: float = 2.0, max_concurrent: int = None,
+                 domain_limiter: DomainRateLimiter = None, http_cache: HTTPCache = None,
+                 use_http_cache: bool = True, max_page_bytes: int = None,
+                 recognition_index: RecognitionIndex = None, validation_store: ValidationStore = None,
+                 use_validation_store: bool = True, session_factory: SessionFactory = None):
         self.delay = delay
-        self.last_request = {}
+        self.max_concurrent = max_concurrent or int(os.getenv("VALIDATION_MAX_CONCURRENT", "8"))
+        # Shared across validators so reruns and parallel runs stay polite together;
+        # it also caps concurrent requests per domain (VALIDATION_MAX_REQUESTS_PER_DOMAIN)
+        self.domain_limiter = domain_limiter if domain_limiter is not None else get_domain_rate_limiter()
+        self.use_http_cache = use_http_cache
+        # Bodies are streamed and cut off here, so big homepages and PDFs stay cheap
+        self.max_page_bytes = max_page_bytes or int(float(os.getenv("VALIDATION_MAX_PAGE_KB", "512")) * 1024)
+        # Loaded once per process from the regulator CSV dumps
+        self.recognition_index = recognition_index if recognition_index is not None else get_recognition_index()
+        self.use_validation_store = use_validation_store
+        self._validation_store = validation_store
+        self.stats = {'validated': 0, 'reused': 0}
+        # Long-lived pooled sessions (DNS cache, keep-alive) shared by every validator
+        self.session_factory = session_factory if session_factory is not None else get_validation_session_factory()
+        self._http_cache = http_cache
         self.govt_portals = {
             "aicte": "https://www.aicte-india.org/",
             "ugc": "https://www.ugc.ac.in/",
             "aishe": "https://aishe.gov.in/",
             "nirf": "https://www.nirfindia.org/"
         }
+
+    @property
+    def http_cache(self) -> Optional[HTTPCache]:
+        """On-disk cache for page fetches (created on first use), or None if disabled"""
+        if not self.use_http_cache:
+            return None
+        if self._http_cache is None:
+            self._http_cache = HTTPCache.from_env()
+        return self._http_cache
+
+    @property
+    def validation_store(self) -> Optional[ValidationStore]:
+        """Persistent validation results (created on first use), or None if disabled"""
+        if not self.use_validation_store:
+            return None
+        if self._validation_store is None:
+            self._validation_store = ValidationStore.from_env()
+        return self._validation_store
+
+    def create_session(self) -> aiohttp.ClientSession:
+        """A private session with the shared connector settings (caller closes it)"""
+        return self.session_factory.create_session()
         
-    async def validate_colleges(self, colleges: List[College]) -> List[College]:
-        """Validate all colleges and update their evidence status"""
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={'User-Agent': 'Educational Data Validator 1.0'}
-        ) as session:
-            
-            for college in colleges:
-                try:
-                    validation_result = await self._validate_single_college(session, college)
-                    
-                    college.evidence_status = validation_result['evidence_status']
-                    college.evidence_urls = validation_result['evidence_urls']
-                    
-                    college.validation_details = validation_result['validation_details']
-                    
-                    college.overall_confidence = self._calculate_final_confidence(
-                        college.overall_confidence,
-                        validation_result
-                    )
-                    
-                    for course in college.courses:
-                        course.evidence_urls = validation_result.get('course_evidence', [])
+    async def validate_colleges(self, colleges: List[College], progress_callback=None,
+                                session: aiohttp.ClientSession = None) -> List[College]:
+        """
+        Validate all colleges and update their evidence status.
+
+        Up to `max_concurrent` colleges are validated at once over one session;
+        per-domain politeness is still enforced by `_request_slot`. Without a
+        `session`, the event loop's shared pooled session is used, so repeated
+        calls reuse DNS results and open connections. progress_callback(current, total, name)
+        is called as each college finishes. Results still fresh in the
+        validation store are reused without any network calls.
+        """
+        if session is None:
+            session = self.session_factory.get_session()
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent))
+        completed = 0
 
+        async def validate(college: College):
+            nonlocal completed
+            async with semaphore:
+                try:
+                    store = self.validation_store
+                    validation_result = store.get(college) if store else None
+                    if validation_result is None:
+                        validation_result = await self._validate_single_college(session, college)
+                        if store:
+                            store.put(college, validation_result)
+                        self.stats['validated'] += 1
+                    else:
+                        self.stats['reused'] += 1
+                    self._apply_validation_result(college, validation_result)
                 except Exception as e:
                     print(f"Validation error for {college.name}: {e}")
-                    college.evidence_status = EvidenceStatus.NO_EVIDENCE_FOUND
-                    college.overall_confidence *= 0.6
-                    college.validation_details = {
-                        'website_accessible': False,
-                        'website_appears_educational': False,
-                        'courses_found': 0,
-                        'total_courses': len(college.courses),
-                        'govt_verified': False,
-                        'domain_quality': 'Unknown',
-                        'error': str(e)
-                    }
-            
+                    self._apply_validation_error(college, e)
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, len(colleges), college.name)
+
+        await asyncio.gather(*(validate(college) for college in colleges))
         return colleges
+
+    def _apply_validation_result(self, college: College, validation_result: Dict):
+        """Copy a validation result onto the college and its courses"""
+        college.evidence_status = validation_result['evidence_status']
+        college.evidence_urls = validation_result['evidence_urls']
+        
+        college.validation_details = validation_result['validation_details']
+        
+        college.overall_confidence = self._calculate_final_confidence(
+            college.overall_confidence,
+            validation_result
+        )
+        
+        for course in college.courses:
+            course.evidence_urls = validation_result.get('course_evidence', [])
+
+    def _apply_validation_error(self, college: College, error: Exception):
+        college.evidence_status = EvidenceStatus.NO_EVIDENCE_FOUND
+        college.overall_confidence *= 0.6
+        college.validation_details = {
+            'website_accessible': False,
+            'website_appears_educational': False,
+            'courses_found': 0,
+            'total_courses': len(college.courses),
+            'govt_verified': False,
+            'domain_quality': 'Unknown',
+            'error': str(error)
+        }
     
     async def _validate_single_college(self, session: aiohttp.ClientSession, college: College) -> Dict:
         """Validate a single college and return detailed evidence data"""
@@ -103,7 +187,7 @@ class EvidenceValidator:
             validation_scores['appears_educational'] = False
             validation_scores['edu_score'] = 0
 
-        govt_result = await self._check_govt_presence(session, college.name)
+        govt_result = await self._check_govt_presence(session, college.name, college.city)
         validation_scores['govt_verified'] = govt_result['found']
         
         if govt_result['found']:
@@ -137,8 +221,10 @@ class EvidenceValidator:
             'total_courses': validation_scores['total_courses'],
             'course_match_percentage': (validation_scores['courses_found_count'] / validation_scores['total_courses'] * 100) if validation_scores['total_courses'] > 0 else 0,
             'govt_verified': validation_scores['govt_verified'],
+            'govt_matches': govt_result['matches'],
             'domain_type': validation_scores['domain_type'],
             'domain_quality_adjustment': validation_scores['domain_quality_adjustment'],
+            'validated_at': datetime.now().isoformat(timespec='seconds'),
             'adjustments': {
                 'website': validation_scores['website_adjustment'],
                 'course_evidence': validation_scores['course_evidence_adjustment'],
@@ -223,25 +309,18 @@ class EvidenceValidator:
     
     async def _validate_website(self, session: aiohttp.ClientSession, url: str) -> Dict:
         """Check if website is accessible and appears to be a valid college site"""
-        await self._rate_limit(url)
-
         try:
-            async with session.get(url, allow_redirects=True) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    soup = BeautifulSoup(content, 'html.parser')
-
-                    text_content = soup.get_text().lower()
-                    edu_keywords = ['college', 'university', 'admission', 'course', 
-                                   'department', 'student', 'faculty', 'program']
-                    edu_score = sum(1 for keyword in edu_keywords if keyword in text_content)
-
-                    return {
-                        'accessible': True,
-                        'appears_educational': edu_score >= 3,
-                        'content_length': len(content),
-                        'edu_score': edu_score
-                    }
+            # Reading stops once every keyword has been seen
+            response, keywords = await self._scan_page(session, url, EDU_KEYWORD_MATCHER)
+            if response.status == 200:
+                edu_score = len(keywords)
+
+                return {
+                    'accessible': True,
+                    'appears_educational': edu_score >= 3,
+                    'content_length': response.content_length or 0,
+                    'edu_score': edu_score
+                }
                 
         except Exception as e:
             print(f"Website validation error for {url}: {e}")
@@ -254,45 +333,144 @@ class EvidenceValidator:
         }
     
     async def _find_course_evidence(self, session: aiohttp.ClientSession, college: College) -> List[str]:
-        """Look for course-specific evidence on college website"""
+        """
+        Look for course-specific evidence on college website.
+
+        Candidate pages are probed concurrently, within the domain limiter's
+        per-domain cap shared with every other college on the same host, and
+        the remaining probes are cancelled once every course has been matched.
+        """
         evidence_urls = []
         courses_found = set()
+        if not college.courses:
+            return evidence_urls
+
+        # A course counts as found if its name, or any word of it, is on the page
+        course_patterns: Dict[str, Set[str]] = {}
+        for course in college.courses:
+            name_lower = course.name.lower()
+            for pattern in [name_lower, *name_lower.split()]:
+                course_patterns.setdefault(pattern, set()).add(course.name)
+        matcher = KeywordMatcher(course_patterns)
+
+        course_urls = [urljoin(college.website, path) for path in self.COURSE_PATHS]
+
+        def courses_matched(patterns: Set[str]) -> Set[str]:
+            return set().union(*(course_patterns[pattern] for pattern in patterns))
+
+        def covers_remaining(patterns: Set[str]) -> bool:
+            # Stop reading a page once it (with earlier pages) accounts for every course
+            return len(courses_found | courses_matched(patterns)) >= len(college.courses)
+
+        tasks = [asyncio.create_task(self._fetch_course_page(session, url, matcher, covers_remaining))
+                 for url in course_urls]
 
         try:
-            course_paths = ['/courses', '/academics', '/programs', '/programmes', 
-                          '/admissions', '/departments', '/courses.html', '/academics.html']
+            for next_page in asyncio.as_completed(tasks):
+                course_url, patterns = await next_page
+                page_courses = courses_matched(patterns)
+
+                if page_courses - courses_found:
+                    evidence_urls.append(course_url)
+                    courses_found |= page_courses
 
-            for path in course_paths:
                 if len(courses_found) >= len(college.courses):
                     break
-                    
-                course_url = urljoin(college.website, path)
-                await self._rate_limit(course_url)
-
-                try:
-                    async with session.get(course_url, allow_redirects=True) as response:
-                        if response.status == 200:
-                            content = await response.text()
-                            content_lower = content.lower()
-
-                            for course in college.courses:
-                                course_name_lower = course.course_name.lower()
-                                if (course_name_lower in content_lower or 
-                                    any(word in content_lower for word in course_name_lower.split())):
-                                    if course.course_name not in courses_found:
-                                        evidence_urls.append(course_url)
-                                        courses_found.add(course.course_name)
-                
-                except Exception:
-                    continue
 
         except Exception as e:
             print(f"Course evidence search error: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        # De-duplicate, keeping the order of COURSE_PATHS
+        return [url for url in course_urls if url in evidence_urls]
+
+    async def _fetch_course_page(self, session: aiohttp.ClientSession, url: str,
+                                 matcher: KeywordMatcher, stop_when) -> Tuple[str, Set[str]]:
+        """Return (url, patterns found on the page); missing pages find nothing"""
+        try:
+            # A cached page is revalidated by the conditional GET directly;
+            # otherwise a HEAD rules out missing pages and non-HTML files
+            if not (self.http_cache and self.http_cache.lookup(url)):
+                async with self._request_slot(url), session.head(url, allow_redirects=True) as response:
+                    if response.status in (404, 410):
+                        if self.http_cache:
+                            self.http_cache.remember_missing(url, response.status, response.headers)
+                        return url, set()
+                    if response.status == 200 and not is_html(response.headers.get('Content-Type', '')):
+                        return url, set()
+                    # Anything else (e.g. 405 for servers without HEAD support) falls through to GET
 
-        return list(set(evidence_urls))
+            _, patterns = await self._scan_page(session, url, matcher, stop_when)
+            return url, patterns
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass
+        return url, set()
+
+    async def _scan_page(self, session: aiohttp.ClientSession, url: str, matcher: KeywordMatcher,
+                         stop_when=None) -> Tuple[HTTPResult, Set[str]]:
+        """
+        Fetch `url` and return the matcher patterns found in its visible text.
+
+        Fresh downloads are scanned chunk by chunk as they stream in, so the
+        read stops as soon as `stop_when(found)` holds; cached bodies are
+        scanned in one go. A cached body that an earlier scan cut short is
+        downloaded again only if it does not satisfy this scan.
+        """
+        scanner = PageScanner(matcher, stop_when)
+        response = await self._fetch(session, url, on_chunk=scanner.feed)
+        if response.status != 200 or response.text is None:
+            return response, set()
+        if response.from_cache:
+            scanner.feed(response.text)
+            found = scanner.close()
+            if response.complete or scanner.done:
+                return response, found
+            scanner = PageScanner(matcher, stop_when)
+            response = await self._fetch(session, url, on_chunk=scanner.feed, use_cached=False)
+            if response.status != 200 or response.text is None:
+                return response, set()
+        return response, scanner.close()
     
-    async def _check_govt_presence(self, session: aiohttp.ClientSession, college_name: str) -> Dict:
-        """Check for government recognition indicators"""
+    async def _fetch(self, session: aiohttp.ClientSession, url: str, on_chunk=None,
+                     use_cached: bool = True) -> HTTPResult:
+        """GET through the HTTP cache; fresh cache hits skip the rate limit"""
+        if self.http_cache:
+            return await self.http_cache.fetch(session, url, request_slot=lambda: self._request_slot(url),
+                                               max_bytes=self.max_page_bytes, on_chunk=on_chunk,
+                                               use_cached=use_cached)
+        async with self._request_slot(url), session.get(url, allow_redirects=True) as response:
+            text, complete = None, True
+            if response.status == 200:
+                text, complete = await read_html(response, self.max_page_bytes, on_chunk)
+            return HTTPResult(url, response.status, text, response.headers.get('Content-Type', ''),
+                              complete=complete, content_length=content_length(response.headers, text))
+
+    async def _check_govt_presence(self, session: aiohttp.ClientSession, college_name: str,
+                                   city: str = "") -> Dict:
+        """
+        Check for government recognition.
+
+        Looks the college up in the offline AICTE/UGC/AISHE index first; falls
+        back to name heuristics (IIT, NIT, "Government ...") when there is no
+        match or no index has been loaded.
+        """
+        matches = self.recognition_index.lookup(college_name, city)
+        if matches:
+            return {
+                'found': True,
+                'urls': list(dict.fromkeys(record.source_url for record, _ in matches)),
+                'matches': [
+                    {'source': record.source, 'name': record.name, 'city': record.city,
+                     'record_id': record.record_id, 'score': score}
+                    for record, score in matches
+                ]
+            }
+
         college_name_lower = college_name.lower()
         
         govt_indicators = [
@@ -313,16 +491,10 @@ class EvidenceValidator:
         
         return {
             'found': found,
-            'urls': urls
+            'urls': urls,
+            'matches': []
         }
     
-    async def _rate_limit(self, url: str):
-        """Implement rate limiting per domain"""
-        domain = urlparse(url).netloc
-
-        if domain in self.last_request:
-            elapsed = time.time() - self.last_request[domain]
-            if elapsed < self.delay:
-                await asyncio.sleep(self.delay - elapsed)
-
-        self.last_request[domain] = time.time()
\ No newline at end of file
+    def _request_slot(self, url: str):
+        """Per-domain slot every outgoing request holds: spaced by `delay`, concurrency capped"""
+        return self.domain_limiter.request(urlparse(url).netloc.lower(), self.delay)
\ No newline at end of file
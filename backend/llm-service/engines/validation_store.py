@@ -0,0 +1,71 @@
+import os
+import time
+from typing import Dict, Optional
+from engines.cache_store import SQLiteCache, hash_key
+from engines.normalization import normalize_name, website_domain
+from models.college import College, EvidenceStatus
+
+
+class ValidationStore:
+    """
+    Persistent validation results, keyed by normalized website + college name.
+
+    A stored result is reused while it is younger than `freshness_seconds`
+    and the inputs it was computed from (website URL, city, course list)
+    are unchanged, so overlapping searches only re-validate new, stale or
+    changed colleges. The stored result is the raw validation outcome; the
+    final confidence is recomputed from the college's current LLM confidence.
+    """
+
+    def __init__(self, cache: SQLiteCache, freshness_seconds: float, clock=time.time):
+        self.cache = cache
+        self.freshness_seconds = freshness_seconds
+        self._clock = clock
+
+    @classmethod
+    def from_env(cls) -> "ValidationStore":
+        freshness_seconds = float(os.getenv("VALIDATION_STORE_DAYS", "7")) * 86400
+        cache = SQLiteCache(
+            os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3")),
+            table="validation_results",
+            # Kept past freshness so the fetch history survives re-validation
+            ttl_seconds=freshness_seconds * 4,
+            max_entries=int(os.getenv("VALIDATION_STORE_MAX_ENTRIES", "50000"))
+        )
+        return cls(cache, freshness_seconds)
+
+    def _key(self, college: College) -> str:
+        return hash_key(website_domain(college.website), normalize_name(college.name))
+
+    @staticmethod
+    def fingerprint(college: College) -> str:
+        """Hash of everything validation reads from the college"""
+        return hash_key(
+            college.website.strip().lower(),
+            normalize_name(college.city),
+            sorted(normalize_name(course.name) for course in college.courses)
+        )
+
+    def get(self, college: College) -> Optional[Dict]:
+        """Stored validation result for `college`, or None if missing, stale or changed"""
+        entry = self.cache.get(self._key(college))
+        if entry is None:
+            return None
+        if self._clock() - entry["validated_at"] > self.freshness_seconds:
+            return None
+        if entry["fingerprint"] != self.fingerprint(college):
+            return None
+        result = dict(entry["result"])
+        result["evidence_status"] = EvidenceStatus(result["evidence_status"])
+        return result
+
+    def put(self, college: College, result: Dict):
+        stored = dict(result)
+        stored["evidence_status"] = result["evidence_status"].value
+        self.cache.set(self._key(college), {
+            "college_name": college.name,
+            "website": college.website,
+            "fingerprint": self.fingerprint(college),
+            "validated_at": self._clock(),
+            "result": stored,
+        })
@@ -1,4 +1,5 @@
 import logging
+import os
 import json
 import sys
 from datetime import datetime
@@ -38,7 +39,8 @@ def setup_logger(name: str = "scraping_service", level: int = logging.INFO):
         logger.addHandler(console_handler)
         
         # File Handler
-        file_handler = logging.FileHandler("scraping_service.log")
+        # Opened on first write, so tests can redirect it before anything is logged
+        file_handler = logging.FileHandler(os.getenv("SCRAPING_SERVICE_LOG_FILE", "scraping_service.log"), delay=True)
         file_handler.setFormatter(JsonFormatter())
         logger.addHandler(file_handler)
         
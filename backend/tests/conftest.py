@@ -6,8 +6,11 @@ Playwright stubs) so individual test modules can stay lean.
 
 pytest_plugins = [
     "tests.scraping_service.fixtures.playwright_mocks",
+    "tests.llm_service.fixtures.gemini_mocks",
+    "tests.llm_service.fixtures.supabase_mocks",
 ]
 
+import logging
 import pathlib
 import sys
 
@@ -16,13 +19,26 @@ import pytest
 
 PROJECT_ROOT = pathlib.Path(__file__).resolve().parents[1]
 SCRAPING_SERVICE_PATH = PROJECT_ROOT / "scraping-service"
+LLM_SERVICE_PATH = PROJECT_ROOT / "llm-service"
 
-scraping_path_str = str(SCRAPING_SERVICE_PATH)
-if scraping_path_str not in sys.path:
-    sys.path.insert(0, scraping_path_str)
+for service_path in (SCRAPING_SERVICE_PATH, LLM_SERVICE_PATH):
+    service_path_str = str(service_path)
+    if service_path_str not in sys.path:
+        sys.path.insert(0, service_path_str)
 
 
 @pytest.fixture
 def project_root() -> pathlib.Path:
     """Absolute path to backend root for loading fixtures/data."""
     return PROJECT_ROOT
+
+
+@pytest.fixture(autouse=True)
+def isolate_log_files(tmp_path):
+    """Point service file loggers at tmp_path so test runs never write into the tree."""
+    for logger in list(logging.Logger.manager.loggerDict.values()):
+        for handler in getattr(logger, "handlers", []):
+            if isinstance(handler, logging.FileHandler):
+                handler.close()
+                handler.baseFilename = str(tmp_path / pathlib.Path(handler.baseFilename).name)
+    yield
@@ -0,0 +1,114 @@
+"""Reusable Gemini dummy objects and fixtures for llm-service tests."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Callable, List, Optional, Union
+
+import pytest
+
+from engines.batch_planner import CourseBatchPlanner
+from engines.cache_store import SQLiteCache
+from engines.course_cache import CollegeCourseCache
+from engines.llm_engine import CollegeDiscoveryEngine
+from engines.rate_limiter import GeminiRateLimiter
+
+
+class DummyGeminiResponse:
+    def __init__(self, text: str, finish_reason: str = "STOP", output_tokens: Optional[int] = None):
+        self.text = text
+        self.candidates = [SimpleNamespace(finish_reason=SimpleNamespace(name=finish_reason))]
+        self.usage_metadata = SimpleNamespace(
+            candidates_token_count=output_tokens,
+            total_token_count=output_tokens,
+        )
+
+
+class DummyGeminiStream:
+    """Async iterator over a response split into fixed-size chunks."""
+
+    def __init__(self, text: str, chunk_size: int, delay: float, client: "DummyGeminiClient"):
+        self._chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        self._delay = delay
+        self._client = client
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._delay)
+            yield DummyGeminiResponse(chunk)
+        self._client.streams_finished += 1
+
+
+class DummyGeminiClient:
+    """Stands in for `genai.GenerativeModel`, replaying canned responses.
+
+    `responder` may be a list of responses (returned in order) or a callable
+    receiving the prompt. A response is either plain text or a prepared
+    `DummyGeminiResponse` (to control finish reason / token usage).
+    """
+
+    def __init__(self, responder: Union[List[str], Callable[[str], str]], delay: float = 0.0,
+                 stream_chunk_size: int = 16):
+        self._responder = responder
+        self.delay = delay
+        self.stream_chunk_size = stream_chunk_size
+        self.streams_finished = 0
+        self.prompts: List[str] = []
+        self.generation_configs: List[dict] = []
+        self.sync_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _next_response(self, prompt: str) -> DummyGeminiResponse:
+        response = self._responder(prompt) if callable(self._responder) else self._responder.pop(0)
+        if isinstance(response, str):
+            response = DummyGeminiResponse(response)
+        return response
+
+    def generate_content(self, prompt, generation_config=None):
+        self.sync_calls += 1
+        self.prompts.append(prompt)
+        return self._next_response(prompt)
+
+    async def generate_content_async(self, prompt, generation_config=None, stream=False):
+        self.generation_configs.append(generation_config)
+        if stream:
+            self.prompts.append(prompt)
+            return DummyGeminiStream(self._next_response(prompt).text, self.stream_chunk_size, self.delay, self)
+
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self._next_response(prompt)
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def gemini_engine_factory(tmp_path):
+    """Build engines around a `DummyGeminiClient`; caches live under tmp_path when enabled."""
+
+    def _build(responder, delay: float = 0.0, use_cache: bool = False) -> CollegeDiscoveryEngine:
+        cache_path = str(tmp_path / "llm_cache.sqlite3")
+        engine = CollegeDiscoveryEngine(
+            api_key="test-key",
+            model="gemini-test",
+            rate_limiter=GeminiRateLimiter(requests_per_minute=6000, tokens_per_minute=10_000_000),
+            response_cache=SQLiteCache(cache_path, table="prompt_responses"),
+            course_cache=CollegeCourseCache(
+                SQLiteCache(cache_path, table="college_courses"), freshness_seconds=3600
+            ),
+            use_cache=use_cache,
+            # Fresh per engine, so estimates learned in one test never size another's batches
+            batch_planner=CourseBatchPlanner(),
+        )
+        engine.client = DummyGeminiClient(responder, delay=delay)
+        return engine
+
+    return _build
@@ -0,0 +1,166 @@
+"""In-memory stand-in for the subset of the Supabase client used by SupabaseIntegration."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import pytest
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeSupabaseClient", table: str):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._columns: Optional[List[str]] = None
+        self._rows: List[Dict] = []
+        self._filters = []
+
+    def select(self, columns: str = "*", count=None, head: bool = None):
+        self._action = "head" if head else "select"
+        self._columns = None if columns == "*" else [c.strip() for c in columns.split(",")]
+        self._count = count
+        return self
+
+    def insert(self, rows, returning=None):
+        self._action = "insert"
+        self._rows = rows if isinstance(rows, list) else [rows]
+        self._returning = returning
+        return self
+
+    def upsert(self, rows, on_conflict: str = "", ignore_duplicates: bool = False, returning=None):
+        self.insert(rows, returning)
+        self._action = "upsert"
+        self._conflict_columns = [column.strip() for column in on_conflict.split(",") if column.strip()]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def delete(self, count=None, returning=None):
+        self._action = "delete"
+        self._count = count
+        self._returning = returning
+        return self
+
+    def lte(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) <= value)
+        return self
+
+    def eq(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column: str, value):
+        self._filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def in_(self, column: str, values):
+        values = list(values)
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column: str, desc: bool = False):
+        self._order = (column, desc)
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end)
+        return self
+
+    def limit(self, size: int):
+        self._range = (0, size - 1)
+        return self
+
+    def execute(self):
+        with self._client.lock:
+            return self._execute()
+
+    def _execute(self):
+        self._client.requests.append((self._table, self._action))
+        failure = self._client.fail_requests.get((self._table, self._action))
+        if failure is not None:
+            raise failure
+        table = self._client.tables.setdefault(self._table, [])
+        if self._action in ("insert", "upsert"):
+            failing = self._client.fail_inserts.get(self._table)
+            if failing and any(failing(row) for row in self._rows):
+                raise RuntimeError(f"{self._action} into {self._table} rejected")
+            written = []
+            for row in self._rows:
+                existing = None
+                if self._action == "upsert":
+                    existing = next((stored for stored in table if all(
+                        stored.get(column) == row.get(column) for column in self._conflict_columns
+                    )), None)
+                if existing is None:
+                    existing = dict(row, id=f"{self._table}-{next(self._client.ids)}")
+                    table.append(existing)
+                elif self._ignore_duplicates:
+                    continue
+                else:
+                    existing.update(row)
+                written.append(dict(existing))
+            if getattr(self._returning, "value", None) == "minimal":
+                written = []
+            return SimpleNamespace(data=written, count=None)
+
+        rows = [row for row in table if all(check(row) for check in self._filters)]
+        if self._action == "delete":
+            denied = self._client.deny_deletes.get(self._table)
+            if denied:
+                rows = [row for row in rows if not denied(row)]
+            table[:] = [row for row in table if row not in rows]
+            data = [] if getattr(self._returning, "value", None) == "minimal" else rows
+            return SimpleNamespace(data=data, count=len(rows) if self._count else None)
+        count = len(rows) if getattr(self, "_count", None) else None
+        if self._action == "head":
+            return SimpleNamespace(data=[], count=count)
+        if getattr(self, "_order", None):
+            column, desc = self._order
+            rows = sorted(rows, key=lambda row: str(row.get(column)), reverse=desc)
+        if getattr(self, "_range", None):
+            start, end = self._range
+            rows = rows[start:end + 1]
+        if self._columns is not None:
+            rows = [{column: row.get(column) for column in self._columns} for row in rows]
+        return SimpleNamespace(data=[dict(row) for row in rows], count=count)
+
+
+class FakeSupabaseClient:
+    """Tables are lists of dicts; every executed request is logged as (table, action)."""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict]] = {}
+        self.requests: List[tuple] = []
+        self.fail_inserts: Dict[str, object] = {}
+        # (table, action) -> exception raised by every such request
+        self.fail_requests: Dict[tuple, Exception] = {}
+        # table -> predicate for rows deletes silently skip, like a row level security policy
+        self.deny_deletes: Dict[str, object] = {}
+        # Stored procedures reachable through rpc(): name -> fn(client, **params) -> rows
+        self.functions: Dict[str, object] = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict] = None):
+        client = self
+
+        class Call:
+            def execute(self):
+                with client.lock:
+                    client.requests.append((name, "rpc"))
+                    if name not in client.functions:
+                        raise RuntimeError(f"Could not find the function public.{name}")
+                    return SimpleNamespace(data=client.functions[name](client, **(params or {})), count=None)
+
+        return Call()
+
+
+@pytest.fixture
+def fake_supabase() -> FakeSupabaseClient:
+    return FakeSupabaseClient()
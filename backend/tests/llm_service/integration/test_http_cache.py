@@ -0,0 +1,197 @@
+"""Integration tests for `engines.http_cache` against a local aiohttp server."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from engines.cache_store import SQLiteCache
+from engines.http_cache import HTTPCache, read_html
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _site(requests: list) -> web.Application:
+    async def etag_page(request):
+        requests.append(("etag", request.headers.get("If-None-Match")))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304, headers={"ETag": '"v1"'})
+        return web.Response(text="<h1>Courses</h1>", content_type="text/html", headers={"ETag": '"v1"'})
+
+    async def fresh_page(request):
+        requests.append(("fresh", None))
+        return web.Response(text="<h1>About</h1>", content_type="text/html",
+                            headers={"Cache-Control": "public, max-age=600"})
+
+    async def private_page(request):
+        requests.append(("private", None))
+        return web.Response(text="secret", content_type="text/html",
+                            headers={"Cache-Control": "no-store", "ETag": '"p"'})
+
+    async def missing_page(request):
+        requests.append(("missing", None))
+        raise web.HTTPNotFound()
+
+    app = web.Application()
+    app.router.add_get("/etag", etag_page)
+    app.router.add_get("/fresh", fresh_page)
+    app.router.add_get("/private", private_page)
+    app.router.add_get("/missing", missing_page)
+    return app
+
+
+def _run(tmp_path, paths):
+    requests = []
+    clock = FakeClock()
+    cache = HTTPCache(SQLiteCache(str(tmp_path / "http.sqlite3"), table="http_responses"), clock=clock)
+
+    async def run():
+        server = TestServer(_site(requests))
+        await server.start_server()
+        results = []
+        try:
+            async with aiohttp.ClientSession() as session:
+                for path, advance in paths:
+                    clock.now += advance
+                    results.append(await cache.fetch(session, str(server.make_url(path))))
+        finally:
+            await server.close()
+        return results
+
+    return asyncio.run(run()), requests, cache
+
+
+def test_etag_page_is_revalidated_with_304(tmp_path):
+    results, requests, cache = _run(tmp_path, [("/etag", 0), ("/etag", 7 * 86400)])
+
+    assert requests == [("etag", None), ("etag", '"v1"')]
+    assert results[1].status == 200
+    assert results[1].text == "<h1>Courses</h1>"
+    assert results[1].from_cache is True
+    assert cache.stats == {"fresh": 0, "revalidated": 1, "fetched": 1}
+
+
+def test_max_age_serves_without_request_until_stale(tmp_path):
+    results, requests, cache = _run(tmp_path, [("/fresh", 0), ("/fresh", 60), ("/fresh", 600)])
+
+    assert requests == [("fresh", None), ("fresh", None)]
+    assert results[1].from_cache is True
+    assert results[2].from_cache is False
+
+
+def test_missing_pages_are_remembered_and_no_store_is_not_cached(tmp_path):
+    results, requests, cache = _run(tmp_path, [("/missing", 0), ("/missing", 60),
+                                               ("/private", 0), ("/private", 0)])
+
+    assert [r.status for r in results] == [404, 404, 200, 200]
+    assert requests.count(("missing", None)) == 1
+    assert requests.count(("private", None)) == 2
+
+
+def test_request_slot_is_held_only_for_network_requests(tmp_path):
+    calls = []
+    clock = FakeClock()
+    cache = HTTPCache(SQLiteCache(str(tmp_path / "http.sqlite3"), table="http_responses"), clock=clock)
+
+    @contextlib.asynccontextmanager
+    async def request_slot():
+        calls.append("enter")
+        yield
+        calls.append("exit")
+
+    async def run():
+        server = TestServer(_site([]))
+        await server.start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                url = str(server.make_url("/fresh"))
+                await cache.fetch(session, url, request_slot=request_slot)
+                await cache.fetch(session, url, request_slot=request_slot)
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+    assert calls == ["enter", "exit"]
+
+
+def _large_site(requests: list) -> web.Application:
+    async def big_page(request):
+        requests.append("big")
+        if request.headers.get("If-None-Match") == '"big"':
+            return web.Response(status=304, headers={"ETag": '"big"'})
+        body = "<p>" + "filler " * 50_000 + "</p><h1>Admissions</h1>"
+        return web.Response(text=body, content_type="text/html", headers={"ETag": '"big"'})
+
+    async def brochure(request):
+        requests.append("pdf")
+        return web.Response(body=b"%PDF-1.4" + b"0" * 200_000, content_type="application/pdf")
+
+    app = web.Application()
+    app.router.add_get("/big", big_page)
+    app.router.add_get("/brochure", brochure)
+    return app
+
+
+def test_read_html_caps_body_and_skips_non_html():
+    async def run():
+        server = TestServer(_large_site([]))
+        await server.start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(server.make_url("/big")) as response:
+                    capped = await read_html(response, max_bytes=20_000)
+                async with session.get(server.make_url("/brochure")) as response:
+                    pdf = await read_html(response, max_bytes=20_000)
+                async with session.get(server.make_url("/big")) as response:
+                    stopped = await read_html(response, on_chunk=lambda text: "filler" in text)
+        finally:
+            await server.close()
+        return capped, pdf, stopped
+
+    capped, pdf, stopped = asyncio.run(run())
+
+    assert len(capped[0]) == 20_000 and capped[1] is True
+    assert pdf == (None, True)
+    assert stopped[1] is False
+    assert len(stopped[0]) < 100_000
+
+
+def test_bodies_cut_short_by_on_chunk_are_cached_as_partial(tmp_path):
+    requests = []
+    cache = HTTPCache(SQLiteCache(str(tmp_path / "http.sqlite3"), table="http_responses"))
+
+    async def run():
+        server = TestServer(_large_site(requests))
+        await server.start_server()
+        try:
+            async with aiohttp.ClientSession() as session:
+                url = str(server.make_url("/big"))
+                first = await cache.fetch(session, url, on_chunk=lambda text: True)
+                revalidated = await cache.fetch(session, url)
+                full = await cache.fetch(session, url, use_cached=False)
+        finally:
+            await server.close()
+        return first, revalidated, full
+
+    first, revalidated, full = asyncio.run(run())
+
+    assert first.complete is False
+    assert first.content_length == full.content_length > len(first.text)
+    # The ETag of the partial read is sent, so an unchanged page costs a 304
+    assert revalidated.from_cache is True and revalidated.complete is False
+    assert revalidated.text == first.text
+    assert cache.stats["revalidated"] == 1
+    assert full.complete is True and full.from_cache is False
+    assert requests == ["big", "big", "big"]
+    assert cache.lookup(str(full.url))["complete"] is True
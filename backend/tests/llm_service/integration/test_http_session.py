@@ -0,0 +1,49 @@
+"""Integration tests for `engines.http_session`."""
+
+from __future__ import annotations
+
+import asyncio
+
+from engines.http_session import SessionFactory, get_validation_session_factory
+
+
+def test_one_shared_session_per_event_loop():
+    factory = SessionFactory(limit=10, limit_per_host=2, ttl_dns_cache=120, keepalive_timeout=15)
+
+    async def run():
+        first = factory.get_session()
+        second = factory.get_session()
+        connector = first.connector
+        await factory.close()
+        return first, second, connector
+
+    first, second, connector = asyncio.run(run())
+    other_loop_session, *_ = asyncio.run(run())
+
+    assert first is second
+    assert first.closed
+    assert other_loop_session is not first
+    assert (connector.limit, connector.limit_per_host) == (10, 2)
+    assert connector.use_dns_cache is True
+
+
+def test_closed_session_is_replaced():
+    factory = SessionFactory()
+
+    async def run():
+        first = factory.get_session()
+        await first.close()
+        second = factory.get_session()
+        await factory.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert second is not first
+
+
+def test_validators_share_one_factory_by_default():
+    factory = get_validation_session_factory()
+
+    assert factory is get_validation_session_factory()
+    assert factory.headers['User-Agent'] == 'Educational Data Validator 1.0'
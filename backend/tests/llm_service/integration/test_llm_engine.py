@@ -0,0 +1,335 @@
+"""Mocked integration tests for `CollegeDiscoveryEngine`."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+
+from google.api_core import exceptions as google_exceptions
+
+from engines.rate_limiter import RetryPolicy
+from models.college import College
+from tests.llm_service.fixtures.gemini_mocks import DummyGeminiResponse
+
+
+def _batch_response(*names: str) -> str:
+    return json.dumps({
+        "colleges": [
+            {"college_name": name, "courses": [{"name": f"B.Tech at {name}"}]}
+            for name in names
+        ]
+    })
+
+
+def test_call_gemini_uses_async_client(gemini_engine_factory):
+    engine = gemini_engine_factory(['{"colleges": []}'])
+
+    text = asyncio.run(engine._call_gemini("find colleges"))
+
+    assert text == '{"colleges": []}'
+    assert engine.client.sync_calls == 0
+    assert "find colleges" in engine.client.prompts[0]
+
+
+def test_batch_calls_overlap_on_event_loop(gemini_engine_factory):
+    engine = gemini_engine_factory(lambda prompt: _batch_response(), delay=0.05)
+    batches = [[College(name=f"College {i}")] for i in range(3)]
+
+    async def run_all():
+        return await asyncio.gather(
+            *(engine._discover_batch_courses(batch) for batch in batches)
+        )
+
+    asyncio.run(run_all())
+
+    assert engine.client.max_in_flight == 3
+
+
+def test_course_batches_respect_limit_and_keep_input_order(gemini_engine_factory):
+    def respond(prompt: str) -> str:
+        names = [c.name for c in colleges if f"{c.name} - " in prompt]
+        return _batch_response(*names)
+
+    colleges = [College(name=f"College {i}", website=f"https://c{i}.ac.in") for i in range(7)]
+    engine = gemini_engine_factory(respond, delay=0.02)
+    events = []
+
+    results = asyncio.run(engine.discover_courses_in_batches(
+        colleges,
+        batch_size=2,
+        max_concurrent_batches=2,
+        progress_callback=lambda event, data: events.append((event, data)),
+    ))
+
+    assert [c.name for c in results] == [c.name for c in colleges]
+    assert all(len(c.courses) == 1 for c in results)
+    assert engine.client.max_in_flight == 2
+    assert [data["completed"] for _, data in events] == [1, 2, 3, 4]
+    assert {event for event, _ in events} == {"step2_batch_progress"}
+
+
+def test_batch_retries_quota_errors_instead_of_dropping_courses(gemini_engine_factory):
+    calls = {"count": 0}
+
+    def respond(prompt: str) -> str:
+        calls["count"] += 1
+        if calls["count"] < 3:
+            raise google_exceptions.ResourceExhausted("Quota exceeded. Please retry in 0.01s.")
+        return _batch_response("Alpha College")
+
+    engine = gemini_engine_factory(respond)
+    engine.retry_policy = RetryPolicy(max_retries=3, base_delay=0.001, max_delay=0.01)
+
+    results = asyncio.run(engine._discover_batch_courses([College(name="Alpha College")]))
+
+    assert calls["count"] == 3
+    assert [c.name for c in results[0].courses] == ["B.Tech at Alpha College"]
+
+
+def test_repeated_prompt_is_served_from_cache(gemini_engine_factory):
+    engine = gemini_engine_factory(lambda prompt: '{"colleges": []}', use_cache=True)
+
+    first = asyncio.run(engine._call_gemini_with_metadata("find colleges in Mysuru"))
+    engine._cache_response(first)
+    second = asyncio.run(engine._call_gemini("find colleges in Mysuru"))
+    bypassed = asyncio.run(engine._call_gemini("find colleges in Mysuru", use_cache=False))
+
+    assert first.text == second == bypassed
+    assert len(engine.client.prompts) == 2
+
+
+def test_parsed_batch_responses_are_cached_but_bad_ones_are_asked_again(gemini_engine_factory):
+    answers = {
+        "Alpha College": [_batch_response("Alpha College")],
+        "Beta College": [DummyGeminiResponse('{"colleges": [{"college_name": "Beta', finish_reason="MAX_TOKENS"),
+                         _batch_response("Beta College")],
+        "Gamma College": ["Sorry, I cannot help with that.", _batch_response("Gamma College")],
+    }
+
+    def respond(prompt: str):
+        return next(answers[name].pop(0) for name in answers if f"{name} - " in prompt)
+
+    engine = gemini_engine_factory(respond, use_cache=True)
+
+    def discover(name: str) -> College:
+        college = College(name=name)
+        asyncio.run(engine._discover_batch_courses([college]))
+        return college
+
+    first_run = [discover(name) for name in answers]
+    calls_after_first_run = len(engine.client.prompts)
+    second_run = [discover(name) for name in answers]
+
+    assert [len(c.courses) for c in first_run] == [1, 0, 0]
+    assert [len(c.courses) for c in second_run] == [1, 1, 1]
+    # Only the truncated and the unparseable answers went back to the model
+    assert len(engine.client.prompts) - calls_after_first_run == 2
+
+
+def test_streamed_college_list_is_cached_only_once_parsed(gemini_engine_factory):
+    engine = gemini_engine_factory(["not json at all", _college_list_response("Alpha College")], use_cache=True)
+
+    async def collect():
+        return [college async for college in engine.stream_colleges_list("Mysuru")]
+
+    assert asyncio.run(engine._discover_colleges_list("Mysuru")) == []
+    first = asyncio.run(collect())
+    second = asyncio.run(collect())
+
+    assert [c.name for c in first] == [c.name for c in second] == ["Alpha College"]
+    assert len(engine.client.prompts) == 2
+
+
+def test_course_cache_only_queries_unseen_colleges(gemini_engine_factory):
+    def respond(prompt: str) -> str:
+        return _batch_response(*[name for name in ("Alpha College", "Beta College", "Gamma College")
+                                 if f"{name} - " in prompt])
+
+    engine = gemini_engine_factory(respond, use_cache=True)
+    first_search = [College(name="Alpha College", website="https://alpha.ac.in"),
+                    College(name="Beta College", website="https://beta.ac.in")]
+    asyncio.run(engine.discover_courses_in_batches(first_search, batch_size=5))
+
+    second_search = [College(name="Beta College", website="https://www.beta.ac.in/"),
+                     College(name="Gamma College", website="https://gamma.ac.in")]
+    results = asyncio.run(engine.discover_courses_in_batches(second_search, batch_size=5))
+
+    assert len(engine.client.prompts) == 2
+    assert "Beta College - " not in engine.client.prompts[1]
+    assert [c.courses[0].name for c in results] == ["B.Tech at Beta College", "B.Tech at Gamma College"]
+
+
+def test_course_cache_is_reused_across_cities_but_kept_per_stream(gemini_engine_factory):
+    engine = gemini_engine_factory(lambda prompt: _batch_response("Alpha College"), use_cache=True)
+
+    def search(city: str, career_path: str = None) -> College:
+        college = College(name="Alpha College", website="https://alpha.ac.in", city=city)
+        asyncio.run(engine.discover_courses_in_batches([college], career_path))
+        return college
+
+    search("Mysuru", "Engineering")
+    search("Mandya", "Engineering")
+    assert len(engine.client.prompts) == 1
+
+    search("Mandya", "Medical")
+    search("Mandya")
+    assert len(engine.client.prompts) == 3
+
+
+def _college_list_response(*names: str) -> str:
+    return json.dumps({"colleges": [{"name": name, "website": f"https://{name[0].lower()}.ac.in"}
+                                    for name in names]})
+
+
+def test_stream_colleges_list_yields_parsed_colleges(gemini_engine_factory):
+    engine = gemini_engine_factory([_college_list_response("Alpha College", "Beta College")])
+
+    async def collect():
+        return [college async for college in engine.stream_colleges_list("Mysuru")]
+
+    colleges = asyncio.run(collect())
+
+    assert [c.name for c in colleges] == ["Alpha College", "Beta College"]
+
+
+def test_streaming_discovery_starts_course_batches_before_list_finishes(gemini_engine_factory):
+    names = [f"College {i}" for i in range(6)]
+    batch_started_mid_stream = []
+
+    def respond(prompt: str) -> str:
+        if "Find at most" in prompt:
+            return _college_list_response(*names)
+        batch_started_mid_stream.append(engine.client.streams_finished == 0)
+        return _batch_response(*[name for name in names if f"{name} - " in prompt])
+
+    engine = gemini_engine_factory(respond, delay=0.001)
+    events = []
+
+    colleges = asyncio.run(engine.discover_colleges(
+        "Mysuru",
+        batch_size=2,
+        stream=True,
+        progress_callback=lambda event, data: events.append(event),
+    ))
+
+    assert [c.name for c in colleges] == names
+    assert all(len(c.courses) == 1 for c in colleges)
+    assert batch_started_mid_stream[0] is True
+    assert events.count("step1_college_found") == 6
+    assert events.count("step2_batch_progress") == 3
+
+
+def test_truncated_batch_is_split_and_only_missing_colleges_retried(gemini_engine_factory):
+    names = ["Alpha College", "Beta College", "Gamma College", "Delta College"]
+
+    def respond(prompt: str):
+        in_prompt = [name for name in names if f"{name} - " in prompt]
+        if len(in_prompt) == 4:
+            # Cut off after two colleges; Beta's entry may be incomplete
+            return DummyGeminiResponse(_batch_response("Alpha College", "Beta College"),
+                                       finish_reason="MAX_TOKENS", output_tokens=10000)
+        return DummyGeminiResponse(_batch_response(*in_prompt), output_tokens=400 * len(in_prompt))
+
+    engine = gemini_engine_factory(respond)
+    colleges = [College(name=name) for name in names]
+
+    asyncio.run(engine._discover_batch_courses(colleges))
+
+    retried = [[n for n in names if f"{n} - " in prompt] for prompt in engine.client.prompts[1:]]
+    assert sorted(retried) == [["Beta College"], ["Gamma College", "Delta College"]]
+    assert all(len(c.courses) == 1 for c in colleges)
+    assert engine.batch_planner.tokens_per_college() == 400
+
+
+def test_adaptive_batching_packs_by_learned_tokens(gemini_engine_factory):
+    engine = gemini_engine_factory(lambda prompt: _batch_response())
+    engine.batch_planner.record(None, colleges_returned=1, output_tokens=4000)
+    colleges = [College(name=f"College {i}") for i in range(4)]
+
+    asyncio.run(engine.discover_courses_in_batches(colleges, batch_size=10))
+
+    assert len(engine.client.prompts) == 2
+
+
+def test_later_batches_are_sized_from_estimates_learned_in_the_same_run(gemini_engine_factory):
+    names = [f"College {i}" for i in range(12)]
+
+    def respond(prompt: str):
+        in_prompt = [name for name in names if f"{name} - " in prompt]
+        return DummyGeminiResponse(_batch_response(*in_prompt), output_tokens=100 * len(in_prompt))
+
+    engine = gemini_engine_factory(respond)
+    colleges = [College(name=name) for name in names]
+
+    asyncio.run(engine.discover_courses_in_batches(colleges, batch_size=10, max_concurrent_batches=1))
+
+    # 1500 tokens/college by default fits 5; after the first answer 100/college fits the cap of 10
+    assert [sum(f"{n} - " in prompt for n in names) for prompt in engine.client.prompts] == [5, 7]
+    assert all(len(c.courses) == 1 for c in colleges)
+
+
+def test_truncated_college_keeps_partial_courses_when_reask_finds_nothing(gemini_engine_factory):
+    partial = json.dumps({"colleges": [
+        {"college_name": "Alpha College", "courses": [{"name": "B.Tech"}, {"name": "MBA"}]},
+        {"college_name": "Beta College", "courses": [{"name": "B.Sc"}]},
+    ]})
+    engine = gemini_engine_factory([DummyGeminiResponse(partial, finish_reason="MAX_TOKENS"),
+                                    '{"colleges": []}'])
+    colleges = [College(name="Alpha College"), College(name="Beta College")]
+
+    asyncio.run(engine._discover_batch_courses(colleges))
+
+    assert len(engine.client.prompts) == 2
+    assert [c.name for c in colleges[1].courses] == ["B.Sc"]
+
+
+def test_structured_output_sends_schema_and_parses_directly(gemini_engine_factory):
+    engine = gemini_engine_factory([_batch_response("Alpha College")])
+    engine.structured_output = True
+
+    asyncio.run(engine._discover_batch_courses([College(name="Alpha College")]))
+
+    config = engine.client.generation_configs[0]
+    assert config["response_mime_type"] == "application/json"
+    assert "colleges" in config["response_schema"]["properties"]
+    assert engine.parse_stats["direct"] == 1
+
+
+def test_parse_stats_count_repair_fallback(gemini_engine_factory):
+    engine = gemini_engine_factory([])
+
+    engine._parse_json_response('Here you go: {"colleges": [{"college_name": "A"},]} thanks')
+
+    assert engine.parse_stats == {"direct": 0, "extracted": 0, "repaired": 1, "failed": 0}
+
+
+def test_merge_matches_reworded_names_by_index_domain_and_similarity(gemini_engine_factory):
+    engine = gemini_engine_factory([])
+    colleges = [
+        College(name="R.V. College of Engineering", website="https://rvce.edu.in"),
+        College(name="BMS College of Engineering", website="https://bmsce.ac.in"),
+        College(name="Dayananda Sagar College of Engineering", website="https://dsce.edu.in"),
+        College(name="PES University", website="https://pes.edu"),
+    ]
+    data = {"colleges": [
+        {"college_name": "PES University (RR Campus)", "index": 4,
+         "courses": [{"name": "B.Tech CSE"}]},
+        {"college_name": "BMSCE Bangalore", "website": "https://www.bmsce.ac.in/",
+         "courses": [{"name": "B.E. Mechanical"}]},
+        {"college_name": "RV College of Engineering, Bengaluru",
+         "courses": [{"name": "B.E. Civil"}]},
+    ]}
+
+    merged = engine._merge_batch_results(colleges, data)
+
+    assert [[course.name for course in c.courses] for c in merged] == [
+        ["B.E. Civil"], ["B.E. Mechanical"], [], ["B.Tech CSE"],
+    ]
+
+
+def test_index_is_ignored_when_names_clearly_differ(gemini_engine_factory):
+    engine = gemini_engine_factory([])
+    colleges = [College(name="Alpha College"), College(name="Beta College")]
+    data = {"colleges": [{"college_name": "Gamma Institute", "index": 1, "courses": [{"name": "BA"}]}]}
+
+    assert engine._match_batch_results(colleges, data) == [None, None]
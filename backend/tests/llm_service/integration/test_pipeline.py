@@ -0,0 +1,157 @@
+"""Mocked integration tests for `DiscoveryPipeline`."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import List
+
+from engines.pipeline import DiscoveryPipeline
+from models.college import College
+
+
+def _college_list_response(*names: str) -> str:
+    return json.dumps({"colleges": [{"name": name} for name in names]})
+
+
+def _batch_response(*names: str) -> str:
+    return json.dumps({
+        "colleges": [
+            {"college_name": name, "courses": [{"name": f"B.Tech at {name}"}]}
+            for name in names
+        ]
+    })
+
+
+class FakeValidator:
+    max_concurrent = 4
+
+    def __init__(self, log: List[str], delay: float = 0.0):
+        self.log = log
+        self.delay = delay
+
+    async def validate_colleges(self, colleges: List[College], progress_callback=None,
+                                session=None) -> List[College]:
+        await asyncio.sleep(self.delay)
+        for college in colleges:
+            college.overall_confidence = 0.9
+            self.log.append(f"validated {college.name}")
+        return colleges
+
+
+class FakeSupabase:
+    def __init__(self, log: List[str]):
+        self.log = log
+
+    async def push_colleges_and_courses(self, colleges: List[College], progress_callback=None):
+        for college in colleges:
+            self.log.append(f"staged {college.name}")
+        return {
+            'colleges_inserted': len(colleges),
+            'colleges_failed': 0,
+            'courses_inserted': sum(len(c.courses) for c in colleges),
+            'courses_failed': 0,
+            'relationships_created': 0,
+            'relationships_failed': 0,
+            'errors': [f"warning for {colleges[0].name}"]
+        }
+
+
+class FlakySupabase(FakeSupabase):
+    async def push_colleges_and_courses(self, colleges: List[College], progress_callback=None):
+        if colleges[0].name == "College 1":
+            raise RuntimeError("connection reset")
+        return await super().push_colleges_and_courses(colleges, progress_callback)
+
+
+def _engine_for(gemini_engine_factory, names, log, filtered_out=()):
+    def respond(prompt: str) -> str:
+        if "Find at most" in prompt:
+            return _college_list_response(*names)
+        batch = [name for name in names if f"{name} - " in prompt]
+        log.append(f"batch {batch[0]}")
+        return _batch_response(*[name for name in batch if name not in filtered_out])
+
+    return gemini_engine_factory(respond, delay=0.01)
+
+
+def test_pipeline_validates_and_stages_before_discovery_finishes(gemini_engine_factory):
+    names = [f"College {i}" for i in range(6)]
+    log: List[str] = []
+    engine = _engine_for(gemini_engine_factory, names, log)
+    pipeline = DiscoveryPipeline(engine, validator=FakeValidator(log), supabase=FakeSupabase(log))
+
+    result = asyncio.run(pipeline.run("Mysuru", batch_size=2, max_concurrent_batches=1))
+
+    assert [c.name for c in result['colleges']] == names
+    assert all(c.overall_confidence == 0.9 for c in result['colleges'])
+    # The first college reaches staging while later course batches are still pending
+    assert log.index("staged College 0") < log.index("batch College 4")
+    assert result['push_results']['colleges_inserted'] == 6
+    assert result['push_results']['courses_inserted'] == 6
+    assert len(result['push_results']['errors']) == 6
+
+
+def test_pipeline_drops_colleges_without_matching_courses(gemini_engine_factory):
+    names = ["Alpha College", "Beta College", "Gamma College"]
+    log: List[str] = []
+    engine = _engine_for(gemini_engine_factory, names, log, filtered_out={"Beta College"})
+    events = []
+    pipeline = DiscoveryPipeline(engine, validator=FakeValidator(log))
+
+    result = asyncio.run(pipeline.run(
+        "Mysuru",
+        career_path="Engineering",
+        batch_size=3,
+        progress_callback=lambda event, data: events.append(event),
+    ))
+
+    assert [c.name for c in result['colleges']] == ["Alpha College", "Gamma College"]
+    assert "validated Beta College" not in log
+    assert result['push_results'] is None
+    assert events.count("college_validated") == 2
+    assert events.count("college_staged") == 2
+    assert events[-1] == "pipeline_complete"
+
+
+def test_pipeline_bounded_queue_applies_back_pressure(gemini_engine_factory):
+    names = [f"College {i}" for i in range(8)]
+    log: List[str] = []
+    engine = _engine_for(gemini_engine_factory, names, log)
+    pipeline = DiscoveryPipeline(engine, validator=FakeValidator(log, delay=0.01),
+                                 queue_size=1, validation_workers=2)
+
+    result = asyncio.run(pipeline.run("Mysuru", batch_size=4))
+
+    assert [c.name for c in result['colleges']] == names
+    assert sum(entry.startswith("validated") for entry in log) == 8
+
+
+def test_pipeline_records_push_failures_and_finishes(gemini_engine_factory):
+    names = [f"College {i}" for i in range(4)]
+    log: List[str] = []
+    engine = _engine_for(gemini_engine_factory, names, log)
+    pipeline = DiscoveryPipeline(engine, validator=FakeValidator(log), supabase=FlakySupabase(log),
+                                 queue_size=1)
+
+    result = asyncio.run(pipeline.run("Mysuru", batch_size=2))
+
+    assert [c.name for c in result['colleges']] == names
+    assert (result['push_results']['colleges_inserted'], result['push_results']['colleges_failed']) == (3, 1)
+    assert "College 1: connection reset" in result['push_results']['errors']
+    assert "staged College 3" in log
+
+
+def test_pipeline_without_validator_reports_no_validation(gemini_engine_factory):
+    names = ["Alpha College", "Beta College"]
+    log: List[str] = []
+    engine = _engine_for(gemini_engine_factory, names, log)
+    events = []
+    pipeline = DiscoveryPipeline(engine, supabase=FakeSupabase(log))
+
+    result = asyncio.run(pipeline.run("Mysuru", batch_size=2,
+                                      progress_callback=lambda event, data: events.append(event)))
+
+    assert result['push_results']['colleges_inserted'] == 2
+    assert "college_validated" not in events
+    assert events.count("college_staged") == 2
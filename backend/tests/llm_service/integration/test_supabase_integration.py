@@ -0,0 +1,221 @@
+"""Integration tests for `SupabaseIntegration` against an in-memory client."""
+
+from __future__ import annotations
+
+import asyncio
+
+from engines.supabase_integration import SupabaseIntegration
+from models.college import College, Course
+
+
+def _college(name: str, *courses: str) -> College:
+    return College(name=name, city="Pune", state="Maharashtra", website=f"https://{name.lower()}.edu.in",
+                   courses=[Course(name=course) for course in courses])
+
+
+def test_bulk_push_batches_rows_per_table(fake_supabase):
+    fake_supabase.tables["st_course"] = [{"id": "existing-btech", "name": "B.Tech"}]
+    integration = SupabaseIntegration(client=fake_supabase, batch_size=2)
+    colleges = [
+        _college("Alpha", "B.Tech", "MBA"),
+        _college("Beta", "MBA", "MBA"),
+        _college("Gamma", "BBA"),
+    ]
+    progress = []
+
+    results = asyncio.run(integration.push_colleges_and_courses(
+        colleges, progress_callback=lambda current, total, name: progress.append((current, name))
+    ))
+
+    assert results["colleges_inserted"] == 3
+    assert results["courses_inserted"] == 2
+    assert results["relationships_created"] == 4
+    assert sorted(current for current, _ in progress) == [1, 2, 3]
+    assert sorted(name for _, name in progress) == ["Alpha", "Beta", "Gamma"]
+    assert fake_supabase.requests == [
+        ("st_college", "upsert"), ("st_college", "upsert"),
+        ("st_course", "select"),
+        ("st_course", "upsert"),
+        ("st_college_course_jobs", "upsert"), ("st_college_course_jobs", "upsert"),
+    ]
+    names = {row["id"]: row["name"] for row in fake_supabase.tables["st_course"]}
+    colleges_by_id = {row["id"]: row["name"] for row in fake_supabase.tables["st_college"]}
+    links = {(colleges_by_id[row["college_id"]], names[row["course_id"]])
+             for row in fake_supabase.tables["st_college_course_jobs"]}
+    assert links == {("Alpha", "B.Tech"), ("Alpha", "MBA"), ("Beta", "MBA"), ("Gamma", "BBA")}
+
+
+def test_bulk_push_skips_courses_of_failed_college_batches(fake_supabase):
+    fake_supabase.fail_inserts["st_college"] = lambda row: row["name"] == "Beta"
+    integration = SupabaseIntegration(client=fake_supabase, batch_size=1)
+
+    results = asyncio.run(integration.push_colleges_and_courses(
+        [_college("Alpha", "B.Tech"), _college("Beta", "MBA")]
+    ))
+
+    assert (results["colleges_inserted"], results["colleges_failed"]) == (1, 1)
+    assert [row["name"] for row in fake_supabase.tables["st_course"]] == ["B.Tech"]
+    assert results["relationships_created"] == 1
+    assert len(results["errors"]) == 1
+
+
+def test_repeated_push_is_idempotent(fake_supabase):
+    integration = SupabaseIntegration(client=fake_supabase, batch_size=2)
+    colleges = [_college("Alpha", "B.Tech", "MBA"), _college("Beta", "MBA"), _college("Alpha", "B.Tech")]
+
+    asyncio.run(integration.push_colleges_and_courses(colleges))
+    sizes = {table: len(rows) for table, rows in fake_supabase.tables.items()}
+    # A fresh integration (cold course map) retrying the same push
+    results = asyncio.run(SupabaseIntegration(client=fake_supabase, batch_size=2)
+                          .push_colleges_and_courses(colleges))
+
+    assert sizes == {"st_college": 2, "st_course": 2, "st_college_course_jobs": 3}
+    assert {table: len(rows) for table, rows in fake_supabase.tables.items()} == sizes
+    assert results["colleges_inserted"] == 3
+    assert results["errors"] == []
+
+
+def test_sequential_push_matches_bulk_result(fake_supabase):
+    integration = SupabaseIntegration(client=fake_supabase)
+
+    results = asyncio.run(integration.push_colleges_and_courses(
+        [_college("Alpha", "B.Tech", "MBA"), _college("Beta", "MBA")], bulk=False
+    ))
+
+    assert results["colleges_inserted"] == 2
+    assert results["courses_inserted"] == 2
+    assert results["relationships_created"] == 3
+
+    asyncio.run(integration.push_colleges_and_courses([_college("Beta", "MBA")], bulk=False))
+    assert len(fake_supabase.tables["st_college_course_jobs"]) == 3
+
+
+def _seed_staging(fake_supabase):
+    fake_supabase.tables["st_college"] = [
+        {"id": f"c{i}", "name": f"College {i}", "confidence_level": level}
+        for i, level in enumerate(["HIGH", "HIGH", "LOW", "VERY_LOW", "BOGUS"])
+    ]
+    fake_supabase.tables["st_course"] = [{"id": "k1", "name": "MBA"}]
+    fake_supabase.tables["st_college_course_jobs"] = [{"id": "j1", "college_id": "c0", "course_id": "k1"}]
+
+
+def test_staging_stats_use_head_counts_and_grouped_rpc(fake_supabase):
+    _seed_staging(fake_supabase)
+
+    def breakdown(client):
+        counts = {}
+        for row in client.tables["st_college"]:
+            counts[row["confidence_level"]] = counts.get(row["confidence_level"], 0) + 1
+        return [{"confidence_level": level, "total": total} for level, total in counts.items()]
+
+    fake_supabase.functions["st_college_confidence_breakdown"] = breakdown
+
+    stats = asyncio.run(SupabaseIntegration(client=fake_supabase).get_staging_stats())
+
+    assert stats == {
+        "total_colleges": 5,
+        "total_courses": 1,
+        "total_relationships": 1,
+        "confidence_breakdown": {"HIGH": 2, "LOW": 1, "VERY_LOW": 1, "BOGUS": 1},
+    }
+    assert all(action in ("head", "rpc") for _, action in fake_supabase.requests)
+
+
+def test_staging_stats_fall_back_to_per_level_counts(fake_supabase):
+    _seed_staging(fake_supabase)
+
+    stats = asyncio.run(SupabaseIntegration(client=fake_supabase).get_staging_stats())
+
+    assert stats["confidence_breakdown"] == {"HIGH": 2, "LOW": 1, "VERY_LOW": 1, "UNKNOWN": 1}
+    assert all(action in ("head", "rpc") for _, action in fake_supabase.requests)
+
+
+def test_search_criteria_listing_is_paged_and_omits_results(fake_supabase):
+    fake_supabase.tables["search_criteria"] = [
+        {"id": i, "location": "Pune" if i % 2 else "Delhi", "career_path": "Engineering",
+         "specialization": None, "university": None, "llm_json": {"colleges": [{"name": f"College {i}"}]}}
+        for i in range(1, 8)
+    ]
+    integration = SupabaseIntegration(client=fake_supabase)
+
+    first = asyncio.run(integration.get_search_criteria({"location": "Pune", "university": None}, page=0, page_size=3))
+    second = asyncio.run(integration.get_search_criteria({"location": "Pune"}, page=1, page_size=3))
+    results = asyncio.run(integration.get_search_criteria_results([3, 7]))
+
+    assert first["total"] == 4
+    assert [row["id"] for row in first["rows"]] == [1, 3, 5]
+    assert [row["id"] for row in second["rows"]] == [7]
+    assert all("llm_json" not in row for row in first["rows"] + second["rows"])
+    assert results == {3: {"colleges": [{"name": "College 3"}]}, 7: {"colleges": [{"name": "College 7"}]}}
+    assert asyncio.run(integration.get_search_criteria_results([])) == {}
+
+
+def test_clear_staging_tables_deletes_in_chunks_without_returning_rows(fake_supabase):
+    fake_supabase.tables["st_college"] = [{"id": f"c{i:03d}", "name": f"College {i}"} for i in range(25)]
+    fake_supabase.tables["st_course"] = [{"id": f"k{i:03d}", "name": f"Course {i}"} for i in range(10)]
+    fake_supabase.tables["st_college_course_jobs"] = [{"id": f"j{i:03d}"} for i in range(3)]
+    integration = SupabaseIntegration(client=fake_supabase)
+    progress = []
+
+    results = asyncio.run(integration.clear_staging_tables(
+        progress_callback=lambda deleted, total, table: progress.append((table, deleted, total)),
+        chunk_size=10
+    ))
+
+    assert results == {"success": True, "colleges_deleted": 25, "courses_deleted": 10, "relationships_deleted": 3}
+    assert all(not rows for rows in fake_supabase.tables.values())
+    assert progress == [
+        ("st_college_course_jobs", 3, 3),
+        ("st_college", 10, 25), ("st_college", 20, 25), ("st_college", 25, 25),
+        ("st_course", 10, 10), ("st_course", 10, 10),
+    ]
+    assert fake_supabase.requests.count(("st_college", "delete")) == 3
+
+
+def test_push_survives_course_map_load_failure(fake_supabase):
+    fake_supabase.fail_requests[("st_course", "select")] = RuntimeError("connection reset")
+    integration = SupabaseIntegration(client=fake_supabase)
+
+    results = asyncio.run(integration.push_colleges_and_courses([_college("Alpha", "B.Tech", "MBA")]))
+
+    assert results["colleges_inserted"] == 1
+    assert results["courses_inserted"] == 2
+    assert results["relationships_created"] == 2
+
+
+def test_links_to_deleted_courses_reload_the_course_map_and_retry(fake_supabase):
+    integration = SupabaseIntegration(client=fake_supabase)
+    asyncio.run(integration.push_colleges_and_courses([_college("Alpha", "MBA")]))
+    # Staging cleared by another process: the warm map still holds the old MBA id
+    stale_id = fake_supabase.tables["st_course"][0]["id"]
+    for table in fake_supabase.tables.values():
+        table.clear()
+
+    def violates_foreign_key(row):
+        if row["course_id"] not in {course["id"] for course in fake_supabase.tables["st_course"]}:
+            raise RuntimeError('insert or update on table "st_college_course_jobs" violates foreign key constraint')
+        return False
+
+    fake_supabase.fail_inserts["st_college_course_jobs"] = violates_foreign_key
+
+    results = asyncio.run(integration.push_colleges_and_courses([_college("Beta", "MBA")]))
+
+    assert results["relationships_created"] == 1
+    assert results["relationships_failed"] == 0
+    assert results["errors"] == []
+    new_id = fake_supabase.tables["st_course"][0]["id"]
+    assert new_id != stale_id
+    assert fake_supabase.tables["st_college_course_jobs"][0]["course_id"] == new_id
+
+
+def test_clear_staging_tables_stops_when_deletes_remove_nothing(fake_supabase):
+    fake_supabase.tables["st_college"] = [{"id": f"c{i:03d}", "name": f"College {i}"} for i in range(25)]
+    fake_supabase.deny_deletes["st_college"] = lambda row: True
+    integration = SupabaseIntegration(client=fake_supabase)
+
+    results = asyncio.run(integration.clear_staging_tables(chunk_size=10))
+
+    assert results["success"] is False
+    assert "removed no rows" in results["error"]
+    assert fake_supabase.requests.count(("st_college", "delete")) == 1
+    assert len(fake_supabase.tables["st_college"]) == 25
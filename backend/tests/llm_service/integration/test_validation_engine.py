@@ -0,0 +1,302 @@
+"""Mocked integration tests for `EvidenceValidator`."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from engines.rate_limiter import DomainRateLimiter
+from engines.recognition_index import InstitutionRecord, RecognitionIndex
+from engines.cache_store import SQLiteCache
+from engines.http_cache import HTTPCache
+from engines.validation_engine import EvidenceValidator
+from engines.validation_store import ValidationStore
+from models.college import College, Course, EvidenceStatus
+
+
+def _validation_result(college: College) -> dict:
+    return {
+        'evidence_status': EvidenceStatus.VERIFIED,
+        'evidence_urls': [college.website],
+        'validation_scores': {
+            'website_adjustment': 0.1,
+            'course_evidence_adjustment': 0.0,
+            'govt_verification_adjustment': 0.0,
+            'domain_quality_adjustment': 0.0,
+        },
+        'validation_details': {'website_accessible': True},
+        'course_evidence': [],
+    }
+
+
+def test_validate_colleges_runs_concurrently_on_one_session(monkeypatch):
+    validator = EvidenceValidator(delay=0.0, max_concurrent=3, use_validation_store=False)
+    colleges = [College(name=f"College {i}", website=f"https://c{i}.ac.in", overall_confidence=0.5)
+                for i in range(6)]
+    sessions = set()
+    in_flight = {"now": 0, "max": 0}
+    progress = []
+
+    async def fake_validate(session, college):
+        sessions.add(id(session))
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.02)
+        in_flight["now"] -= 1
+        if college.name == "College 2":
+            raise RuntimeError("connection reset")
+        return _validation_result(college)
+
+    monkeypatch.setattr(validator, "_validate_single_college", fake_validate)
+
+    async def run():
+        try:
+            return await validator.validate_colleges(
+                colleges, progress_callback=lambda current, total, name: progress.append((current, total))
+            )
+        finally:
+            await validator.session_factory.close()
+
+    results = asyncio.run(run())
+
+    assert results is colleges
+    assert len(sessions) == 1
+    assert in_flight["max"] == 3
+    assert [p[0] for p in progress] == [1, 2, 3, 4, 5, 6]
+    assert all(total == 6 for _, total in progress)
+    assert colleges[0].evidence_status == EvidenceStatus.VERIFIED
+    assert colleges[0].overall_confidence == 0.6
+    assert colleges[2].evidence_status == EvidenceStatus.NO_EVIDENCE_FOUND
+    assert colleges[2].validation_details['error'] == "connection reset"
+
+
+def test_rate_limit_spaces_concurrent_requests_to_same_domain():
+    validator = EvidenceValidator(delay=0.05, domain_limiter=DomainRateLimiter())
+    started = []
+
+    async def hit(url: str):
+        async with validator._request_slot(url):
+            if "alpha" in url:
+                started.append(time.monotonic())
+
+    async def run_all():
+        await asyncio.gather(hit("https://alpha.ac.in/"), hit("https://alpha.ac.in/courses"),
+                             hit("https://alpha.ac.in/academics"), hit("https://beta.ac.in/"))
+
+    begin = time.monotonic()
+    asyncio.run(run_all())
+
+    started.sort()
+    assert started[0] - begin < 0.04
+    assert started[1] - started[0] >= 0.04
+    assert started[2] - started[1] >= 0.04
+
+
+def _course_site(pages: dict, requests: list) -> web.Application:
+    """Site serving `pages` ({path: (delay, html)}); other paths are 404"""
+    async def handler(request):
+        requests.append((request.method, request.path))
+        if request.path not in pages:
+            raise web.HTTPNotFound()
+        delay, html = pages[request.path]
+        await asyncio.sleep(delay)
+        return web.Response(text=html, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    return app
+
+
+def test_course_probes_run_in_parallel_and_stop_once_all_courses_match():
+    requests = []
+    pages = {
+        "/courses": (0.05, "<h1>BTech Computer Science</h1>"),
+        "/academics": (0.05, "<h1>MBA Finance</h1>"),
+        "/programs": (1.0, "<h1>Nothing here</h1>"),
+    }
+
+    async def run():
+        server = TestServer(_course_site(pages, requests))
+        await server.start_server()
+        validator = EvidenceValidator(delay=0.0, domain_limiter=DomainRateLimiter(max_in_flight=8),
+                                      use_http_cache=False)
+        college = College(name="Alpha College", website=str(server.make_url("/")),
+                          courses=[Course(name="BTech Computer Science"), Course(name="MBA Finance")])
+        try:
+            async with validator.create_session() as session:
+                begin = time.monotonic()
+                urls = await validator._find_course_evidence(session, college)
+                return urls, time.monotonic() - begin
+        finally:
+            await server.close()
+
+    urls, elapsed = asyncio.run(run())
+
+    assert [url.rsplit("/", 1)[-1] for url in urls] == ["courses", "academics"]
+    # The slow /programs page is cancelled rather than awaited
+    assert elapsed < 0.5
+    # Missing pages are ruled out by HEAD without downloading them
+    assert ("GET", "/departments") not in requests
+    assert ("HEAD", "/departments") in requests
+
+
+def test_probes_for_colleges_on_one_host_share_its_limits():
+    pages = {path: (0.02, "<h1>Nothing here</h1>") for path in EvidenceValidator.COURSE_PATHS}
+    in_flight = {"now": 0, "max": 0}
+    started = []
+
+    async def handler(request):
+        started.append(time.monotonic())
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        try:
+            await asyncio.sleep(pages[request.path][0])
+            return web.Response(text=pages[request.path][1], content_type="text/html")
+        finally:
+            in_flight["now"] -= 1
+
+    async def run():
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handler)
+        server = TestServer(app)
+        await server.start_server()
+        validator = EvidenceValidator(delay=0.01, domain_limiter=DomainRateLimiter(max_in_flight=2),
+                                      use_http_cache=False)
+        colleges = [College(name=f"College {i}", website=str(server.make_url("/")),
+                            courses=[Course(name="BTech")]) for i in range(2)]
+        try:
+            async with validator.create_session() as session:
+                await asyncio.gather(*(validator._find_course_evidence(session, c) for c in colleges))
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+    # HEAD and GET for every path of both colleges
+    assert len(started) == 4 * len(EvidenceValidator.COURSE_PATHS)
+    assert in_flight["max"] == 2
+    # Every request took its own politeness slot, none skipped the spacing
+    assert started[-1] - started[0] >= 0.9 * 0.01 * (len(started) - 1)
+
+
+def test_validators_share_the_process_wide_domain_limiter():
+    assert EvidenceValidator().domain_limiter is EvidenceValidator(delay=0.5).domain_limiter
+
+
+def test_govt_presence_uses_offline_index_before_name_heuristics():
+    index = RecognitionIndex([InstitutionRecord("PES University", "ugc", city="Bengaluru", record_id="U-42")])
+    validator = EvidenceValidator(recognition_index=index, domain_limiter=DomainRateLimiter())
+
+    indexed = asyncio.run(validator._check_govt_presence(None, "P.E.S. University", "Bengaluru"))
+    heuristic = asyncio.run(validator._check_govt_presence(None, "National Institute of Technology"))
+    unknown = asyncio.run(validator._check_govt_presence(None, "Alpha College"))
+
+    assert indexed['found'] is True
+    assert indexed['urls'] == ["https://www.ugc.ac.in/"]
+    assert indexed['matches'][0]['record_id'] == "U-42"
+    assert heuristic['found'] is True and heuristic['matches'] == []
+    assert unknown == {'found': False, 'urls': [], 'matches': []}
+
+
+def test_store_reuses_fresh_results_and_revalidates_changed_colleges(monkeypatch, tmp_path):
+    store = ValidationStore(SQLiteCache(str(tmp_path / "v.sqlite3"), table="validation_results"),
+                            freshness_seconds=3600)
+    validator = EvidenceValidator(delay=0.0, validation_store=store)
+    validated = []
+
+    async def fake_validate(session, college):
+        validated.append(college.name)
+        return _validation_result(college)
+
+    monkeypatch.setattr(validator, "_validate_single_college", fake_validate)
+
+    def search(*courses_for_beta):
+        return [
+            College(name="Alpha College", website="https://alpha.ac.in", overall_confidence=0.5,
+                    courses=[Course(name="BTech")]),
+            College(name="Beta College", website="https://beta.ac.in", overall_confidence=0.7,
+                    courses=[Course(name=name) for name in courses_for_beta]),
+        ]
+
+    async def run():
+        try:
+            await validator.validate_colleges(search("MBA"))
+            return await validator.validate_colleges(search("MBA", "MCA"))
+        finally:
+            await validator.session_factory.close()
+
+    second = asyncio.run(run())
+
+    assert validated == ["Alpha College", "Beta College", "Beta College"]
+    assert validator.stats == {'validated': 3, 'reused': 1}
+    assert second[0].evidence_status == EvidenceStatus.VERIFIED
+    assert second[0].overall_confidence == 0.6
+
+
+def test_website_check_revalidates_early_stopped_pages_with_etag(tmp_path):
+    requests = []
+    page = ("<h1>University admissions</h1><p>college courses students faculty "
+            "departments programs</p>" + "<p>news</p>" * 5000)
+
+    async def home(request):
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"home"':
+            return web.Response(status=304, headers={"ETag": '"home"'})
+        return web.Response(text=page, content_type="text/html", headers={"ETag": '"home"'})
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/", home)
+        server = TestServer(app)
+        await server.start_server()
+        cache = HTTPCache(SQLiteCache(str(tmp_path / "http.sqlite3"), table="http_responses"))
+        validator = EvidenceValidator(delay=0.0, domain_limiter=DomainRateLimiter(), http_cache=cache,
+                                      use_validation_store=False)
+        try:
+            async with validator.create_session() as session:
+                url = str(server.make_url("/"))
+                checks = [await validator._validate_website(session, url) for _ in range(2)]
+                return checks, cache.lookup(url)
+        finally:
+            await server.close()
+
+    (first, second), entry = asyncio.run(run())
+
+    assert requests == [None, '"home"']
+    assert first == second
+    assert first['edu_score'] == 8
+    assert first['content_length'] == len(page)
+    # Only the start of the page was read, and it was still cached
+    assert entry["complete"] is False and len(entry["text"]) < len(page)
+
+
+def test_missing_course_pages_found_by_head_are_negatively_cached(tmp_path):
+    requests = []
+
+    async def run():
+        server = TestServer(_course_site({}, requests))
+        await server.start_server()
+        cache = HTTPCache(SQLiteCache(str(tmp_path / "http.sqlite3"), table="http_responses"))
+        validator = EvidenceValidator(delay=0.0, domain_limiter=DomainRateLimiter(), http_cache=cache,
+                                      use_validation_store=False)
+        college = College(name="Alpha College", website=str(server.make_url("/")),
+                          courses=[Course(name="MBA")])
+        try:
+            async with validator.create_session() as session:
+                first = await validator._find_course_evidence(session, college)
+                probes_first_run = len(requests)
+                second = await validator._find_course_evidence(session, college)
+        finally:
+            await server.close()
+        return first, second, probes_first_run
+
+    first, second, probes_first_run = asyncio.run(run())
+
+    assert first == second == []
+    assert probes_first_run == len(EvidenceValidator.COURSE_PATHS)
+    assert all(method == "HEAD" for method, _ in requests)
+    # Every path was remembered as missing, so the second run sent nothing
+    assert len(requests) == probes_first_run
@@ -0,0 +1,52 @@
+"""Unit tests for `engines.batch_planner`."""
+
+from engines.batch_planner import CourseBatchPlanner, get_model_batch_planner
+from models.college import College
+
+
+def _colleges(count: int):
+    return [College(name=f"College {i}") for i in range(count)]
+
+
+def test_initial_plan_uses_default_estimate_and_cap():
+    planner = CourseBatchPlanner(max_output_tokens=10000, initial_tokens_per_college=2000, safety_margin=0.8)
+
+    assert planner.batch_size_for() == 4
+    assert planner.batch_size_for(max_batch_size=3) == 3
+    assert [len(b) for b in planner.plan(_colleges(10))] == [4, 4, 2]
+
+
+def test_learned_estimate_grows_batches_for_short_answers():
+    planner = CourseBatchPlanner(max_output_tokens=10000, initial_tokens_per_college=2000,
+                                 safety_margin=1.0, smoothing=0.5)
+
+    planner.record("Data Science", colleges_returned=5, output_tokens=2500)
+
+    assert planner.tokens_per_college("data science") == 500
+    assert planner.batch_size_for("Data Science") == 20
+    assert planner.batch_size_for() == 5
+
+    planner.record("Data Science", colleges_returned=5, output_tokens=7500)
+    assert planner.tokens_per_college("Data Science") == 1000
+
+
+def test_record_ignores_empty_observations():
+    planner = CourseBatchPlanner(initial_tokens_per_college=1500)
+
+    planner.record(None, colleges_returned=0, output_tokens=900)
+    planner.record(None, colleges_returned=3, output_tokens=None)
+
+    assert planner.tokens_per_college() == 1500
+
+
+def test_never_plans_empty_batches():
+    planner = CourseBatchPlanner(max_output_tokens=100, initial_tokens_per_college=5000)
+
+    assert planner.batch_size_for() == 1
+
+
+def test_planner_is_shared_per_model():
+    planner = get_model_batch_planner("gemini-planner-test")
+
+    assert get_model_batch_planner("gemini-planner-test") is planner
+    assert get_model_batch_planner("gemini-planner-other") is not planner
@@ -0,0 +1,64 @@
+"""Unit tests for `engines.cache_store`."""
+
+import time
+
+from engines.cache_store import SQLiteCache, hash_key
+
+
+def test_hash_key_is_order_insensitive_for_dicts():
+    assert hash_key("m", {"a": 1, "b": 2}, "p") == hash_key("m", {"b": 2, "a": 1}, "p")
+    assert hash_key("m", {"a": 1}, "p") != hash_key("m", {"a": 2}, "p")
+
+
+def test_round_trip_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path).set("k", {"text": "hello"})
+
+    assert SQLiteCache(path).get("k") == {"text": "hello"}
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=10)
+    cache.set("k", 1)
+
+    later = time.time() + 60
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_max_age_overrides_ttl(tmp_path, monkeypatch):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=3600)
+    cache.set("k", 1)
+
+    later = time.time() + 60
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("k", max_age=3600) == 1
+    assert cache.get("k", max_age=30) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(time, "time", lambda: next(clock))
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_size_bound_evicts_oldest_bytes(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+
+    for i in range(5):
+        cache.set(f"k{i}", "x" * 100)
+
+    assert len(cache) == 2
+    assert cache.get("k4") is not None
@@ -0,0 +1,91 @@
+"""Unit tests for `engines.course_resolver`."""
+
+from __future__ import annotations
+
+import asyncio
+
+from engines.course_resolver import CourseResolver
+from models.college import Course
+
+
+def _row(course: Course) -> dict:
+    return {"name": course.name}
+
+
+def _courses(*names: str):
+    return [Course(name=name) for name in names]
+
+
+def test_preloads_in_pages_and_stays_warm(fake_supabase):
+    fake_supabase.tables["st_course"] = [{"id": f"c{i:02d}", "name": f"Course {i}"} for i in range(5)]
+    resolver = CourseResolver(fake_supabase, page_size=2)
+
+    first = asyncio.run(resolver.resolve(_courses("Course 1", "Course 4", "New", "New"), _row))
+    requests_after_first = len(fake_supabase.requests)
+    second = asyncio.run(resolver.resolve(_courses("Course 1", "New"), _row))
+
+    assert fake_supabase.requests == [("st_course", "select")] * 3 + [("st_course", "upsert")]
+    assert len(fake_supabase.requests) == requests_after_first
+    assert first.ids["Course 4"] == "c04"
+    assert first.upserted == ["New"]
+    assert second.ids == {"Course 1": "c01", "New": first.ids["New"]}
+    assert second.upserted == []
+
+
+def test_courses_added_elsewhere_are_matched_not_duplicated(fake_supabase):
+    resolver = CourseResolver(fake_supabase)
+    asyncio.run(resolver.resolve(_courses("B.Tech"), _row))
+    # Added by another process after the preload
+    fake_supabase.tables["st_course"].append({"id": "other", "name": "MBA"})
+
+    resolution = asyncio.run(resolver.resolve(_courses("MBA", "B.Tech"), _row))
+
+    assert resolution.ids["MBA"] == "other"
+    assert [row["name"] for row in fake_supabase.tables["st_course"]] == ["B.Tech", "MBA"]
+
+
+def test_reloads_when_stale_or_invalidated(fake_supabase):
+    now = [0.0]
+    resolver = CourseResolver(fake_supabase, max_age_seconds=60, clock=lambda: now[0])
+    asyncio.run(resolver.resolve(_courses("B.Tech"), _row))
+    assert resolver.loaded
+
+    now[0] = 61
+    assert not resolver.loaded
+    asyncio.run(resolver.resolve(_courses("B.Tech"), _row))
+    assert resolver.loaded
+
+    fake_supabase.tables["st_course"].clear()
+    resolver.invalidate()
+    resolution = asyncio.run(resolver.resolve(_courses("B.Tech"), _row))
+    assert resolution.upserted == ["B.Tech"]
+    assert len(fake_supabase.tables["st_course"]) == 1
+
+
+def test_failed_batches_are_reported(fake_supabase):
+    fake_supabase.fail_inserts["st_course"] = lambda row: row["name"] == "Bad"
+    resolver = CourseResolver(fake_supabase, batch_size=1)
+
+    resolution = asyncio.run(resolver.resolve(_courses("Good", "Bad"), _row))
+
+    assert resolution.upserted == ["Good"]
+    assert resolution.failed == ["Bad"]
+    assert len(resolution.errors) == 1
+    assert len(resolver) == 1
+
+
+def test_load_failure_falls_back_to_upserting_every_course(fake_supabase):
+    fake_supabase.tables["st_course"] = [{"id": "existing", "name": "B.Tech"}]
+    fake_supabase.fail_requests[("st_course", "select")] = RuntimeError("connection reset")
+    resolver = CourseResolver(fake_supabase)
+
+    resolution = asyncio.run(resolver.resolve(_courses("B.Tech", "MBA"), _row))
+
+    assert resolution.ids["B.Tech"] == "existing"
+    assert set(resolution.upserted) == {"B.Tech", "MBA"}
+    assert resolution.errors == []
+    assert not resolver.loaded
+
+    del fake_supabase.fail_requests[("st_course", "select")]
+    asyncio.run(resolver.resolve(_courses("MBA"), _row))
+    assert resolver.loaded
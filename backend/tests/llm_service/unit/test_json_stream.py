@@ -0,0 +1,50 @@
+"""Unit tests for `engines.json_stream`."""
+
+import json
+
+import pytest
+
+from engines.json_stream import IncrementalObjectParser
+
+
+RESPONSE = "```json\n" + json.dumps({
+    "colleges": [
+        {"name": 'Alpha "A" College {East}', "courses": [{"name": "B.Sc"}]},
+        {"name": "Beta College", "rating": 4.1},
+    ]
+}) + "\n```"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64, len(RESPONSE)])
+def test_emits_each_array_item_once_regardless_of_chunking(chunk_size):
+    parser = IncrementalObjectParser()
+    items = []
+    for i in range(0, len(RESPONSE), chunk_size):
+        items.extend(parser.feed(RESPONSE[i:i + chunk_size]))
+
+    assert [item["name"] for item in items] == ['Alpha "A" College {East}', "Beta College"]
+    assert items[0]["courses"] == [{"name": "B.Sc"}]
+    assert parser.items_emitted == 2
+
+
+def test_item_is_emitted_as_soon_as_it_closes():
+    parser = IncrementalObjectParser()
+
+    assert parser.feed('{"colleges": [{"name": "A"}, {"name": ') == [{"name": "A"}]
+    assert parser.feed('"B"}') == [{"name": "B"}]
+
+
+def test_skips_leading_arrays_without_objects():
+    parser = IncrementalObjectParser()
+
+    items = parser.feed('{"tags": ["x", "y"], "colleges": [{"name": "A"}]}')
+
+    assert items == [{"name": "A"}]
+
+
+def test_malformed_item_is_repaired():
+    parser = IncrementalObjectParser()
+
+    items = parser.feed('{"colleges": [{"name": "A", "rating": 4.0,}]}')
+
+    assert items == [{"name": "A", "rating": 4.0}]
@@ -0,0 +1,63 @@
+"""Unit tests for `engines.normalization`."""
+
+import pytest
+
+from engines.normalization import college_key, name_similarity, normalize_name, website_domain
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ("Govt. Engg. College, Hassan", "government engineering college hassan"),
+        ("R.V. College of Engineering", "rv college of engineering"),
+        ("St. Joseph's Arts & Science", "st joseph s arts and science"),
+        (None, ""),
+    ],
+)
+def test_normalize_name(raw, expected):
+    assert normalize_name(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("https://www.rvce.edu.in/courses", "rvce.edu.in"),
+        ("rvce.edu.in", "rvce.edu.in"),
+        ("http://WWW.BMSCE.AC.IN:8080/", "bmsce.ac.in"),
+        ("", ""),
+    ],
+)
+def test_website_domain(url, expected):
+    assert website_domain(url) == expected
+
+
+def test_college_key_prefers_domain_and_falls_back_to_city():
+    assert college_key("Govt First Grade College", "https://gfgc-a.ac.in") != college_key(
+        "Govt First Grade College", "https://gfgc-b.ac.in"
+    )
+    assert college_key("Government First Grade College", city="Mysuru") == college_key(
+        "Govt. First Grade College", city="mysuru"
+    )
+
+
+@pytest.mark.parametrize(
+    "a,b,minimum",
+    [
+        ("RV College of Engineering", "R.V. College of Engineering, Bengaluru", 0.8),
+        ("BMS College of Engg", "B.M.S. College of Engineering", 1.0),
+    ],
+)
+def test_name_similarity_tolerates_rewording(a, b, minimum):
+    assert name_similarity(a, b) >= minimum
+
+
+@pytest.mark.parametrize(
+    "a,b",
+    [
+        ("RV College of Engineering", "RV Institute of Technology"),
+        ("College 1", "College 2"),
+        ("Christ University", "Jain University"),
+    ],
+)
+def test_name_similarity_separates_different_colleges(a, b):
+    assert name_similarity(a, b) < 0.6
@@ -0,0 +1,137 @@
+"""Unit tests for `engines.rate_limiter`."""
+
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from engines.rate_limiter import (
+    DomainRateLimiter,
+    GeminiRateLimiter,
+    RetryPolicy,
+    TokenBucket,
+    get_retry_after,
+    is_retryable_error,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_reports_wait_for_deficit_and_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, refill_per_second=1, clock=clock)
+
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+    clock.now = 3.0
+    assert bucket.reserve(1) == 0
+
+
+def test_token_bucket_clamps_oversized_requests_to_capacity():
+    bucket = TokenBucket(capacity=10, refill_per_second=5, clock=FakeClock())
+
+    assert bucket.reserve(1000) == 0
+    assert bucket.reserve(10) == pytest.approx(2.0)
+
+
+def test_settle_refunds_unused_token_reservation():
+    limiter = GeminiRateLimiter(requests_per_minute=60, tokens_per_minute=100, clock=FakeClock())
+
+    assert limiter.tokens.reserve(100) == 0
+    limiter.settle(reserved_tokens=100, actual_tokens=40)
+
+    assert limiter.tokens.reserve(60) == 0
+
+
+def test_domain_limiter_spaces_same_domain_but_not_others():
+    clock = FakeClock()
+    limiter = DomainRateLimiter(clock=clock)
+
+    assert limiter.reserve("alpha.ac.in", 2.0) == 0
+    assert limiter.reserve("alpha.ac.in", 2.0) == pytest.approx(2.0)
+    assert limiter.reserve("alpha.ac.in", 2.0) == pytest.approx(4.0)
+    assert limiter.reserve("beta.ac.in", 2.0) == 0
+
+    clock.now = 10.0
+    assert limiter.reserve("alpha.ac.in", 2.0) == 0
+
+
+def test_domain_limiter_allows_burst_after_idle():
+    clock = FakeClock()
+    limiter = DomainRateLimiter(burst=2, clock=clock)
+
+    assert limiter.reserve("alpha.ac.in", 1.0) == 0
+    assert limiter.reserve("alpha.ac.in", 1.0) == 0
+    assert limiter.reserve("alpha.ac.in", 1.0) == pytest.approx(1.0)
+
+
+def test_domain_limiter_evicts_least_recently_used_domains():
+    clock = FakeClock()
+    limiter = DomainRateLimiter(max_domains=2, clock=clock)
+
+    limiter.reserve("a.ac.in", 5.0)
+    limiter.reserve("b.ac.in", 5.0)
+    limiter.reserve("a.ac.in", 5.0)
+    limiter.reserve("c.ac.in", 5.0)
+
+    assert len(limiter) == 2
+    # b was evicted, so it starts fresh; a kept its spacing
+    assert limiter.reserve("b.ac.in", 5.0) == 0
+    assert limiter.reserve("c.ac.in", 5.0) == pytest.approx(5.0)
+
+
+def test_domain_requests_are_capped_per_domain_only():
+    limiter = DomainRateLimiter(max_in_flight=2)
+    in_flight = {}
+    peak = {}
+
+    async def request(domain: str):
+        async with limiter.request(domain, 0.0):
+            in_flight[domain] = in_flight.get(domain, 0) + 1
+            peak[domain] = max(peak.get(domain, 0), in_flight[domain])
+            await asyncio.sleep(0.01)
+            in_flight[domain] -= 1
+
+    async def run():
+        await asyncio.gather(*(request("alpha.ac.in") for _ in range(5)),
+                             *(request(f"c{i}.ac.in") for i in range(3)))
+        return dict(limiter._in_flight[asyncio.get_running_loop()])
+
+    left_over = asyncio.run(run())
+
+    assert peak["alpha.ac.in"] == 2
+    assert left_over == {}
+
+
+def test_backoff_is_bounded_and_honours_retry_after():
+    policy = RetryPolicy(base_delay=1.0, max_delay=8.0)
+
+    assert all(0 <= policy.backoff(attempt) <= 8.0 for attempt in range(10))
+    assert policy.backoff(0, retry_after=30.0) >= 30.0
+
+
+def test_retry_after_from_message_and_retry_info_detail():
+    error = google_exceptions.ResourceExhausted("Quota exceeded. Please retry in 12.5s.")
+    assert get_retry_after(error) == pytest.approx(12.5)
+
+    detail = SimpleNamespace(retry_delay=timedelta(seconds=7))
+    error = google_exceptions.ResourceExhausted("Quota exceeded", details=[detail])
+    assert get_retry_after(error) == pytest.approx(7.0)
+
+    assert get_retry_after(ValueError("bad prompt")) is None
+
+
+def test_only_transient_errors_are_retryable():
+    assert is_retryable_error(google_exceptions.ResourceExhausted("429"))
+    assert is_retryable_error(google_exceptions.ServiceUnavailable("503"))
+    assert not is_retryable_error(google_exceptions.InvalidArgument("400"))
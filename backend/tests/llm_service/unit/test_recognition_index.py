@@ -0,0 +1,52 @@
+"""Unit tests for `engines.recognition_index`."""
+
+from engines.recognition_index import SOURCE_URLS, InstitutionRecord, RecognitionIndex
+
+
+def _index() -> RecognitionIndex:
+    return RecognitionIndex([
+        InstitutionRecord("R.V. College of Engineering", "aicte", city="Bengaluru", record_id="1-123"),
+        InstitutionRecord("Government Engineering College", "aicte", city="Mandya"),
+        InstitutionRecord("Government Engineering College", "aicte", city="Hassan"),
+        InstitutionRecord("RV Institute of Technology and Management", "aicte", city="Bengaluru"),
+    ])
+
+
+def test_exact_match_after_normalization():
+    matches = _index().lookup("RV College of Engg")
+
+    assert [(record.record_id, score) for record, score in matches] == [("1-123", 1.0)]
+    assert matches[0][0].source_url == SOURCE_URLS["aicte"]
+
+
+def test_trigram_match_tolerates_extra_words_but_not_other_institutions():
+    index = _index()
+
+    assert index.lookup("RV College of Engineering, Bengaluru")[0][0].record_id == "1-123"
+    assert index.lookup("RV Institute of Engineering") == []
+
+
+def test_city_disambiguates_common_names():
+    index = _index()
+
+    assert [r.city for r, _ in index.lookup("Govt. Engineering College", city="Hassan")] == ["Hassan"]
+    assert index.lookup("Government Engineering College Hassan")[0][0].city == "Hassan"
+
+
+def test_loads_regulator_csv_dumps_with_their_own_headers(tmp_path):
+    (tmp_path / "aicte_2024.csv").write_text(
+        "﻿AICTE ID,Name of the Institution,District,State,Website\n"
+        "1-999,Sri Jayachamarajendra College of Engineering,Mysuru,Karnataka,\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "ugc_colleges.csv").write_text(
+        "College Name,City\nMaharani's Science College for Women,Mysuru\n,\n", encoding="utf-8"
+    )
+    (tmp_path / "notes.csv").write_text("Name\nIgnored College\n", encoding="utf-8")
+
+    index = RecognitionIndex.from_directory(str(tmp_path))
+
+    assert len(index) == 2
+    record, score = index.lookup("Shri Jayachamarajendra College of Engineering", city="Mysuru")[0]
+    assert (record.source, record.record_id, record.state, score) == ("aicte", "1-999", "Karnataka", 1.0)
+    assert index.lookup("Maharani Science College for Women")[0][0].source == "ugc"
@@ -0,0 +1,43 @@
+"""Unit tests for `engines.response_schemas`."""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from engines.response_schemas import batch_course_schema, college_list_schema, dataclass_schema
+
+
+@dataclass
+class Sample:
+    title: str
+    count: Optional[int] = None
+    score: float = 0.0
+    tags: List[str] = field(default_factory=list)
+
+
+def test_dataclass_schema_maps_annotations():
+    schema = dataclass_schema(Sample, ["title", "count", "score", "tags"], renames={"score": "rating"})
+
+    assert schema["properties"] == {
+        "title": {"type": "STRING"},
+        "count": {"type": "INTEGER", "nullable": True},
+        "rating": {"type": "NUMBER"},
+        "tags": {"type": "ARRAY", "items": {"type": "STRING"}},
+    }
+
+
+def test_college_list_schema_matches_prompt_keys():
+    college = college_list_schema()["properties"]["colleges"]["items"]
+
+    assert "confidence" in college["properties"]
+    assert "overall_confidence" not in college["properties"]
+    assert college["properties"]["rating"] == {"type": "NUMBER"}
+    assert college["required"] == ["name"]
+
+
+def test_batch_course_schema_uses_string_fees():
+    college = batch_course_schema()["properties"]["colleges"]["items"]
+    course = college["properties"]["courses"]["items"]
+
+    assert course["properties"]["annual_fees"] == {"type": "STRING", "nullable": True}
+    assert course["properties"]["seats"] == {"type": "INTEGER", "nullable": True}
+    assert course["properties"]["entrance_exams"]["type"] == "ARRAY"
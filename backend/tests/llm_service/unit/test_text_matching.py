@@ -0,0 +1,86 @@
+"""Unit tests for `engines.text_matching`."""
+
+import random
+
+import pytest
+
+from engines.text_matching import KeywordMatcher, PageScanner, extract_text
+
+
+def test_extract_text_drops_markup_scripts_and_comments():
+    page = """
+    <html><head><style>.college { color: red }</style>
+    <script type="text/javascript">var university = 1;</script></head>
+    <body><!-- faculty list --><h1>B.Tech &amp; MBA</h1>
+    <p>Admissions&nbsp;open</p></body></html>
+    """
+
+    text = extract_text(page)
+
+    assert text.strip() == "b.tech & mba admissions open"
+    assert "university" not in text
+    assert "faculty" not in text
+
+
+def test_matcher_finds_overlapping_and_nested_patterns():
+    matcher = KeywordMatcher(["he", "she", "his", "hers", "B.Tech", "tech"])
+
+    assert matcher.find("ushers study b.tech") == {"he", "she", "hers", "b.tech", "tech"}
+
+
+def test_matcher_agrees_with_substring_search():
+    rng = random.Random(7)
+    patterns = ["".join(rng.choices("abcd", k=rng.randint(1, 5))) for _ in range(200)]
+    text = "".join(rng.choices("abcd ", k=5000))
+
+    assert KeywordMatcher(patterns).find(text) == {p for p in patterns if p in text}
+
+
+def test_matcher_stops_after_enough_matches():
+    matcher = KeywordMatcher(["college", "course", "faculty"])
+
+    assert len(matcher.find("college course faculty", stop_after=2)) == 2
+    assert KeywordMatcher([]).find("anything") == set()
+
+
+PAGE = (
+    "<html><head><script>var college = 1; if (a < b) {}</script><style>.course {}</style></head>"
+    "<body><!-- faculty --><h1>University &amp; Admission</h1>"
+    "<p>Department of student affairs and program office</p></body></html>"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 16, len(PAGE)])
+def test_page_scanner_matches_whole_page_scan_for_any_chunking(chunk_size):
+    matcher = KeywordMatcher(["college", "university", "admission", "course",
+                              "department", "student", "faculty", "program"])
+    scanner = PageScanner(matcher)
+
+    for i in range(0, len(PAGE), chunk_size):
+        scanner.feed(PAGE[i:i + chunk_size])
+
+    assert scanner.close() == matcher.find(extract_text(PAGE))
+
+
+def test_page_scanner_reports_when_stop_condition_is_met():
+    scanner = PageScanner(KeywordMatcher(["university", "program"]))
+
+    assert scanner.feed("<h1>University</h1>") is False
+    assert scanner.feed("<p>Program</p>") is True
+
+
+@pytest.mark.parametrize("first, second", [
+    ("<p>computer \n", "  science</p>"),      # first chunk ends in whitespace
+    ("<p>computer <b>", "</b> science</p>"),  # second chunk starts with a tag
+    ("<p>computer &amp", "; science</p>"),    # character reference split
+])
+def test_page_scanner_finds_phrase_split_across_chunk_boundary(first, second):
+    matcher = KeywordMatcher(["computer science", "computer & science"])
+    scanner = PageScanner(matcher)
+    filler = "<p>" + "x " * 8190 + "</p>"  # the split lands at a 16 KiB chunk boundary
+
+    scanner.feed(filler + first)
+    scanner.feed(second)
+
+    assert scanner.close() == matcher.find(extract_text(filler + first + second))
+    assert scanner.found
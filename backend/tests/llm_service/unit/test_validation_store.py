@@ -0,0 +1,51 @@
+"""Unit tests for `engines.validation_store`."""
+
+from engines.cache_store import SQLiteCache
+from engines.validation_store import ValidationStore
+from models.college import College, Course, EvidenceStatus
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _result() -> dict:
+    return {
+        'evidence_status': EvidenceStatus.PARTIALLY_VERIFIED,
+        'evidence_urls': ["https://alpha.ac.in"],
+        'validation_scores': {'website_adjustment': 0.1},
+        'validation_details': {'website_accessible': True},
+        'course_evidence': [],
+    }
+
+
+def _store(clock) -> ValidationStore:
+    return ValidationStore(SQLiteCache(":memory:", table="validation_results"), freshness_seconds=60, clock=clock)
+
+
+def test_result_round_trips_and_matches_equivalent_college():
+    store = _store(FakeClock())
+    store.put(College(name="Alpha College", website="https://alpha.ac.in",
+                      courses=[Course(name="B.Tech"), Course(name="MBA")]), _result())
+
+    same = College(name="ALPHA COLLEGE", website="https://alpha.ac.in",
+                   courses=[Course(name="MBA"), Course(name="B. Tech")])
+
+    assert store.get(same) == _result()
+
+
+def test_stale_or_changed_entries_are_not_reused():
+    clock = FakeClock()
+    store = _store(clock)
+    college = College(name="Alpha College", website="https://alpha.ac.in", courses=[Course(name="MBA")])
+    store.put(college, _result())
+
+    moved = College(name="Alpha College", website="https://alpha.ac.in/new", courses=[Course(name="MBA")])
+    assert store.get(moved) is None
+
+    clock.now += 61
+    assert store.get(college) is None
@@ -0,0 +1,108 @@
+-- ================================================================
+-- MIGRATION: Natural Keys for Staging Tables
+-- Version: 004
+-- Date: 2026-10-18
+-- Description: Adds unique constraints used as ON CONFLICT targets by the
+--              llm-service staging push, so pushes are idempotent upserts:
+--              - st_college (name, city)
+--              - st_course (name)
+--              - st_college_course_jobs (college_id, course_id)
+--              Existing duplicates are merged first (oldest row wins).
+-- ================================================================
+
+-- ================================================================
+-- PART 1: MERGE DUPLICATE STAGING COLLEGES
+-- ================================================================
+
+WITH ranked AS (
+  SELECT id,
+         first_value(id) OVER (PARTITION BY name, city ORDER BY created_at, id) AS keep_id
+  FROM public.st_college
+)
+UPDATE public.st_college_course_jobs j
+SET college_id = ranked.keep_id
+FROM ranked
+WHERE j.college_id = ranked.id AND ranked.id <> ranked.keep_id;
+
+DELETE FROM public.st_college c
+USING public.st_college keep
+WHERE c.name = keep.name AND c.city = keep.city
+  AND (keep.created_at, keep.id) < (c.created_at, c.id);
+
+
+-- ================================================================
+-- PART 2: MERGE DUPLICATE STAGING COURSES
+-- ================================================================
+
+WITH ranked AS (
+  SELECT id,
+         first_value(id) OVER (PARTITION BY name ORDER BY created_at, id) AS keep_id
+  FROM public.st_course
+)
+UPDATE public.st_college_course_jobs j
+SET course_id = ranked.keep_id
+FROM ranked
+WHERE j.course_id = ranked.id AND ranked.id <> ranked.keep_id;
+
+UPDATE public.st_course_entrance_exams e
+SET course_id = ranked.keep_id
+FROM (
+  SELECT id,
+         first_value(id) OVER (PARTITION BY name ORDER BY created_at, id) AS keep_id
+  FROM public.st_course
+) ranked
+WHERE e.course_id = ranked.id AND ranked.id <> ranked.keep_id;
+
+DELETE FROM public.st_course c
+USING public.st_course keep
+WHERE c.name = keep.name
+  AND (keep.created_at, keep.id) < (c.created_at, c.id);
+
+
+-- ================================================================
+-- PART 3: REMOVE DUPLICATE COLLEGE-COURSE LINKS
+-- ================================================================
+
+DELETE FROM public.st_college_course_jobs j
+USING public.st_college_course_jobs keep
+WHERE j.college_id = keep.college_id AND j.course_id = keep.course_id
+  AND keep.id < j.id;
+
+
+-- ================================================================
+-- PART 4: ADD UNIQUE CONSTRAINTS
+-- ================================================================
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE conname = 'st_college_name_city_unique'
+  ) THEN
+    ALTER TABLE public.st_college
+    ADD CONSTRAINT st_college_name_city_unique UNIQUE (name, city);
+  END IF;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE conname = 'st_course_name_unique'
+  ) THEN
+    ALTER TABLE public.st_course
+    ADD CONSTRAINT st_course_name_unique UNIQUE (name);
+  END IF;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM pg_constraint WHERE conname = 'st_college_course_jobs_unique'
+  ) THEN
+    ALTER TABLE public.st_college_course_jobs
+    ADD CONSTRAINT st_college_course_jobs_unique UNIQUE (college_id, course_id);
+  END IF;
+END $$;
+
+
+-- ================================================================
+-- ROLLBACK SCRIPT (Save this for emergency rollback)
+-- ================================================================
+/*
+ALTER TABLE public.st_college DROP CONSTRAINT IF EXISTS st_college_name_city_unique;
+ALTER TABLE public.st_course DROP CONSTRAINT IF EXISTS st_course_name_unique;
+ALTER TABLE public.st_college_course_jobs DROP CONSTRAINT IF EXISTS st_college_course_jobs_unique;
+*/
@@ -0,0 +1,30 @@
+-- ================================================================
+-- MIGRATION: Staging Stats Aggregate
+-- Version: 005
+-- Date: 2026-10-18
+-- Description: Grouped confidence breakdown for st_college, computed in
+--              the database so the llm-service "Staging Stats" view only
+--              receives one row per confidence level.
+-- ================================================================
+
+CREATE OR REPLACE FUNCTION public.st_college_confidence_breakdown()
+RETURNS TABLE (confidence_level text, total bigint)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT c.confidence_level, count(*)::bigint AS total
+  FROM public.st_college c
+  GROUP BY c.confidence_level;
+$$;
+
+COMMENT ON FUNCTION public.st_college_confidence_breakdown() IS 'Number of staging colleges per confidence_level (used by llm-service get_staging_stats)';
+
+GRANT EXECUTE ON FUNCTION public.st_college_confidence_breakdown() TO anon, authenticated, service_role;
+
+
+-- ================================================================
+-- ROLLBACK SCRIPT (Save this for emergency rollback)
+-- ================================================================
+/*
+DROP FUNCTION IF EXISTS public.st_college_confidence_breakdown();
+*/